@@ -1,719 +1,81 @@
+import sys
+if __name__ == "__main__" and "streamlit" not in sys.modules and sys.argv[1:2] == ["score"]:
+    # `python -m ponv score in.csv -o out.csv`: command-line batch scoring, without starting the UI
+    from ponv_core import cli
+    sys.exit(cli.main())
+
 import streamlit as st
+from ponv_core import startup # Cold-start marks; imported first so they include every import below
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import roc_curve, auc, accuracy_score, precision_score, recall_score, f1_score
-import lightgbm as lgb
-from xgboost import XGBClassifier
-from imblearn.over_sampling import SMOTE
 import streamlit.components.v1 as components # Import components for embedding HTML/JS
+import inspect # Feature checks on the installed Streamlit
 import sqlite3 # Import sqlite3 for database operations
 import datetime # Import datetime for timestamp
-import matplotlib.cm as cm
+from ponv_core import modeling # Shared data generation, preprocessing and model definitions
+from ponv_core import cv # Parallel k-fold cross-validation with on-disk fold cache
+from ponv_core import tuning # Successive-halving hyperparameter search and persisted best config
+from ponv_core import thresholds # Sorted cumulative-sum threshold tables (Youden cutoffs, slider metrics)
+from ponv_core import calibration # Platt/isotonic calibrators, reliability curves and Brier scores
+from ponv_core import dca # Vectorized decision-curve analysis (net benefit)
+from ponv_core import bootstrap # Vectorized bootstrap confidence intervals (AUC, sensitivity, specificity)
+from ponv_core import evaluation # Upload evaluation steps shared with the benchmarks
+from ponv_core import explain # Per-patient native tree contributions (pred_contrib)
+from ponv_core import importance # Global gain/split importances and cached chart rendering
+from ponv_core import charts # Plotly figure specs with downsampled curves
+from ponv_core import figures # Managed matplotlib figures rendered once to PNG bytes
+from ponv_core import assets # Theme CSS and static HTML served from ponv_core/static
+from ponv_core import scoring # Hybrid score rules (scalar and vectorized)
+from ponv_core import service # Batch scorer (hybrid score + both models), also served over HTTP
+from ponv_core import batching # Micro-batching inference broker shared across sessions
+from ponv_core import db # Log table schema, migrations and insert statement
+from ponv_core import registry # Versioned model artifacts and the active-version pointer
+from ponv_core import cache # Content hashes (training-data fingerprints)
+from ponv_core import metrics # Per-section timing histograms with Prometheus export (PONV_METRICS=1)
+from ponv_core import profiling # Opt-in cProfile/tracemalloc capture of whole runs (PONV_PROFILE)
+from ponv_core.scoring import (
+    binary, propofol_score, midazolam_score, ondansetron_score, dexamethasone_score,
+    glycopyrrolate_score, nalbuphine_score, fentanyl_score, butorphanol_score,
+    pentazocine_score, muscle_relaxant_score, risk_category,
+)
+# sklearn, LightGBM, XGBoost and matplotlib are imported where first used, after the header is on screen
+startup.mark("imports")
+# Section timer for this run: one lap per section boundary below (a no-op unless PONV_METRICS=1)
+run_timer = metrics.laps()
+# cProfile and/or tracemalloc from here to the end of the run, written to PONV_PROFILE_DIR per session
+if profiling.ENABLED:
+    profiling.begin(profiling.session_modes(st.session_state))
 
 # Core Setup and UI
 st.set_page_config(layout="wide")
 
 # Inject custom CSS for styling the app and the flowchart
-# This block contains all the CSS rules, including those for the flowchart
-st.markdown("""
-<style>
-body {
-    background: #18191a !important;
-    color: #ffffff !important;
-    font-family: 'Inter', sans-serif;
-}
-.main .block-container {
-    background: #23272f !important;
-    color: #ffffff !important;
-    border-radius: 16px;
-    box-shadow: 0 4px 32px rgba(0,0,0,0.25);
-    padding: 2.5rem 2rem;
-    margin-top: 2rem;
-}
-.stSidebar, .css-1d391kg, .css-1lcbmhc {
-    background: #23272f !important;
-    color: #ffffff !important;
-}
-.stButton > button {
-    background: linear-gradient(90deg, #ffb366 0%, #ff8800 100%);
-    color: #18191a;
-    border-radius: 8px;
-    border: none;
-    font-weight: 600;
-    transition: 0.2s;
-}
-.stButton > button:hover {
-    background: linear-gradient(90deg, #ff8800 0%, #ffb366 100%);
-    color: #fff;
-}
-.animated-title {
-    font-size: 4em;
-    font-weight: 800;
-    text-align: center;
-    color: #ffffff !important;
-    text-shadow: 0 2px 16px #ff8800, 0 0px 2px #fff;
-    letter-spacing: -1px;
-    margin-bottom: 0.2em;
-    margin-top: 0.2em;
-}
-@keyframes gradientMove {
-    0% {background-position:0% 50%}
-    50% {background-position:100% 50%}
-    100% {background-position:0% 50%}
-}
-.card, .hybrid-score-box, .dose-box, .streamlit-expander {
-    background: #23272f !important;
-    color: #ffffff !important;
-    border-radius: 12px;
-    box-shadow: 0 2px 16px rgba(0,0,0,0.25);
-}
-table {
-    background: #23272f !important;
-    color: #ffffff !important;
-}
-th, td {
-    border-color: #444 !important;
-    color: #ffffff !important;
-}
-tr:nth-child(even) {
-    background-color: #202124 !important;
-}
-tr:hover td {
-    background-color: #333 !important;
-    color: #ffffff !important;
-}
-::-webkit-scrollbar {
-    width: 8px;
-    background: #23272f;
-}
-::-webkit-scrollbar-thumb {
-    background: #444;
-    border-radius: 4px;
-}
-
-/* Import professional fonts */
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-
-/* General Body Styling */
-body {
-    font-family: 'Inter', sans-serif;
-    background-color: #f8f9fa;
-    color: #212529;
-    line-height: 1.6;
-}
-
-/* Main content area styling */
-.main .block-container {
-    padding: 3rem 5rem;
-    max-width: 1200px;
-    margin: 0 auto;
-}
-
-/* Header Styling */
-h1 {
-    color: #1a1a1a;
-    text-align: center;
-    margin-bottom: 2.5rem;
-    font-size: 6em;
-    font-weight: 700;
-    letter-spacing: -0.5px;
-    background: linear-gradient(120deg, #2b5876, #4e4376);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: #000000;
-}
-
-/* Sidebar Enhancement */
-.stSidebar {
-    background-color: #ffffff;
-    padding: 2rem;
-    border-right: 1px solid rgba(0,0,0,0.1);
-    box-shadow: 2px 0 8px rgba(0,0,0,0.05);
-}
-
-/* Input Fields Enhancement */
-.stSelectbox div[data-baseweb="select"],
-.stNumberInput div[data-baseweb="input"] {
-    background: #ffffff;
-    border: 1px solid #e0e0e0;
-    border-radius: 8px;
-    transition: all 0.3s ease;
-}
-
-.stSelectbox div[data-baseweb="select"]:hover,
-.stNumberInput div[data-baseweb="input"]:hover {
-    border-color: #4e4376;
-    box-shadow: 0 0 0 3px rgba(78, 67, 118, 0.1);
-}
-
-/* Hybrid Score Box Enhancement */
-.hybrid-score-box {
-    background: rgba(255, 255, 255, 0.9);
-    backdrop-filter: blur(10px);
-    border-radius: 15px;
-    padding: 2em;
-    margin: 2rem 0;
-    box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-    border: 1px solid rgba(255,255,255,0.2);
-    transition: transform 0.3s ease;
-}
-
-.hybrid-score-box:hover {
-    transform: translateY(-5px);
-}
-
-/* Risk Category Styling Enhancement */
-.very-low-risk {
-    background: #2ecc40 !important;
-    color: #fff !important;
-}
-.low-risk {
-    background: #3498db !important;
-    color: #fff !important;
-}
-.moderate-risk {
-    background: #ffe066 !important;
-    color: #18191a !important;
-}
-.high-risk {
-    background: #e74c3c !important;
-    color: #fff !important;
-}
-.very-high-risk {
-    background: #636363 !important;
-    color: #fff !important;
-}
-
-/* Recommendation Header Enhancement */
-.recommendation-header {
-    font-weight: 700;
-    padding: 12px 20px;
-    border-radius: 8px;
-    margin-bottom: 20px;
-    display: block;
-    font-size: 1.1em;
-    transition: all 0.3s ease;
-}
-
-/* Risk-specific recommendation headers */
-.recommendation-very-low {
-    background: linear-gradient(135deg, #d4edda 0%, #c3e6cb 100%);
-    color: #155724;
-    border-left: 5px solid #28a745;
-}
-
-.recommendation-low {
-    background: linear-gradient(135deg, #cce5ff 0%, #b8daff 100%);
-    color: #004085;
-    border-left: 5px solid #007bff;
-}
-
-.recommendation-moderate {
-    background: linear-gradient(135deg, #fff3cd 0%, #ffeeba 100%);
-    color: #856404;
-    border-left: 5px solid #ffc107;
-}
-
-.recommendation-high {
-    background: linear-gradient(135deg, #f8d7da 0%, #f5c6cb 100%);
-    color: #721c24;
-    border-left: 5px solid #dc3545;
-}
-
-.recommendation-very-high {
-    background: linear-gradient(135deg, #e2e3e5 0%, #d6d8db 100%);
-    color: #1b1e21;
-    border-left: 5px solid #343a40;
-}
-
-/* Button Enhancement */
-.stButton > button {
-    background: linear-gradient(135deg, #2b5876 0%, #4e4376 100%);
-    color: white;
-    padding: 0.8em 2em;
-    border-radius: 8px;
-    border: none;
-    font-weight: 500;
-    letter-spacing: 0.5px;
-    transition: all 0.3s ease;
-}
-
-.stButton > button:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 5px 15px rgba(78, 67, 118, 0.4);
-}
-
-/* Table Enhancement */
-table {
-    width: 100%;
-    border-collapse: separate;
-    border-spacing: 0;
-    margin-bottom: 1.5rem;
-    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-    border-radius: 12px;
-    overflow: hidden;
-    background: white;
-    border: 1px solid #e0e0e0;
-}
-
-/* Table Header Enhancement */
-th {
-    background: #18191a !important;
-    color: #ffffff !important;
-    font-weight: 600;
-    text-transform: uppercase;
-    font-size: 0.9em;
-    letter-spacing: 0.5px;
-    padding: 16px 20px;
-    border-bottom: 2px solid #FFB366;  /* Darker orange border */
-    position: relative;
-    transition: all 0.3s ease;
-}
-
-/* Table Header Hover Effect */
-th:hover {
-    background: #FFD5AA;  /* Slightly darker on hover */
-}
-
-/* Table Cell Enhancement */
-td {
-    padding: 14px 20px;
-    border-bottom: 1px solid #eee;
-    color: #495057;
-    font-size: 0.95em;
-    transition: background-color 0.2s ease;
-}
-
-/* Zebra Striping Enhancement */
-tr:nth-child(even) {
-    background-color: #f8f9fa;
-}
-
-/* Row Hover Effect */
-tr:hover td {
-    background-color: #f0f4f8;
-}
-
-/* Last Row Styling */
-tr:last-child td {
-    border-bottom: none;
-}
-
-/* First Column Enhancement */
-td:first-child, th:first-child {
-    padding-left: 24px;
-}
-
-/* Last Column Enhancement */
-td:last-child, th:last-child {
-    padding-right: 24px;
-}
-
-/* Table Caption Styling (if any) */
-caption {
-    padding: 12px;
-    font-weight: 600;
-    color: #495057;
-    background: #fff;
-    border-bottom: 1px solid #eee;
-}
-
-/* Responsive Table */
-@media screen and (max-width: 768px) {
-    table {
-        display: block;
-        overflow-x: auto;
-        white-space: nowrap;
-    }
-}
-
-/* Expander Enhancement */
-.streamlit-expander {
-    border: 1px solid #e0e0e0;
-    border-radius: 10px;
-    background: white;
-    transition: all 0.3s ease;
-}
-
-.streamlit-expander:hover {
-    box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-}
-
-/* Dose Box Enhancement */
-.dose-box {
-    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-    border-radius: 8px;
-    padding: 1rem;
-    margin: 1rem 0;
-    border: 1px solid #e0e0e0;
-}
-
-.dose-info {
-    color: #ffffff !important;
-    font-weight: 500;
-    font-size: 0.9em;
-}
-
-/* --- Flowchart CSS --- */
-/* Flowchart Container */
-.methodology-flowchart {
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-    gap: 20px;
-    padding: 30px;
-    background: rgba(255, 255, 255, 0.9);
-    border-radius: 15px;
-    box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-    margin: 30px 0;
-    width: 100%; /* Ensure it takes available width */
-    box-sizing: border-box; /* Include padding and border in the element's total width and height */
-}
-
-/* Flowchart Node */
-.flowchart-node {
-    width: 90%; /* Use percentage for responsiveness */
-    max-width: 600px;
-    padding: 20px;
-    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-    border-radius: 10px;
-    border: 2px solid #dee2e6;
-    text-align: center;
-    position: relative;
-    transition: all 0.3s ease;
-    box-sizing: border-box; /* Include padding and border in the element's total width and height */
-}
-
-.flowchart-node:hover {
-    transform: translateY(-5px);
-    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-}
-
-/* Flowchart Arrow */
-.flowchart-arrow {
-    width: 2px;
-    height: 30px;
-    background: #6c757d;
-    position: relative;
-}
-
-/* Flowchart Arrowhead: Creates the triangle shape at the end of the arrow */
-.flowchart-arrow::after {
-    content: '';
-    position: absolute;
-    bottom: 0;
-    left: 50%;
-    transform: translateX(-50%);
-    border-width: 8px 6px 0 6px;
-    border-style: solid;
-    border-color: #6c757d transparent transparent transparent;
-}
-
-/* Node Title */
-.node-title {
-    font-weight: 600;
-    color: #2b5876;
-    margin-bottom: 10px;
-    font-size: 1.1em;
-}
-
-/* Node Content */
-.node-content {
-    color: #495057;
-    font-size: 0.95em;
-    line-height: 1.5;
-}
-/* --- End Flowchart CSS --- */
-
-/* Loading Animation */
-@keyframes pulse {
-    0% { opacity: 1; }
-    50% { opacity: 0.5; }
-    100% { opacity: 1; }
-}
-
-@keyframes spin {
-    0% { transform: rotate(0deg); }
-    100% { transform: rotate(360deg); }
-}
-
-.loading-spinner {
-    display: inline-block;
-    width: 20px;
-    height: 20px;
-    border: 3px solid #f3f3f3;
-    border-top: 3px solid #ff8800;
-    border-radius: 50%;
-    animation: spin 1s linear infinite;
-    margin-right: 10px;
-}
-
-.loading-text {
-    animation: pulse 2s infinite;
-    color: #ff8800;
-    font-weight: 600;
-}
-
-/* Progress Bar Enhancement */
-.stProgress > div > div > div > div {
-    background-color: #ff8800 !important;
-}
-
-/* Success/Error Message Animations */
-@keyframes slideIn {
-    from { transform: translateY(-20px); opacity: 0; }
-    to { transform: translateY(0); opacity: 1; }
-}
-
-.success-message {
-    animation: slideIn 0.5s ease-out;
-    background: linear-gradient(135deg, #d4edda 0%, #c3e6cb 100%);
-    border-left: 5px solid #28a745;
-    padding: 15px;
-    border-radius: 8px;
-    margin: 10px 0;
-}
-
-.error-message {
-    animation: slideIn 0.5s ease-out;
-    background: linear-gradient(135deg, #f8d7da 0%, #f5c6cb 100%);
-    border-left: 5px solid #dc3545;
-    padding: 15px;
-    border-radius: 8px;
-    margin: 10px 0;
-}
-
-/* Card Hover Effects */
-.interactive-card {
-    transition: all 0.3s ease;
-    cursor: pointer;
-    border: 2px solid transparent;
-}
-
-.interactive-card:hover {
-    transform: translateY(-5px);
-    box-shadow: 0 10px 25px rgba(0,0,0,0.2);
-    border-color: #ff8800;
-}
-
-/* Gradient Text Animation */
-@keyframes gradientShift {
-    0% { background-position: 0% 50%; }
-    50% { background-position: 100% 50%; }
-    100% { background-position: 0% 50%; }
-}
-
-.gradient-text {
-    background: linear-gradient(-45deg, #ff8800, #ffb366, #ff6b35, #ff8800);
-    background-size: 400% 400%;
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    animation: gradientShift 3s ease infinite;
-    font-weight: 700;
-}
-
-/* Floating Action Button */
-.fab {
-    position: fixed;
-    bottom: 20px;
-    right: 20px;
-    width: 60px;
-    height: 60px;
-    background: linear-gradient(135deg, #ff8800, #ffb366);
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    color: white;
-    font-size: 24px;
-    box-shadow: 0 4px 15px rgba(255, 136, 0, 0.4);
-    transition: all 0.3s ease;
-    z-index: 1000;
-}
-
-.fab:hover {
-    transform: scale(1.1);
-    box-shadow: 0 6px 20px rgba(255, 136, 0, 0.6);
-}
-
-/* Tooltip Enhancement */
-.tooltip {
-    position: relative;
-    display: inline-block;
-}
-
-.tooltip .tooltiptext {
-    visibility: hidden;
-    width: 200px;
-    background-color: #333;
-    color: #fff;
-    text-align: center;
-    border-radius: 6px;
-    padding: 8px;
-    position: absolute;
-    z-index: 1;
-    bottom: 125%;
-    left: 50%;
-    margin-left: -100px;
-    opacity: 0;
-    transition: opacity 0.3s;
-    font-size: 12px;
-}
-
-.tooltip:hover .tooltiptext {
-    visibility: visible;
-    opacity: 1;
-}
-
-/* Sidebar Section Headers */
-.sidebar-section {
-    background: linear-gradient(135deg, #2b5876, #4e4376);
-    color: white;
-    padding: 10px 15px;
-    border-radius: 8px;
-    margin: 15px 0 10px 0;
-    font-weight: 600;
-    text-align: center;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-}
-
-/* Input Field Focus Effects */
-.stSelectbox div[data-baseweb="select"]:focus-within,
-.stNumberInput div[data-baseweb="input"]:focus-within {
-    border-color: #ff8800 !important;
-    box-shadow: 0 0 0 3px rgba(255, 136, 0, 0.2) !important;
-    transform: scale(1.02);
-}
-
-/* Risk Score Visualization */
-.risk-meter {
-    width: 100%;
-    height: 20px;
-    background: linear-gradient(90deg, #2ecc40 0%, #3498db 25%, #ffe066 50%, #e74c3c 75%, #636363 100%);
-    border-radius: 10px;
-    position: relative;
-    margin: 10px 0;
-    overflow: hidden;
-}
-
-.risk-indicator {
-    position: absolute;
-    top: -2px;
-    width: 4px;
-    height: 24px;
-    background: #fff;
-    border-radius: 2px;
-    box-shadow: 0 0 5px rgba(0,0,0,0.3);
-    transition: left 0.5s ease;
-}
-
-/* Notification Badge */
-.notification-badge {
-    background: #e74c3c;
-    color: white;
-    border-radius: 50%;
-    padding: 2px 6px;
-    font-size: 10px;
-    position: absolute;
-    top: -5px;
-    right: -5px;
-    min-width: 15px;
-    text-align: center;
-}
-
-/* Responsive Design Improvements */
-@media (max-width: 768px) {
-    .main .block-container {
-        padding: 1rem !important;
-        margin-top: 1rem !important;
-    }
-    
-    .animated-title {
-        font-size: 2.5em !important;
-    }
-    
-    .sidebar-section {
-        font-size: 0.9em;
-        padding: 8px 12px;
-    }
-}
-
-/* Dark Mode Toggle */
-.dark-mode-toggle {
-    position: fixed;
-    top: 20px;
-    right: 20px;
-    z-index: 1000;
-}
-
-/* Data Visualization Enhancements */
-.chart-container {
-    background: rgba(255, 255, 255, 0.05);
-    border-radius: 12px;
-    padding: 20px;
-    margin: 15px 0;
-    border: 1px solid rgba(255, 255, 255, 0.1);
-    backdrop-filter: blur(10px);
-}
-
-/* Status Indicators */
-.status-indicator {
-    display: inline-block;
-    width: 12px;
-    height: 12px;
-    border-radius: 50%;
-    margin-right: 8px;
-}
-
-.status-online { background: #2ecc40; }
-.status-warning { background: #f39c12; }
-.status-error { background: #e74c3c; }
-
-/* Enhanced Buttons */
-.btn-primary {
-    background: linear-gradient(135deg, #ff8800, #ffb366);
-    color: white;
-    border: none;
-    padding: 12px 24px;
-    border-radius: 8px;
-    font-weight: 600;
-    transition: all 0.3s ease;
-    cursor: pointer;
-}
-
-.btn-primary:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 5px 15px rgba(255, 136, 0, 0.4);
-}
-
-.btn-secondary {
-    background: linear-gradient(135deg, #6c757d, #495057);
-    color: white;
-    border: none;
-    padding: 10px 20px;
-    border-radius: 6px;
-    font-weight: 500;
-    transition: all 0.3s ease;
-    cursor: pointer;
-}
-
-.btn-secondary:hover {
-    transform: translateY(-1px);
-    box-shadow: 0 3px 10px rgba(108, 117, 125, 0.4);
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Add tabs for different views
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
+# All theme CSS (app, risk meter, timeline tables) lives in ponv_core/static/theme.css and is sent
+# as one versioned block, which the browser keeps and Streamlit then refers to by hash
+st.markdown(assets.stylesheet(), unsafe_allow_html=True)
+
+# Add tabs for different views. Only the selected view is built and sent: switching tabs reruns
+# the app and each tab's .open tells its section whether to render. The main interface always
+# renders, since it hosts the sidebar inputs and the models every other view reads.
+tab_labels = [
     "Main Interface",
     "Detailed Scoring Guide",
     "Model Training Timeline and Methodological Summary",
     "References",
     "Global Feature Importance"
-])
+]
+# st.tabs(on_change=...) and Tab.open need Streamlit 1.66 (requirements.txt); on a build without
+# them every tab is built on every run, as before lazy tabs
+LAZY_TABS = "on_change" in inspect.signature(st.tabs).parameters
+if LAZY_TABS:
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(tab_labels, key='active_tab', on_change='rerun')
+else:
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(tab_labels)
+
+
+def tab_open(tab):
+    # False only when Streamlit reports the tab as not selected
+    return getattr(tab, "open", None) is not False
 
 with tab1:
     st.markdown("""
@@ -740,45 +102,530 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
-    # ------------------------- PATIENT FACTORS -------------------------
-    st.sidebar.markdown("""
+    # Hybrid score, risk meter and recommendations are drawn here by risk_panel() further down
+    risk_meter_slot = st.container()
+    startup.mark("first_paint")
+
+
+    feature_names = list(modeling.FEATURE_NAMES)
+    run_timer.lap("header")
+
+
+    # ------------------------- SYNTHETIC DATA -------------------------
+    # Use 500 synthetic samples for faster demo
+    @st.cache_data
+    def generate_synthetic_data(n_samples=500, n_features=23):
+        return modeling.generate_synthetic_data(n_samples, n_features)
+
+    # Generate synthetic data
+    n_features = 23
+    X, y = generate_synthetic_data(500, n_features)
+
+    # Split and preprocess data
+    from sklearn.model_selection import train_test_split
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.3, random_state=42)
+    # Lineage ids of the data and each split: the cached steps below are keyed by these instead of
+    # having Streamlit hash their array arguments on every rerun
+    data_ids = modeling.synthetic_dataset_ids(500, n_features)
+
+    # Add feature scaling and SMOTE for class balancing (fitted on the training split only)
+    scaler, X_train_scaled, X_train_balanced, y_train_balanced = modeling.fit_preprocess(X_train, y_train)
+    X_val_scaled = scaler.transform(X_val)
+    run_timer.lap("preprocessing")
+
+    # Tuned hyperparameters (python -m ponv_core.tuning) override the hand-picked defaults when present
+    xgb_params, lgb_params = tuning.load_best_params()
+
+    # Cache model training so it only runs when data or parameters change
+    @st.cache_resource
+    def train_models(data_id, _X_train_balanced, _y_train_balanced, xgb_params=None, lgb_params=None):
+        return modeling.train_models(_X_train_balanced, _y_train_balanced, xgb_params, lgb_params)
+
+    # Train models (cached)
+    xgb_model, lgb_model = train_models(data_ids["balanced"], X_train_balanced, y_train_balanced, xgb_params, lgb_params)
+    # Content hash (about 90 KB of arrays): unlike the lineage ids, it changes when the data or
+    # preprocessing code does, so registry entries and on-disk caches never go stale
+    model_version = modeling.model_version(X_train_balanced, y_train_balanced, xgb_params, lgb_params)
+    startup.mark("models_ready")
+    run_timer.lap("training")
+
+    # ------------------------- MODEL REGISTRY -------------------------
+    # Schema creation and migration run once per server process (the start-up warm-up does them
+    # before the first user arrives), not once per session
+    @st.cache_resource
+    def prepare_database(db_path):
+        return db.prepare_database(db_path)
+
+    db_path = prepare_database(db.DEFAULT_DB_PATH)
+
+    @st.cache_resource
+    def get_model_registry(db_path):
+        return registry.ModelRegistry(db_path)
+
+    model_registry = get_model_registry(db_path)
+
+    # The app's own models are registered once per version, with validation AUCs and the fingerprint
+    # of the data they were trained on
+    @st.cache_resource
+    def register_app_model(model_version, _registry, _scorer, _X, _y, _X_val_scaled, _y_val):
+        from sklearn.metrics import roc_auc_score
+        metrics = {}
+        if len(np.unique(_y_val)) >= 2:
+            metrics = {f"val_auc_{name}": float(roc_auc_score(_y_val, model.predict_proba(_X_val_scaled)[:, 1]))
+                       for name, model in (("xgb", _scorer.xgb_model), ("lgb", _scorer.lgb_model))}
+        return _registry.register(_scorer, metrics, cache.dataset_hash(_X, _y)[:16],
+                                  params={"xgb": xgb_params, "lgb": lgb_params}, source="app")
+
+    register_app_model(model_version, model_registry, service.Scorer(scaler, xgb_model, lgb_model, model_version),
+                       X, y, X_val_scaled, y_val)
+
+    # A version activated with python -m ponv_core.registry is served instead of the app's own models:
+    # one pointer lookup per run, each version loaded once per process, no retraining. The synthetic
+    # splits are moved onto its scaler so the evaluation below describes the model being served.
+    @st.cache_resource
+    def load_registered_model(version, _registry):
+        return _registry.load(version)
+
+    served_from_registry = False
+    active_version = model_registry.active_version()
+    if active_version is not None and active_version != model_version:
+        try:
+            served = load_registered_model(active_version, model_registry)
+        except (registry.RegistryError, OSError) as e:
+            st.error(f"Active model {active_version} could not be loaded ({e}); serving the app's own model.")
+        else:
+            X_train_balanced = served.scaler.transform(scaler.inverse_transform(X_train_balanced))
+            X_val_scaled = served.scaler.transform(X_val)
+            scaler, xgb_model, lgb_model, model_version = served.scaler, served.xgb_model, served.lgb_model, served.model_version
+            served_from_registry = True
+
+
+    
+
+
+    # ------------------------- CHART RENDERING -------------------------
+    # Charts are sent as Plotly figure specs and drawn in the browser (zoom/hover need no rerun),
+    # with long curves downsampled to a bounded number of points. Static matplotlib is the
+    # fallback when plotly is not installed or PONV_CHARTS=matplotlib.
+    USE_PLOTLY = charts.use_plotly()
+
+    @st.cache_data
+    def roc_chart_spec(key, _curves, title):
+        return charts.roc_spec(_curves, title)
+
+    # Static fallback: figures are drawn off the pyplot registry, saved to PNG bytes and released
+    # at once, and the bytes are memoized by content key, so reruns neither redraw nor leak figures.
+    def roc_png(key, curves, title, figsize=(5, 3)):
+        def draw(fig_roc):
+            ax_roc = fig_roc.subplots()
+            fig_roc.patch.set_facecolor('#ffffff')
+            ax_roc.set_facecolor('#ffffff')
+            for name, fpr, tpr, roc_auc in curves:
+                ax_roc.plot(fpr, tpr, label=f"{name} (AUC = {roc_auc:.3f})")
+            ax_roc.plot([0, 1], [0, 1], 'k--', label='Chance (AUC = 0.50)')
+            ax_roc.set_xlabel("False Positive Rate")
+            ax_roc.set_ylabel("True Positive Rate")
+            ax_roc.set_title(title)
+            ax_roc.legend(loc="lower right", fontsize='small')
+            fig_roc.tight_layout()
+        return figures.render_png(figures.content_key('roc', key, title, figsize), draw, figsize=figsize)
+
+    # key names the data and model behind the curves (lineage id + model version)
+    def show_roc(key, curves, title, figsize=(5, 3)):
+        if USE_PLOTLY:
+            st.plotly_chart(roc_chart_spec(key, curves, title), width="stretch")
+        else:
+            st.image(roc_png(key, curves, title, figsize))
+
+
+    # ------------------------- MODEL EVALUATION -------------------------
+    from sklearn.metrics import roc_curve, auc
+    st.subheader("Model AUC Scores")
+
+    auc_xgb_train, auc_lgb_train = None, None
+    auc_xgb_val, auc_lgb_val = None, None
+    roc_train, roc_val = None, None
+
+    if len(np.unique(y_train_balanced)) < 2:
+        st.warning("Training data contains only one class. Cannot calculate ROC curves and AUC for training data.")
+    else:
+        fpr_xgb_train, tpr_xgb_train, _ = roc_curve(y_train_balanced, xgb_model.predict_proba(X_train_balanced)[:, 1])
+        fpr_lgb_train, tpr_lgb_train, _ = roc_curve(y_train_balanced, lgb_model.predict_proba(X_train_balanced)[:, 1])
+        auc_xgb_train = auc(fpr_xgb_train, tpr_xgb_train)
+        auc_lgb_train = auc(fpr_lgb_train, tpr_lgb_train)
+        roc_train = [
+            ('LightGBM', fpr_lgb_train, tpr_lgb_train, auc_lgb_train),
+            ('XGBoost', fpr_xgb_train, tpr_xgb_train, auc_xgb_train),
+        ]
+
+
+    # Validation probabilities are computed once and shared by the ROC, threshold and metric sections
+    proba_xgb_val = xgb_model.predict_proba(X_val_scaled)[:, 1]
+    proba_lgb_val = lgb_model.predict_proba(X_val_scaled)[:, 1]
+
+    if len(np.unique(y_val)) < 2:
+        st.warning("Validation data contains only one class. Cannot calculate ROC curves and AUC for validation data.")
+    else:
+        fpr_xgb_val, tpr_xgb_val, _ = roc_curve(y_val, proba_xgb_val)
+        fpr_lgb_val, tpr_lgb_val, _ = roc_curve(y_val, proba_lgb_val)
+        auc_xgb_val = auc(fpr_xgb_val, tpr_xgb_val)
+        auc_lgb_val = auc(fpr_lgb_val, tpr_lgb_val)
+        roc_val = [
+            ('LightGBM', fpr_lgb_val, tpr_lgb_val, auc_lgb_val),
+            ('XGBoost', fpr_xgb_val, tpr_xgb_val, auc_xgb_val),
+        ]
+
+
+    # Create the DataFrame with calculated AUC values
+    df_auc = pd.DataFrame({
+        'Model': ['LightGBM', 'XGBoost'],
+        'Training AUC': [auc_lgb_train, auc_xgb_train],
+        'Validation AUC': [auc_lgb_val, auc_xgb_val]
+    })
+    for col in ['Training AUC', 'Validation AUC']:
+        df_auc[col] = df_auc[col].apply(lambda x: '{:.3f}'.format(x) if x is not None else 'N/A')
+
+    # Bootstrap 95% CIs (2,000 replicates, rank-based AUC computed for all replicates in batch)
+    # key names the outcomes and predictions, e.g. (validation id, model version, model name)
+    @st.cache_data(show_spinner="Bootstrapping confidence intervals...")
+    def run_bootstrap(key, _y_true, _proba, threshold=0.5, n_boot=2000):
+        return bootstrap.bootstrap_ci(_y_true, _proba, threshold=threshold, n_boot=n_boot)
+
+    def format_ci(estimate, decimals=3):
+        point, lo, hi = estimate
+        return f"{point:.{decimals}f} (95% CI {lo:.{decimals}f}–{hi:.{decimals}f})"
+
+    if len(np.unique(y_val)) >= 2:
+        val_auc_ci = {
+            'LightGBM': run_bootstrap((data_ids["val"], model_version, 'LightGBM'), y_val, proba_lgb_val)['AUC'],
+            'XGBoost': run_bootstrap((data_ids["val"], model_version, 'XGBoost'), y_val, proba_xgb_val)['AUC'],
+        }
+        df_auc['Validation AUC'] = [format_ci(val_auc_ci[m]) for m in df_auc['Model']]
+    
+    # Enhanced table display with status indicators
+    st.markdown("""
+    <div class='chart-container'>
+        <h4 style='margin-bottom: 15px; color: #ff8800;'>📊 Model Performance Metrics</h4>
+    """, unsafe_allow_html=True)
+    
+    # Create styled table with status indicators
+    for idx, row in df_auc.iterrows():
+        train_auc = float(row['Training AUC']) if row['Training AUC'] != 'N/A' else 0
+        val_auc = float(row['Validation AUC'].split()[0]) if row['Validation AUC'] != 'N/A' else 0
+        
+        # Determine status based on AUC values
+        if val_auc >= 0.8:
+            status_class = "status-online"
+            status_text = "Excellent"
+        elif val_auc >= 0.7:
+            status_class = "status-warning"
+            status_text = "Good"
+        else:
+            status_class = "status-error"
+            status_text = "Needs Improvement"
+        
+        st.markdown(f"""
+        <div style='display: flex; align-items: center; padding: 10px; margin: 5px 0; background: rgba(255,255,255,0.05); border-radius: 8px;'>
+            <div class='status-indicator {status_class}'></div>
+            <div style='flex: 1;'>
+                <strong>{row['Model']}</strong><br>
+                <small>Training AUC: {row['Training AUC']} | Validation AUC: {row['Validation AUC']}</small>
+            </div>
+            <div style='color: #ff8800; font-weight: 600;'>{status_text}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if roc_train is not None:
+            show_roc((data_ids["balanced"], model_version), roc_train, "Training ROC Curve (LightGBM & XGBoost)")
+    with col2:
+        if roc_val is not None:
+            show_roc((data_ids["val"], model_version), roc_val, "Validation ROC Curve (LightGBM & XGBoost)")
+
+
+    run_timer.lap("evaluation.roc")
+
+    # ------------------------- CROSS-VALIDATION (k=5) -------------------------
+    # Folds run in a process pool and are cached on disk by dataset hash, so only the first run
+    # after the data changes pays for the 10 model fits; the lineage id keys the in-memory cache.
+    @st.cache_data(show_spinner="Running 5-fold cross-validation...")
+    def run_cross_validation(data_id, _X, _y, k=5, xgb_params=None, lgb_params=None):
+        return cv.cross_validate(_X, _y, k=k, xgb_params=xgb_params, lgb_params=lgb_params)
+
+    st.subheader("Cross-Validated AUC (k=5, SMOTE within each fold)")
+    cv_results = run_cross_validation(data_ids["data"], X, y, xgb_params=xgb_params, lgb_params=lgb_params)
+    df_cv = cv.cv_summary(cv_results)
+    df_cv['AUC (mean ± SD)'] = [
+        '{:.3f} ± {:.3f}'.format(m, s) if pd.notna(s) else ('{:.3f}'.format(m) if pd.notna(m) else 'N/A')
+        for m, s in zip(df_cv['Mean AUC'], df_cv['SD AUC'])
+    ]
+    st.table(df_cv[['Model', 'AUC (mean ± SD)', 'Folds']])
+
+    run_timer.lap("evaluation.cross_validation")
+
+    # The slider's default; the upload panel reads it even when the validation section below is skipped
+    decision_threshold = 0.5
+
+    # Calculate and show metrics for LightGBM and XGBoost only
+    st.subheader("Model Performance Metrics (Validation Data)")
+    if len(np.unique(y_val)) < 2:
+        st.warning("Validation data contains only one class. Cannot calculate performance metrics.")
+    else:
+        # Threshold tables are built once per model and validation set (one sort + cumulative sums);
+        # moving the slider afterwards is a table lookup, with no re-prediction or rescoring.
+        @st.cache_data
+        def build_threshold_tables(key, _y_val, _proba_lgb_val, _proba_xgb_val, step=0.01):
+            tables = {}
+            for model_name, proba in [('LightGBM', _proba_lgb_val), ('XGBoost', _proba_xgb_val)]:
+                table = thresholds.threshold_table(_y_val, proba)
+                tables[model_name] = (table, thresholds.slider_index(table, step))
+            return tables
+
+        val_tables = build_threshold_tables((data_ids["val"], model_version), y_val, proba_lgb_val, proba_xgb_val)
+
+        # Bootstrap CIs of sensitivity/specificity at every slider position, from one set of 2,000
+        # resamples per model, so moving the slider is a lookup here too
+        @st.cache_data(show_spinner="Bootstrapping confidence intervals...")
+        def run_threshold_bootstrap(key, _y_true, _proba, step=0.01, n_boot=2000):
+            return bootstrap.bootstrap_grid(_y_true, _proba, thresholds.slider_grid(step), n_boot=n_boot)
+
+        # Youden's cutoffs (maximise sensitivity + specificity - 1) on the validation ROC
+        youden_rows = []
+        for model_name, (table, _) in val_tables.items():
+            best = thresholds.youden_cutoff(table)
+            youden_rows.append({
+                'Model': model_name,
+                "Youden's Cutoff": '{:.3f}'.format(best['Threshold']),
+                'Sensitivity': '{:.2f}'.format(best['Sensitivity']),
+                'Specificity': '{:.2f}'.format(best['Specificity']),
+                'Youden J': '{:.3f}'.format(best['Youden J']),
+            })
+        st.write("Youden's optimal cutoffs (validation data):")
+        st.table(pd.DataFrame(youden_rows))
+
+        decision_threshold = st.slider(
+            "Decision threshold (predict PONV when probability ≥ threshold)",
+            0.0, 1.0, 0.5, 0.01, key='decision_threshold'
+        )
+        metric_rows = []
+        for model_name, (table, index) in val_tables.items():
+            row = table.iloc[index[int(round(decision_threshold / 0.01))]]
+            metric_rows.append({
+                'Model': model_name,
+                'Accuracy': row['Accuracy'],
+                'Precision': row['PPV'],
+                'Recall': row['Sensitivity'],
+                'Specificity': row['Specificity'],
+                'NPV': row['NPV'],
+                'F1-score': row['F1-score'],
+            })
+        df_calculated_metrics = pd.DataFrame(metric_rows)
+        for col in ['Accuracy', 'Precision', 'Recall', 'Specificity', 'NPV', 'F1-score']:
+            df_calculated_metrics[col] = df_calculated_metrics[col].apply(lambda x: '{:.2f}'.format(x) if pd.notna(x) else 'N/A')
+        st.table(df_calculated_metrics)
+
+        slider_position = int(round(decision_threshold / 0.01))
+        df_ci = pd.DataFrame([
+            {'Model': model_name, **{metric: format_ci(ci, 2) for metric, ci in bootstrap.ci_at(
+                run_threshold_bootstrap((data_ids["val"], model_version, model_name), y_val, proba), slider_position).items()}}
+            for model_name, proba in [('LightGBM', proba_lgb_val), ('XGBoost', proba_xgb_val)]
+        ])
+        st.write("Bootstrap 95% confidence intervals at the selected threshold (2,000 replicates):")
+        st.table(df_ci)
+
+
+    run_timer.lap("evaluation.thresholds")
+
+    # ------------------------- PROBABILITY CALIBRATION -------------------------
+    # Platt and isotonic calibrators are fitted once per model version on the held-out validation
+    # split and persisted next to it; applying one afterwards is a single array operation.
+    calibrators = None
+    calibration_method = "None"
+    if len(np.unique(y_val)) >= 2:
+        @st.cache_resource
+        def load_calibration(model_version, val_id, _y_val, _proba_lgb_val, _proba_xgb_val):
+            return calibration.load_or_fit(model_version, _y_val, {'LightGBM': _proba_lgb_val, 'XGBoost': _proba_xgb_val})
+
+        calibrators, calibration_report = load_calibration(model_version, data_ids["val"], y_val, proba_lgb_val, proba_xgb_val)
+
+        @st.cache_data
+        def reliability_chart_spec(model_version, model_name, _report):
+            return charts.reliability_spec(_report, model_name)
+
+        with st.expander("Probability Calibration (Platt Scaling / Isotonic Regression)"):
+            df_brier = pd.DataFrame([
+                {'Model': model_name, **{variant: '{:.4f}'.format(calibration_report[model_name][variant]['brier'])
+                                         for variant in ['Raw', 'Platt', 'Isotonic']}}
+                for model_name in ['LightGBM', 'XGBoost']
+            ])
+            st.write("Brier score on validation data (lower is better; calibrated scores are in-sample):")
+            st.table(df_brier)
+
+            if USE_PLOTLY:
+                col1, col2 = st.columns(2)
+                for col, model_name in zip([col1, col2], ['LightGBM', 'XGBoost']):
+                    with col:
+                        st.plotly_chart(reliability_chart_spec(model_version, model_name, calibration_report[model_name]),
+                                        width="stretch")
+            else:
+                def draw_reliability(fig_cal):
+                    axes_cal = fig_cal.subplots(1, 2)
+                    for ax_cal, model_name in zip(axes_cal, ['LightGBM', 'XGBoost']):
+                        for variant in ['Raw', 'Platt', 'Isotonic']:
+                            curve = calibration_report[model_name][variant]['curve']
+                            ax_cal.plot(curve['Mean Predicted'], curve['Observed Rate'], marker='o', label=variant)
+                        ax_cal.plot([0, 1], [0, 1], 'k--', label='Perfect calibration')
+                        ax_cal.set_xlabel("Mean Predicted Probability")
+                        ax_cal.set_ylabel("Observed PONV Rate")
+                        ax_cal.set_title(f"Reliability Curve ({model_name})")
+                        ax_cal.legend(loc="upper left", fontsize='small')
+                    fig_cal.tight_layout()
+                st.image(figures.render_png(figures.content_key('reliability', model_version), draw_reliability, figsize=(10, 4)))
+
+            calibration_method = st.selectbox(
+                "Calibrate predicted probabilities with", ["None", "Platt", "Isotonic"], key='calibration_method'
+            )
+
+
+    run_timer.lap("evaluation.calibration")
+
+    # ------------------------- DECISION CURVE ANALYSIS -------------------------
+    # The hybrid score is mapped to a probability by Platt scaling on the training split, so it can
+    # be compared with both models on the net-benefit scale.
+    @st.cache_resource
+    def fit_hybrid_calibrator(train_id, _X_train, _y_train):
+        return calibration.fit_calibrator(_y_train, scoring.hybrid_score_matrix(_X_train), "Platt")
+
+    # Net benefit for every strategy over ~200 threshold probabilities, persisted per dataset hash and
+    # kept in memory per key (lineage id of the outcomes + model version)
+    @st.cache_data
+    def run_decision_curves(key, _y_true, _proba_by_strategy):
+        return dca.cached_decision_curves(_y_true, _proba_by_strategy)
+
+    @st.cache_data
+    def decision_curve_chart_spec(curves, title):
+        return charts.decision_curve_spec(curves, title)
+
+    def decision_curves_png(curves, title):
+        def draw(fig_dca):
+            ax_dca = fig_dca.subplots()
+            for strategy in ['LightGBM', 'XGBoost', 'Hybrid Score']:
+                ax_dca.plot(curves['Threshold'], curves[strategy], label=strategy)
+            ax_dca.plot(curves['Threshold'], curves['Treat All'], color='grey', label='Treat All')
+            ax_dca.plot(curves['Threshold'], curves['Treat None'], 'k--', label='Treat None')
+            top = max(curves[['LightGBM', 'XGBoost', 'Hybrid Score', 'Treat All']].max().max(), 0.05)
+            ax_dca.set_ylim(-0.05, top * 1.1)
+            ax_dca.set_xlabel("Threshold Probability")
+            ax_dca.set_ylabel("Net Benefit")
+            ax_dca.set_title(title)
+            ax_dca.legend(loc="upper right", fontsize='small')
+            ax_dca.grid(True)
+            fig_dca.tight_layout()
+        return figures.render_png(figures.content_key('dca', title, curves), draw, figsize=(8, 5))
+
+    def show_decision_curves(curves, title):
+        if USE_PLOTLY:
+            st.plotly_chart(decision_curve_chart_spec(curves, title), width="stretch")
+        else:
+            st.image(decision_curves_png(curves, title))
+
+    hybrid_calibrator = fit_hybrid_calibrator(data_ids["train"], X_train, y_train)
+    if len(np.unique(y_val)) >= 2:
+        with st.expander("Decision Curve Analysis (Validation Data)"):
+            curves_val = run_decision_curves(
+                (data_ids["val"], model_version), y_val,
+                {'LightGBM': proba_lgb_val, 'XGBoost': proba_xgb_val,
+                 'Hybrid Score': hybrid_calibrator(scoring.hybrid_score_matrix(X_val))}
+            )
+            show_decision_curves(curves_val, "Decision Curves (Validation Data)")
+
+
+    run_timer.lap("evaluation.decision_curves")
+
+    # ------------------------- PER-PATIENT EXPLANATION -------------------------
+    # Native TreeSHAP contributions (LightGBM pred_contrib / XGBoost pred_contribs), cached per
+    # feature vector and model version in a process-wide LRU shared by all sessions.
+    @st.cache_resource
+    def get_contribution_cache():
+        return explain.ContributionCache()
+
+    contribution_cache = get_contribution_cache()
+
+    # Uploaded cohorts bypass the per-row LRU, which is sized for live predictions and would evict a
+    # large cohort's rows before they are reused: the whole cohort is explained once per upload key
+    # Upload results are computed once per upload key with the steps the benchmarks time (ponv_core.evaluation)
+    @st.cache_data(show_spinner="Scoring uploaded data...")
+    def score_upload(key, _scorer, _X):
+        return evaluation.score_upload(_scorer, _X)
+
+    @st.cache_data(show_spinner="Explaining cohort predictions...")
+    def cohort_contributions(key, _xgb_model, _lgb_model, _X_scaled):
+        return explain.tree_contributions(_xgb_model, _lgb_model, _X_scaled)
+
+    # ------------------------- SHARED INFERENCE BROKER -------------------------
+    # Live predictions from every session go through one broker per model version: rows arriving within
+    # a couple of milliseconds of each other are scored with a single predict_proba call per model.
+    @st.cache_resource
+    def get_inference_broker(model_version, _scaler, _xgb_model, _lgb_model):
+        return batching.InferenceBroker(service.Scorer(_scaler, _xgb_model, _lgb_model, model_version).score_matrix)
+
+    inference_broker = get_inference_broker(model_version, scaler, xgb_model, lgb_model)
+
+    # ------------------------- LIVE RISK PANEL -------------------------
+    # Everything that depends on the sidebar inputs runs as one fragment, so changing an input reruns
+    # only the hybrid score, risk meter, recommendations, live prediction and scoring breakdown; the
+    # evaluation, upload and logging sections around it are left as they are. The panel fills slots
+    # reserved earlier on the page and publishes its inputs in st.session_state for the log section.
+    live_prediction_slot = st.container()
+
+    run_timer.lap("inference_setup")
+
+    # Fragments are timed per call (metrics.timed), so their own reruns are counted too
+    @st.fragment
+    @metrics.timed("risk_panel")
+    def risk_panel():
+        # ------------------------- PATIENT FACTORS -------------------------
+        st.sidebar.markdown("""
     <div style='font-weight: 600; color: #ff8800; margin: 15px 0 10px 0; border-bottom: 2px solid #ff8800; padding-bottom: 5px;'>
         👤 Patient Factors
     </div>
     """, unsafe_allow_html=True)
     
-    gender = st.sidebar.selectbox("Female Gender", ["No", "Yes"], help="Female patients have higher PONV risk")
-    smoker = st.sidebar.selectbox("Non-Smoker", ["No", "Yes"], help="Non-smokers have higher PONV risk")
-    history_ponv = st.sidebar.selectbox("History of PONV or Motion Sickness", ["No", "Yes"], help="Previous PONV episodes increase risk")
-    age = st.sidebar.slider("Age", 18, 80, 35, help="Age > 50 years increases PONV risk")
-    preop_anxiety = st.sidebar.selectbox("Preoperative Anxiety", ["No", "Yes"], help="Anxiety can increase PONV risk")
-    history_migraine = st.sidebar.selectbox("History of Migraine", ["No", "Yes"], help="Migraine history correlates with PONV")
-    obesity = st.sidebar.selectbox("BMI > 30", ["No", "Yes"], help="Obesity is a risk factor for PONV")
-
-    # ------------------------- SURGICAL FACTORS -------------------------
-    st.sidebar.markdown("""
+        gender = st.sidebar.selectbox("Female Gender", ["No", "Yes"], help="Female patients have higher PONV risk")
+        smoker = st.sidebar.selectbox("Non-Smoker", ["No", "Yes"], help="Non-smokers have higher PONV risk")
+        history_ponv = st.sidebar.selectbox("History of PONV or Motion Sickness", ["No", "Yes"], help="Previous PONV episodes increase risk")
+        age = st.sidebar.slider("Age", 18, 80, 35, help="Age > 50 years increases PONV risk")
+        preop_anxiety = st.sidebar.selectbox("Preoperative Anxiety", ["No", "Yes"], help="Anxiety can increase PONV risk")
+        history_migraine = st.sidebar.selectbox("History of Migraine", ["No", "Yes"], help="Migraine history correlates with PONV")
+        obesity = st.sidebar.selectbox("BMI > 30", ["No", "Yes"], help="Obesity is a risk factor for PONV")
+
+        # ------------------------- SURGICAL FACTORS -------------------------
+        st.sidebar.markdown("""
     <div style='font-weight: 600; color: #ff8800; margin: 15px 0 10px 0; border-bottom: 2px solid #ff8800; padding-bottom: 5px;'>
         🏥 Surgical Factors
     </div>
     """, unsafe_allow_html=True)
     
-    abdominal_surgery = st.sidebar.selectbox("Abdominal or Laparoscopic Surgery", ["No", "Yes"], help="Laparoscopic procedures increase PONV risk")
-    ent_surgery = st.sidebar.selectbox("ENT/Neurosurgery/Ophthalmic Surgery", ["No", "Yes"], help="ENT and neurosurgical procedures are high-risk")
-    gynae_surgery = st.sidebar.selectbox("Gynecological or Breast Surgery", ["No", "Yes"], help="Gynecological procedures have higher PONV incidence")
-    surgery_duration = st.sidebar.selectbox("Surgery Duration > 60 min", ["No", "Yes"], help="Longer procedures increase PONV risk")
-    major_blood_loss = st.sidebar.selectbox("Major Blood Loss > 500 mL", ["No", "Yes"], help="Significant blood loss can trigger PONV")
-    volatile_agents = st.sidebar.selectbox("Use of Volatile Agents (Sevo/Iso/Des)", ["No", "Yes"], help="Volatile anesthetics are emetogenic")
-    nitrous_oxide = st.sidebar.selectbox("Use of Nitrous Oxide", ["No", "Yes"], help="N2O increases PONV risk")
-
-    # ------------------------- DRUG FACTORS (WITH DOSE) -------------------------
-    st.sidebar.markdown("""
+        abdominal_surgery = st.sidebar.selectbox("Abdominal or Laparoscopic Surgery", ["No", "Yes"], help="Laparoscopic procedures increase PONV risk")
+        ent_surgery = st.sidebar.selectbox("ENT/Neurosurgery/Ophthalmic Surgery", ["No", "Yes"], help="ENT and neurosurgical procedures are high-risk")
+        gynae_surgery = st.sidebar.selectbox("Gynecological or Breast Surgery", ["No", "Yes"], help="Gynecological procedures have higher PONV incidence")
+        surgery_duration = st.sidebar.selectbox("Surgery Duration > 60 min", ["No", "Yes"], help="Longer procedures increase PONV risk")
+        major_blood_loss = st.sidebar.selectbox("Major Blood Loss > 500 mL", ["No", "Yes"], help="Significant blood loss can trigger PONV")
+        volatile_agents = st.sidebar.selectbox("Use of Volatile Agents (Sevo/Iso/Des)", ["No", "Yes"], help="Volatile anesthetics are emetogenic")
+        nitrous_oxide = st.sidebar.selectbox("Use of Nitrous Oxide", ["No", "Yes"], help="N2O increases PONV risk")
+
+        # ------------------------- DRUG FACTORS (WITH DOSE) -------------------------
+        st.sidebar.markdown("""
     <div style='font-weight: 600; color: #ff8800; margin: 15px 0 10px 0; border-bottom: 2px solid #ff8800; padding-bottom: 5px;'>
         💊 Drug Administration (Specify Dose)
     </div>
     """, unsafe_allow_html=True)
 
-    # Drug: Ondansetron
-    st.sidebar.markdown("""
+        # Drug: Ondansetron
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Ondansetron (4-24 mg)</b><br>
         <div class='dose-info'>
@@ -788,10 +635,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    ondansetron_dose = st.sidebar.number_input("Ondansetron (mg)", 0.0, 24.0, 0.0, key='ondansetron_dose')
+        ondansetron_dose = st.sidebar.number_input("Ondansetron (mg)", 0.0, 24.0, 0.0, key='ondansetron_dose')
 
-    # Drug: Midazolam
-    st.sidebar.markdown("""
+        # Drug: Midazolam
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Midazolam (0.02-0.5 mg/kg or up to 20 mg)</b><br>
         <div class='dose-info'>
@@ -801,10 +648,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    midazolam_dose = st.sidebar.number_input("Midazolam (mg)", 0.0, 20.0, 0.0, key='midazolam_dose')
+        midazolam_dose = st.sidebar.number_input("Midazolam (mg)", 0.0, 20.0, 0.0, key='midazolam_dose')
 
-    # Drug: Dexamethasone
-    st.sidebar.markdown("""
+        # Drug: Dexamethasone
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Dexamethasone (4-40 mg)</b><br>
         <div class='dose-info'>
@@ -814,10 +661,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    dexamethasone_dose = st.sidebar.number_input("Dexamethasone (mg)", 0.0, 40.0, 0.0, key='dexamethasone_dose')
+        dexamethasone_dose = st.sidebar.number_input("Dexamethasone (mg)", 0.0, 40.0, 0.0, key='dexamethasone_dose')
 
-    # Drug: Glycopyrrolate
-    st.sidebar.markdown("""
+        # Drug: Glycopyrrolate
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Glycopyrrolate (0.1-0.4 mg)</b><br>
         <div class='dose-info'>
@@ -827,10 +674,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    glycopyrrolate_dose = st.sidebar.number_input("Glycopyrrolate (mg)", 0.0, 0.4, 0.0, key='glycopyrrolate_dose')
+        glycopyrrolate_dose = st.sidebar.number_input("Glycopyrrolate (mg)", 0.0, 0.4, 0.0, key='glycopyrrolate_dose')
 
-    # Drug: Nalbuphine
-    st.sidebar.markdown("""
+        # Drug: Nalbuphine
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Nalbuphine (5-20 mg)</b><br>
         <div class='dose-info'>
@@ -840,10 +687,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    nalbuphine_dose = st.sidebar.number_input("Nalbuphine (mg)", 0.0, 20.0, 0.0, key='nalbuphine_dose')
+        nalbuphine_dose = st.sidebar.number_input("Nalbuphine (mg)", 0.0, 20.0, 0.0, key='nalbuphine_dose')
 
-    # Drug: Fentanyl
-    st.sidebar.markdown("""
+        # Drug: Fentanyl
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Fentanyl (25-2000 mcg)</b><br>
         <div class='dose-info'>
@@ -853,10 +700,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    fentanyl_dose = st.sidebar.number_input("Fentanyl (mcg)", 0.0, 2000.0, 0.0, key='fentanyl_dose')
+        fentanyl_dose = st.sidebar.number_input("Fentanyl (mcg)", 0.0, 2000.0, 0.0, key='fentanyl_dose')
 
-    # Drug: Butorphanol
-    st.sidebar.markdown("""
+        # Drug: Butorphanol
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Butorphanol (0.5-4 mg)</b><br>
         <div class='dose-info'>
@@ -866,10 +713,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    butorphanol_dose = st.sidebar.number_input("Butorphanol (mg)", 0.0, 4.0, 0.0, key='butorphanol_dose')
+        butorphanol_dose = st.sidebar.number_input("Butorphanol (mg)", 0.0, 4.0, 0.0, key='butorphanol_dose')
 
-    # Drug: Pentazocine
-    st.sidebar.markdown("""
+        # Drug: Pentazocine
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Pentazocine (30-360 mg)</b><br>
         <div class='dose-info'>
@@ -879,10 +726,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    pentazocine_dose = st.sidebar.number_input("Pentazocine (mg)", 0.0, 360.0, 0.0, key='pentazocine_dose')
+        pentazocine_dose = st.sidebar.number_input("Pentazocine (mg)", 0.0, 360.0, 0.0, key='pentazocine_dose')
 
-    # Drug: Propofol (TIVA)
-    st.sidebar.markdown("""
+        # Drug: Propofol (TIVA)
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Propofol (10-250 mg/hr)</b><br>
         <div class='dose-info'>
@@ -892,10 +739,10 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    propofol_tiva_dose = st.sidebar.number_input("Propofol (mg/hr)", 0.0, 250.0, 0.0, key='propofol_tiva_dose')
+        propofol_tiva_dose = st.sidebar.number_input("Propofol (mg/hr)", 0.0, 250.0, 0.0, key='propofol_tiva_dose')
 
-    # Drug: Propofol (Induction)
-    st.sidebar.markdown("""
+        # Drug: Propofol (Induction)
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Propofol (1-2.5 mg/kg)</b><br>
         <div class='dose-info'>
@@ -905,11 +752,11 @@ with tab1:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    propofol_induction_dose = st.sidebar.number_input("Propofol (Induction, mg/kg)", 0.0, 2.5, 0.0, key='propofol_induction_dose')
+        propofol_induction_dose = st.sidebar.number_input("Propofol (Induction, mg/kg)", 0.0, 2.5, 0.0, key='propofol_induction_dose')
 
-    # Drug: Sevoflurane/Isoflurane/Desflurane
-    st.sidebar.selectbox("Use of Sevoflurane/Isoflurane/Desflurane", ["No", "Yes"], key='volatile_agents_selectbox')
-    st.sidebar.markdown("""
+        # Drug: Sevoflurane/Isoflurane/Desflurane
+        st.sidebar.selectbox("Use of Sevoflurane/Isoflurane/Desflurane", ["No", "Yes"], key='volatile_agents_selectbox')
+        st.sidebar.markdown("""
     <div class='dose-box'>
         <b>Sevoflurane/Isoflurane/Desflurane (1 MAC dose or higher)</b><br>
         <div class='dose-info'>
@@ -920,204 +767,56 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
-    # Propofol Mode Selection (Added based on the scoring function)
-    propofol_mode = st.sidebar.selectbox("Propofol Mode", ["None", "Induction Only", "TIVA"])
-
-    # Muscle Relaxant Selection (Added based on the scoring breakdown, though not used in scoring)
-    muscle_relaxant = st.sidebar.selectbox("Muscle Relaxant Used", ["None", "Succinylcholine", "Rocuronium", "Vecuronium", "Atracurium", "Cisatracurium"])
-
-    # Add muscle relaxant dose input in the sidebar
-    muscle_relaxant_dose = st.sidebar.number_input("Muscle Relaxant Dose (mg/kg)", 0.0, 5.0, 0.0, key='muscle_relaxant_dose')
-
-    # ------------------------- HYBRID SCORING FUNCTION -------------------------
-    def binary(val):
-        return 1 if val == "Yes" else 0
-
-    def propofol_score(mode):
-        return -3 if mode == "TIVA" else -1 if mode == "Induction Only" else 0
-
-    def midazolam_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 2:
-            return -1
-        elif dose <= 10:
-            return -2
-        else:
-            return -3
-
-    def ondansetron_score(dose):
-        if dose == 0:
-            return 0
-        elif dose < 4:
-            return -1
-        elif dose < 8:
-            return -2
-        else:
-            return -3
-
-    def dexamethasone_score(dose):
-        if dose == 0:
-            return 0
-        elif dose < 4:
-            return -1
-        elif dose <= 10:
-            return -2
-        else:
-            return -3
-
-    def glycopyrrolate_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 0.2:
-            return 1
-        else:
-            return 2
-
-    def nalbuphine_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 10:
-            return 1
-        else:
-            return 2
-
-    def fentanyl_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 100:
-            return 1
-        elif dose <= 500:
-            return 2
-        else:
-            return 3
-
-    def butorphanol_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 2:
-            return 1
-        else:
-            return 2
-
-    def pentazocine_score(dose):
-        if dose == 0:
-            return 0
-        elif dose <= 100:
-            return 1
-        elif dose <= 200:
-            return 2
-        else:
-            return 3
-
-    def muscle_relaxant_score(muscle_relaxant, dose):
-        if muscle_relaxant == "None":
-            return 0
-        elif muscle_relaxant == "Succinylcholine":
-            if dose < 1.5:
-                return 1
-            else:
-                return 2
-        elif muscle_relaxant == "Rocuronium":
-            if dose < 0.6:
-                return 0
-            elif dose <= 1.0:
-                return 1
+        # Propofol Mode Selection (Added based on the scoring function)
+        propofol_mode = st.sidebar.selectbox("Propofol Mode", ["None", "Induction Only", "TIVA"])
+
+        # Muscle Relaxant Selection (Added based on the scoring breakdown, though not used in scoring)
+        muscle_relaxant = st.sidebar.selectbox("Muscle Relaxant Used", ["None", "Succinylcholine", "Rocuronium", "Vecuronium", "Atracurium", "Cisatracurium"])
+
+        # Add muscle relaxant dose input in the sidebar
+        muscle_relaxant_dose = st.sidebar.number_input("Muscle Relaxant Dose (mg/kg)", 0.0, 5.0, 0.0, key='muscle_relaxant_dose')
+
+        # ------------------------- FEATURE VECTOR -------------------------
+        # Construct the feature vector based on the sidebar inputs
+        feature_vector = [
+            binary(gender), binary(smoker), binary(history_ponv), age, binary(preop_anxiety),
+            binary(history_migraine), binary(obesity), binary(abdominal_surgery), binary(ent_surgery),
+            binary(gynae_surgery), binary(surgery_duration), binary(major_blood_loss),
+            binary(volatile_agents), binary(nitrous_oxide),
+            midazolam_dose, ondansetron_dose, dexamethasone_dose, glycopyrrolate_dose,
+            nalbuphine_dose, fentanyl_dose / 1000.0, butorphanol_dose, pentazocine_dose,
+            propofol_score(propofol_mode)
+        ]
+
+        # ------------------------- HYBRID SCORE -------------------------
+        # Scored from the feature vector with the rules in ponv_core.scoring (shared with batch scoring
+        # and the benchmarks); the muscle relaxant is not a model feature and is scored separately
+        hybrid_score = scoring.hybrid_score(feature_vector, muscle_relaxant, muscle_relaxant_dose)
+
+
+        # ------------------------- DISPLAY HYBRID SCORE -------------------------
+        category, css_class = risk_category(hybrid_score) # Use CSS class instead of color
+
+        # Calculate position for risk meter (0-100%)
+        def get_risk_percentage(score):
+            if score <= -5:
+                return 5  # Very Low Risk
+            elif -4 <= score <= 3:
+                return 25  # Low Risk
+            elif 4 <= score <= 9:
+                return 50  # Moderate Risk
+            elif 10 <= score <= 15:
+                return 75  # High Risk
             else:
-                return 2
-        elif muscle_relaxant == "Vecuronium":
-            if dose < 0.1:
-                return 0
-            else:
-                return 1
-        elif muscle_relaxant == "Atracurium" or muscle_relaxant == "Cisatracurium":
-            if dose < 0.4:
-                return 1
-            else:
-                return 2
-        else:
-            return 0
-
-    def calculate_hybrid_score():
-        score = 0
-        # Patient factors
-        if gender == "Yes":
-            score += 1
-        if smoker == "Yes":
-            score += 1
-        if history_ponv == "Yes":
-            score += 1
-        if age > 50:
-            score += 1
-        if preop_anxiety == "Yes":
-            score += 1
-        if history_migraine == "Yes":
-            score += 1
-        if obesity == "Yes":
-            score += 1
-        if abdominal_surgery == "Yes":
-            score += 1
-        if ent_surgery == "Yes":
-            score += 1
-        if gynae_surgery == "Yes":
-            score += 1
-        if surgery_duration == "Yes":
-            score += 1
-        if major_blood_loss == "Yes":
-            score += 1
-        if volatile_agents == "Yes":
-            score += 1
-        if nitrous_oxide == "Yes":
-            score += 1
-        # Dose-dependent drug scores
-        score += midazolam_score(midazolam_dose)
-        score += ondansetron_score(ondansetron_dose)
-        score += dexamethasone_score(dexamethasone_dose)
-        score += glycopyrrolate_score(glycopyrrolate_dose)
-        score += nalbuphine_score(nalbuphine_dose)
-        score += fentanyl_score(fentanyl_dose)
-        score += butorphanol_score(butorphanol_dose)
-        score += pentazocine_score(pentazocine_dose)
-        score += propofol_score(propofol_mode)
-        score += muscle_relaxant_score(muscle_relaxant, muscle_relaxant_dose)
-        return score
-
-
-    def risk_category(score):
-        if score <= -5:
-            return "Very Low Risk", "very-low-risk"  # CSS class
-        elif -4 <= score <= 3:
-            return "Low Risk", "low-risk"  # CSS class
-        elif 4 <= score <= 9:
-            return "Moderate Risk", "moderate-risk"  # CSS class
-        elif 10 <= score <= 15:
-            return "High Risk", "high-risk"  # CSS class
-        else:
-            return "Very High Risk", "very-high-risk"  # CSS class
-
-    # ------------------------- DISPLAY HYBRID SCORE -------------------------
-    hybrid_score = calculate_hybrid_score()
-    category, css_class = risk_category(hybrid_score) # Use CSS class instead of color
-
-    # Calculate position for risk meter (0-100%)
-    def get_risk_percentage(score):
-        if score <= -5:
-            return 5  # Very Low Risk
-        elif -4 <= score <= 3:
-            return 25  # Low Risk
-        elif 4 <= score <= 9:
-            return 50  # Moderate Risk
-        elif 10 <= score <= 15:
-            return 75  # High Risk
-        else:
-            return 95  # Very High Risk
+                return 95  # Very High Risk
 
-    risk_percentage = get_risk_percentage(hybrid_score)
-    total_score = hybrid_score
-    risk_category_label = category
+        risk_percentage = get_risk_percentage(hybrid_score)
+        total_score = hybrid_score
+        risk_category_label = category
 
-    # Display the risk meter
-    st.markdown(f"""
+        with risk_meter_slot:
+            # Display the risk meter
+            st.markdown(f"""
 <div class='risk-meter-container'>
     <h2 class='total-score'>Total Hybrid Score: {total_score}</h2>
     <h3 class='risk-category'>Risk Category: {risk_category_label}</h3>
@@ -1134,57 +833,13 @@ with tab1:
 </div>
 """, unsafe_allow_html=True)
 
-    # Add CSS for the risk meter with black background and visible text
-    st.markdown("""
-<style>
-.risk-meter-container {
-    background: #18191a;
-    padding: 20px;
-    border-radius: 10px;
-    box-shadow: 0 2px 4px rgba(0,0,0,0.4);
-}
-.total-score {
-    color: #ffb366;
-    font-size: 24px;
-    margin-bottom: 10px;
-}
-.risk-category {
-    color: #fff;
-    font-size: 20px;
-    margin-bottom: 20px;
-}
-.risk-meter {
-    height: 20px;
-    background: linear-gradient(to right, #4daf4a, #ffed4a, #ff4444);
-    border-radius: 10px;
-    position: relative;
-    margin-bottom: 10px;
-}
-.risk-indicator {
-    width: 12px;
-    height: 30px;
-    background: #fff;
-    position: absolute;
-    top: -5px;
-    transform: translateX(-50%);
-    border-radius: 3px;
-}
-.risk-labels {
-    display: flex;
-    justify-content: space-between;
-    color: #fff;
-    font-size: 14px;
-}
-</style>
-""", unsafe_allow_html=True)
-
 
-    # ------------------------- RECOMMENDATIONS FOR CLINICIANS (Expandable) -------------------------
+            # ------------------------- RECOMMENDATIONS FOR CLINICIANS (Expandable) -------------------------
 
-    st.subheader("Recommendations for Clinicians")
-    with st.expander("View Recommendations"):
-        if category == "Moderate Risk":
-            st.markdown("""
+            st.subheader("Recommendations for Clinicians")
+            with st.expander("View Recommendations"):
+                if category == "Moderate Risk":
+                    st.markdown("""
             <h4>🔹 1. Moderate Risk (Score: 4–9)</h4>
             <b>Moderate Risk (Score: 4–9)</b><br>
             <span style='color:#007bff;'>&#x27A1; Dual prophylaxis is recommended</span><br>
@@ -1207,8 +862,8 @@ with tab1:
                 <li><b>Observation &gt;30 min</b> – Monitor in PACU</li>
             </ul>
             """, unsafe_allow_html=True)
-        elif category in ["High Risk", "Very High Risk"]:
-            st.markdown("""
+                elif category in ["High Risk", "Very High Risk"]:
+                    st.markdown("""
             <h4>🔴 2. High Risk (Score: 10–15) or Very High Risk</h4>
             <b>High Risk (Score: 10–15) or Very High Risk</b><br>
             <span style='color:#dc3545;'>&#x27A1; Multimodal prevention is mandatory</span><br>
@@ -1238,8 +893,8 @@ with tab1:
                 <li><b>Discharge prescription</b> – Anti-emetics like ondansetron or promethazine</li>
             </ul>
             """, unsafe_allow_html=True)
-        elif category in ["Very Low Risk", "Low Risk"]:
-            st.markdown("""
+                elif category in ["Very Low Risk", "Low Risk"]:
+                    st.markdown("""
             <h4>🟢 3. Very Low and Low Risk (Score: 0–3)</h4>
             <span style='font-size:0.95em;'>📘 Source: <a href="https://www.ashp.org/-/media/assets/policy-guidelines/docs/guidelines/postoperative-nausea-vomiting.ashx" target="_blank">ASHP Guidelines</a></span>
             <ul>
@@ -1252,8 +907,8 @@ with tab1:
                 </ul>
             </ul>
             """, unsafe_allow_html=True)
-        # Rescue Therapy section (always shown)
-        st.markdown("""
+                # Rescue Therapy section (always shown)
+                st.markdown("""
         <hr>
         <h4>🩺 4. Rescue Therapy (for breakthrough PONV despite prophylaxis)</h4>
         <b>First-line Rescue:</b>
@@ -1271,256 +926,97 @@ with tab1:
         <span style='font-size:0.95em;'>📘 Reference: <a href="https://www.openanesthesia.org/po_nausea_vomiting/" target="_blank">OpenAnesthesia: PONV Management</a></span>
         """, unsafe_allow_html=True)
 
+        # ------------------------- USER INPUT PREDICTION (LightGBM & XGBoost) -------------------------
+        with live_prediction_slot:
+            input_array = modeling.as_features(feature_vector).reshape(1, -1)
+            input_scaled_for_prediction = scaler.transform(input_array)
+            live_scores = inference_broker.predict(input_array)
+            prob_lgb = float(live_scores['prob_lgb'][0])
+            prob_xgb = float(live_scores['prob_xgb'][0])
+            if calibrators is not None and calibration_method != "None":
+                prob_lgb = float(calibrators['LightGBM'][calibration_method](prob_lgb))
+                prob_xgb = float(calibrators['XGBoost'][calibration_method](prob_xgb))
+
+            with st.expander("Why this prediction? (per-patient model explanation)"):
+                st.markdown(
+                    f"Predicted PONV risk — <b>LightGBM: {prob_lgb:.1%}</b> | <b>XGBoost: {prob_xgb:.1%}</b><br>"
+                    "<small>Contributions are in log-odds: positive values push the risk up, negative values pull it down.</small>",
+                    unsafe_allow_html=True,
+                )
+                patient_contribs = contribution_cache.get(model_version, xgb_model, lgb_model, input_scaled_for_prediction)
+                col1, col2 = st.columns(2)
+                for col, model_name in zip([col1, col2], ['LightGBM', 'XGBoost']):
+                    with col:
+                        st.write(f"Top 10 contributions ({model_name})")
+                        st.table(explain.contribution_frame(patient_contribs[model_name][0], feature_names, feature_vector, top_n=10))
+
+        if tab_open(tab2):
+            with tab2:
+                # ------------------------- DETAILED SCORING BREAKDOWN (Expandable) -------------------------
+                st.subheader("Detailed Scoring Breakdown")
+                with st.expander("View Individual Parameter Contributions"):
+                    # Define the score contribution for each parameter based on the sidebar selection
+                    parameter_scores = {
+                        "Female Gender": binary(gender),
+                        "Non-Smoker": binary(smoker),
+                        "History of PONV or Motion Sickness": binary(history_ponv),
+                        "Age": 1 if age > 50 else 0,
+                        "Preoperative Anxiety": binary(preop_anxiety),
+                        "History of Migraine": binary(history_migraine),
+                        "BMI > 30": binary(obesity),
+                        "Abdominal or Laparoscopic Surgery": binary(abdominal_surgery),
+                        "ENT/Neurosurgery/Ophthalmic Surgery": binary(ent_surgery),
+                        "Gynecological or Breast Surgery": binary(gynae_surgery),
+                        "Surgery Duration > 60 min": binary(surgery_duration),
+                        "Major Blood Loss > 500 mL": binary(major_blood_loss),
+                        "Use of Volatile Agents (Sevo/Iso/Des)": binary(volatile_agents),
+                        "Use of Nitrous Oxide": binary(nitrous_oxide),
+                        "Midazolam Dose": midazolam_score(midazolam_dose),
+                        "Ondansetron Dose": ondansetron_score(ondansetron_dose),
+                        "Dexamethasone Dose": dexamethasone_score(dexamethasone_dose),
+                        "Glycopyrrolate Dose": glycopyrrolate_score(glycopyrrolate_dose),
+                        "Nalbuphine Dose": nalbuphine_score(nalbuphine_dose),
+                        "Fentanyl Dose": fentanyl_score(fentanyl_dose),
+                        "Butorphanol Dose": butorphanol_score(butorphanol_dose),
+                        "Pentazocine Dose": pentazocine_score(pentazocine_dose),
+                        "Propofol Use": propofol_score(propofol_mode),
+                        "Muscle Relaxant Used": muscle_relaxant_score(muscle_relaxant, muscle_relaxant_dose),
+                    }
+
+                    # Create a DataFrame for the detailed scoring breakdown
+                    df_scoring_breakdown = pd.DataFrame(list(parameter_scores.items()), columns=['Parameter', 'Score Contribution'])
+
+                    # Define a function to apply color based on the score
+                    def color_score(val):
+                        if val > 0:
+                            return f'color: #dc3545; font-weight: bold;'  # Red for positive contribution (risk increasing)
+                        elif val < 0:
+                            return f'color: #28a745; font-weight: bold;'  # Green for negative contribution (risk decreasing)
+                        else:
+                            return ''  # Default color for 0 contribution
+
+                    # Apply the color function to the 'Score Contribution' column
+                    styled_df = df_scoring_breakdown.style.applymap(color_score, subset=['Score Contribution'])
+
+                    # Display the styled table
+                    st.table(styled_df)
+
+        st.session_state['risk_assessment'] = {
+            'gender': gender, 'smoker': smoker, 'history_ponv': history_ponv, 'age': age,
+            'preop_anxiety': preop_anxiety, 'abdominal_surgery': abdominal_surgery, 'ent_surgery': ent_surgery,
+            'gynae_surgery': gynae_surgery, 'volatile_agents': volatile_agents, 'nitrous_oxide': nitrous_oxide,
+            'midazolam_dose': midazolam_dose, 'ondansetron_dose': ondansetron_dose,
+            'dexamethasone_dose': dexamethasone_dose, 'glycopyrrolate_dose': glycopyrrolate_dose,
+            'nalbuphine_dose': nalbuphine_dose, 'fentanyl_dose': fentanyl_dose,
+            'butorphanol_dose': butorphanol_dose, 'pentazocine_dose': pentazocine_dose,
+            'propofol_mode': propofol_mode, 'muscle_relaxant': muscle_relaxant,
+            'hybrid_score': hybrid_score, 'prob_xgb': prob_xgb, 'prob_lgb': prob_lgb,
+            'model_version': model_version,
+        }
 
-    # ------------------------- FEATURE VECTOR -------------------------
-    # Construct the feature vector based on the sidebar inputs
-    feature_vector = [
-        binary(gender), binary(smoker), binary(history_ponv), age, binary(preop_anxiety),
-        binary(history_migraine), binary(obesity), binary(abdominal_surgery), binary(ent_surgery),
-        binary(gynae_surgery), binary(surgery_duration), binary(major_blood_loss),
-        binary(volatile_agents), binary(nitrous_oxide),
-        midazolam_dose, ondansetron_dose, dexamethasone_dose, glycopyrrolate_dose,
-        nalbuphine_dose, fentanyl_dose / 1000.0, butorphanol_dose, pentazocine_dose,
-        propofol_score(propofol_mode)
-    ]
-
-    feature_names = [
-        "Female", "Non-Smoker", "History PONV", "Age", "Preop Anxiety", "Migraine", "Obesity",
-        "Abdominal Surg", "ENT/Neuro/Ophthalmic", "Gynae/Breast Surg", "Surg >60min",
-        "Blood Loss >500ml", "Volatile Agents", "Nitrous Oxide",
-        "Midazolam (mg)", "Ondansetron (mg)", "Dexamethasone (mg)", "Glycopyrrolate (mg)",
-        "Nalbuphine (mg)", "Fentanyl (mg)", "Butorphanol (mg)", "Pentazocine (mg)",
-        "Propofol Score"
-    ]
-
-    # Convert the current feature vector to a numpy array for scaling and prediction
-    current_features = np.array(feature_vector).reshape(1, -1)
-
-
-    # ------------------------- SYNTHETIC DATA -------------------------
-    # Use 500 synthetic samples for faster demo
-    @st.cache_data
-    def generate_synthetic_data(n_samples=500, n_features=23):
-        X = np.zeros((n_samples, n_features))
-        y = np.zeros(n_samples)
-        np.random.seed(42)
-        for i in range(n_samples):
-            X[i, 0:14] = np.random.binomial(1, 0.5, 14)
-            X[i, 3] = np.random.normal(45, 15)
-            X[i, 14:22] = np.maximum(0, np.random.exponential(2, 8))
-            X[i, 22] = np.random.choice([-3, -1, 0])
-            risk_factors = (
-                2.5 * X[i, 0] +
-                2.0 * X[i, 2] +
-                1.5 * X[i, 4] +
-                1.5 * X[i, 5] +
-                1.2 * X[i, 6] +
-                2.0 * X[i, 7] +
-                1.5 * X[i, 8] +
-                1.5 * X[i, 9] +
-                1.2 * X[i, 11] +
-                2.5 * X[i, 12] +
-                1.5 * X[i, 13]
-            )
-            protective_factors = (
-                1.5 * X[i, 14] +
-                2.5 * X[i, 15] +
-                2.5 * X[i, 16] +
-                1.5 * X[i, 17]
-            )
-            # Adjusted sigmoid for ROC AUC ~0.8-0.9
-            prob = 1 / (1 + np.exp(-2.0 * (risk_factors - protective_factors)))
-            y[i] = np.random.binomial(1, prob)
-        return X, y
-
-    # Generate synthetic data
-    n_features = 23
-    X, y = generate_synthetic_data(500, n_features)
-
-    # Split and preprocess data
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.3, random_state=42)
-
-    # Add feature scaling
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
-
-    # Add SMOTE for class balancing
-    smote = SMOTE(random_state=42)
-    X_train_balanced, y_train_balanced = smote.fit_resample(X_train_scaled, y_train)
-
-    # Cache model training so it only runs when data changes
-    @st.cache_resource
-    def train_models(X_train_balanced, y_train_balanced):
-        xgb_model = XGBClassifier(
-            max_depth=3,
-            learning_rate=0.03,
-            n_estimators=50,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            use_label_encoder=False,
-            eval_metric='auc'
-        )
-        xgb_model.fit(X_train_balanced, y_train_balanced)
-        lgb_model = lgb.LGBMClassifier(n_estimators=50, max_depth=3)
-        lgb_model.fit(X_train_balanced, y_train_balanced)
-        return xgb_model, lgb_model
-
-    # Train models (cached)
-    xgb_model, lgb_model = train_models(X_train_balanced, y_train_balanced)
-
-
-    
-
-
-    # ------------------------- MODEL EVALUATION -------------------------
-    st.subheader("Model AUC Scores")
-
-    auc_xgb_train, auc_lgb_train = None, None
-    auc_xgb_val, auc_lgb_val = None, None
-    fig_train_all, fig_val_all = None, None
-
-    if len(np.unique(y_train_balanced)) < 2:
-        st.warning("Training data contains only one class. Cannot calculate ROC curves and AUC for training data.")
-    else:
-        fpr_xgb_train, tpr_xgb_train, _ = roc_curve(y_train_balanced, xgb_model.predict_proba(X_train_balanced)[:, 1])
-        fpr_lgb_train, tpr_lgb_train, _ = roc_curve(y_train_balanced, lgb_model.predict_proba(X_train_balanced)[:, 1])
-        auc_xgb_train = auc(fpr_xgb_train, tpr_xgb_train)
-        auc_lgb_train = auc(fpr_lgb_train, tpr_lgb_train)
-        fig_train_all, ax_train_all = plt.subplots(figsize=(5, 3))
-        fig_train_all.patch.set_facecolor('#ffffff')
-        ax_train_all.set_facecolor('#ffffff')
-        ax_train_all.tick_params(colors='#000000')
-        ax_train_all.xaxis.label.set_color('#000000')
-        ax_train_all.yaxis.label.set_color('#000000')
-        ax_train_all.title.set_color('#000000')
-        ax_train_all.plot(fpr_lgb_train, tpr_lgb_train, label=f"LightGBM (AUC = {auc_lgb_train:.3f})")
-        ax_train_all.plot(fpr_xgb_train, tpr_xgb_train, label=f"XGBoost (AUC = {auc_xgb_train:.3f})")
-        ax_train_all.plot([0, 1], [0, 1], 'k--')
-        ax_train_all.set_xlabel("False Positive Rate")
-        ax_train_all.set_ylabel("True Positive Rate")
-        ax_train_all.set_title("Training ROC Curve (LightGBM & XGBoost)")
-        ax_train_all.legend(loc="lower right", fontsize='small')
-
-
-    if len(np.unique(y_val)) < 2:
-        st.warning("Validation data contains only one class. Cannot calculate ROC curves and AUC for validation data.")
-    else:
-        fpr_xgb_val, tpr_xgb_val, _ = roc_curve(y_val, xgb_model.predict_proba(X_val_scaled)[:, 1])
-        fpr_lgb_val, tpr_lgb_val, _ = roc_curve(y_val, lgb_model.predict_proba(X_val_scaled)[:, 1])
-        auc_xgb_val = auc(fpr_xgb_val, tpr_xgb_val)
-        auc_lgb_val = auc(fpr_lgb_val, tpr_lgb_val)
-        fig_val_all, ax_val_all = plt.subplots(figsize=(5, 3))
-        fig_val_all.patch.set_facecolor('#ffffff')
-        ax_val_all.set_facecolor('#ffffff')
-        ax_val_all.tick_params(colors='#000000')
-        ax_val_all.xaxis.label.set_color('#000000')
-        ax_val_all.yaxis.label.set_color('#000000')
-        ax_val_all.title.set_color('#000000')
-        ax_val_all.plot(fpr_lgb_val, tpr_lgb_val, label=f"LightGBM (AUC = {auc_lgb_val:.3f})")
-        ax_val_all.plot(fpr_xgb_val, tpr_xgb_val, label=f"XGBoost (AUC = {auc_xgb_val:.3f})")
-        ax_val_all.plot([0, 1], [0, 1], 'k--')
-        ax_val_all.set_xlabel("False Positive Rate")
-        ax_val_all.set_ylabel("True Positive Rate")
-        ax_val_all.set_title("Validation ROC Curve (LightGBM & XGBoost)")
-        ax_val_all.legend(loc="lower right", fontsize='small')
-
-
-    # Create the DataFrame with calculated AUC values
-    df_auc = pd.DataFrame({
-        'Model': ['LightGBM', 'XGBoost'],
-        'Training AUC': [auc_lgb_train, auc_xgb_train],
-        'Validation AUC': [auc_lgb_val, auc_xgb_val]
-    })
-    for col in ['Training AUC', 'Validation AUC']:
-        df_auc[col] = df_auc[col].apply(lambda x: '{:.3f}'.format(x) if x is not None else 'N/A')
-    
-    # Enhanced table display with status indicators
-    st.markdown("""
-    <div class='chart-container'>
-        <h4 style='margin-bottom: 15px; color: #ff8800;'>📊 Model Performance Metrics</h4>
-    """, unsafe_allow_html=True)
-    
-    # Create styled table with status indicators
-    for idx, row in df_auc.iterrows():
-        train_auc = float(row['Training AUC']) if row['Training AUC'] != 'N/A' else 0
-        val_auc = float(row['Validation AUC']) if row['Validation AUC'] != 'N/A' else 0
-        
-        # Determine status based on AUC values
-        if val_auc >= 0.8:
-            status_class = "status-online"
-            status_text = "Excellent"
-        elif val_auc >= 0.7:
-            status_class = "status-warning"
-            status_text = "Good"
-        else:
-            status_class = "status-error"
-            status_text = "Needs Improvement"
-        
-        st.markdown(f"""
-        <div style='display: flex; align-items: center; padding: 10px; margin: 5px 0; background: rgba(255,255,255,0.05); border-radius: 8px;'>
-            <div class='status-indicator {status_class}'></div>
-            <div style='flex: 1;'>
-                <strong>{row['Model']}</strong><br>
-                <small>Training AUC: {row['Training AUC']} | Validation AUC: {row['Validation AUC']}</small>
-            </div>
-            <div style='color: #ff8800; font-weight: 600;'>{status_text}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        if fig_train_all is not None:
-            st.pyplot(fig_train_all)
-    with col2:
-        if fig_val_all is not None:
-            st.pyplot(fig_val_all)
-
-
-    # Calculate and show metrics for LightGBM and XGBoost only
-    st.subheader("Model Performance Metrics (Validation Data)")
-    if len(np.unique(y_val)) < 2:
-        st.warning("Validation data contains only one class. Cannot calculate performance metrics.")
-    else:
-        def calculate_metrics(model, X_val_scaled, y_val):
-            preds_proba = model.predict_proba(X_val_scaled)[:, 1]
-            preds = (preds_proba > 0.5).astype(int)
-            try:
-                prec = precision_score(y_val, preds)
-            except:
-                prec = np.nan
-            try:
-                rec = recall_score(y_val, preds)
-            except:
-                rec = np.nan
-            try:
-                f1 = f1_score(y_val, preds)
-            except:
-                f1 = np.nan
-            acc = accuracy_score(y_val, preds)
-            return acc, prec, rec, f1
-        acc_lgb, prec_lgb, rec_lgb, f1_lgb = calculate_metrics(lgb_model, X_val_scaled, y_val)
-        acc_xgb, prec_xgb, rec_xgb, f1_xgb = calculate_metrics(xgb_model, X_val_scaled, y_val)
-        df_calculated_metrics = pd.DataFrame({
-            'Model': ['LightGBM', 'XGBoost'],
-            'Accuracy': [acc_lgb, acc_xgb],
-            'Precision': [prec_lgb, prec_xgb],
-            'Recall': [rec_lgb, rec_xgb],
-            'F1-score': [f1_lgb, f1_xgb]
-        })
-        for col in ['Accuracy', 'Precision', 'Recall', 'F1-score']:
-            df_calculated_metrics[col] = df_calculated_metrics[col].apply(lambda x: '{:.2f}'.format(x) if pd.notna(x) else 'N/A')
-        st.table(df_calculated_metrics)
-
-
-    # ------------------------- USER INPUT PREDICTION (LightGBM & XGBoost) -------------------------
-    input_array = np.array(feature_vector).reshape(1, -1)
-    input_scaled_for_prediction = scaler.transform(input_array)
-    prob_lgb = lgb_model.predict_proba(input_scaled_for_prediction)[:, 1][0]
-    prob_xgb = xgb_model.predict_proba(input_scaled_for_prediction)[:, 1][0]
+    risk_panel()
+    startup.mark("risk_panel")
+    run_timer.skip()
 
     st.markdown(
         "<small>This model uses synthetic data based on your input structure for demo only. Train on real clinical data for deployment.</small>",
@@ -1528,268 +1024,213 @@ with tab1:
     )
 
     # ------------------------- UPLOAD REAL-WORLD DATA -------------------------
-    st.subheader("Upload Real-World Dataset for Hybrid Risk vs Predicted Risk Evaluation")
-    uploaded_file = st.file_uploader("Upload File", key='file_uploader')
-
-    if uploaded_file is not None:
-        try:
-            df = pd.read_csv(uploaded_file)
-            # Add validation for required columns
-            # Adjusted required columns based on potential use for evaluation
-            # Assuming the uploaded data has the same feature names as the synthetic data
-            required_columns = feature_names + ['PONV_Outcome'] # Assuming a column for actual outcome (0 or 1)
-            if not all(col in df.columns for col in required_columns):
-                st.error(f"CSV file must contain these columns: {', '.join(required_columns)}")
-            else:
-                st.success("File uploaded successfully! Processing data...")
-
-                # Prepare uploaded data for prediction
-                uploaded_features = df[feature_names]
-                uploaded_outcomes = df['PONV_Outcome']
-
-                # Scale the uploaded data using the same scaler
-                uploaded_features_scaled = scaler.transform(uploaded_features)
-
-                # Predict on uploaded data
-                df['Predicted_Risk_XGBoost'] = xgb_model.predict_proba(uploaded_features_scaled)[:, 1]
-                df['Predicted_Risk_LightGBM'] = lgb_model.predict_proba(uploaded_features_scaled)[:, 1]
-
-                # Calculate Hybrid Score for uploaded data (assuming necessary columns exist)
-                # This requires mapping the 'Yes'/'No' columns and dose columns from the uploaded data
-                # to the hybrid score calculation logic. This part is complex and depends heavily
-                # on the exact column names and format in the uploaded CSV.
-                # For demonstration, let's assume the binary columns are named the same as feature_names
-                # and dose columns are also named appropriately.
-                # A more robust implementation would require clear mapping or a specific template.
-
-                # Simplified Hybrid Score Calculation for Uploaded Data (requires careful column mapping)
-                # This is a placeholder and needs to be adapted based on the actual column names
-                # and logic from the `calculate_hybrid_score` function.
-                # Example (Highly Dependent on CSV structure):
-                # df['Hybrid_Score_Calculated'] = df.apply(lambda row:
-                #     (1 if row['Female'] == 1 else 0) +
-                #     (1 if row['Non-Smoker'] == 1 else 0) +
-                #     # ... add other binary factors ...
-                #     (-1 if row['Midazolam (mg)'] > 0 else 0) +
-                #     # ... add other drug factors ...
-                #     (propofol_score(row['Propofol Mode'])) # Requires mapping mode strings
-                # , axis=1)
-
-                st.subheader("Evaluation on Uploaded Data")
-
-                if len(np.unique(uploaded_outcomes)) < 2:
-                    st.warning("Uploaded data contains only one class for 'PONV_Outcome'. Cannot calculate performance metrics.")
+    # Uploading or re-uploading a file reruns only this fragment
+    @st.fragment
+    @metrics.timed("upload")
+    def upload_panel():
+        st.subheader("Upload Real-World Dataset for Hybrid Risk vs Predicted Risk Evaluation")
+        uploaded_file = st.file_uploader("Upload File", key='file_uploader')
+
+        if uploaded_file is not None:
+            try:
+                # float32 mode (PONV_FLOAT32=1) reads the feature columns as float32; blank cells become NaN
+                df = pd.read_csv(uploaded_file, dtype=modeling.csv_dtypes())
+                # Add validation for required columns
+                # Adjusted required columns based on potential use for evaluation
+                # Assuming the uploaded data has the same feature names as the synthetic data
+                required_columns = feature_names + ['PONV_Outcome'] # Assuming a column for actual outcome (0 or 1)
+                if not all(col in df.columns for col in required_columns):
+                    st.error(f"CSV file must contain these columns: {', '.join(required_columns)}")
                 else:
-                    # Calculate and display metrics for each model on uploaded data
-                    uploaded_metrics = {}
-                    uploaded_metrics['XGBoost'] = calculate_metrics(xgb_model, uploaded_features_scaled, uploaded_outcomes)
-                    uploaded_metrics['LightGBM'] = calculate_metrics(lgb_model, uploaded_features_scaled, uploaded_outcomes)
-
-                    # Create DataFrame for uploaded data metrics
-                    df_uploaded_metrics = pd.DataFrame.from_dict(uploaded_metrics, orient='index', columns=['Accuracy', 'Precision', 'Recall', 'F1-score'])
-                    for col in ['Accuracy', 'Precision', 'Recall', 'F1-score']:
-                        df_uploaded_metrics[col] = df_uploaded_metrics[col].apply(lambda x: '{:.2f}'.format(x) if pd.notna(x) else 'N/A')
-
-                    st.write("Model Performance Metrics on Uploaded Data:")
-                    st.table(df_uploaded_metrics)
-
-                    # Calculate and plot ROC curve for uploaded data
-                    st.subheader("ROC Curve on Uploaded Data")
-                    fig_uploaded_roc, ax_uploaded_roc = plt.subplots(figsize=(8, 6))
-
-                    # Plot ROC for each model on uploaded data
-                    for model_name, model in zip(['XGBoost', 'LightGBM'], [xgb_model, lgb_model]):
-                        if hasattr(model, 'predict_proba'):
-                            fpr, tpr, _ = roc_curve(uploaded_outcomes, model.predict_proba(uploaded_features_scaled)[:, 1])
-                            roc_auc = auc(fpr, tpr)
-                            ax_uploaded_roc.plot(fpr, tpr, label=f'{model_name} (AUC = {roc_auc:.2f})')
-
-                    ax_uploaded_roc.plot([0, 1], [0, 1], 'k--', label='Chance (AUC = 0.50)')
-                    ax_uploaded_roc.set_xlabel('False Positive Rate')
-                    ax_uploaded_roc.set_ylabel('True Positive Rate')
-                    ax_uploaded_roc.set_title('ROC Curve on Uploaded Data')
-                    ax_uploaded_roc.legend(loc='lower right')
-                    ax_uploaded_roc.grid(True)
-                    st.pyplot(fig_uploaded_roc)
+                    st.success("File uploaded successfully! Processing data...")
+
+                    # Prepare uploaded data for prediction
+                    uploaded_features = df[feature_names].to_numpy(dtype=modeling.FEATURE_DTYPE)
+                    uploaded_outcomes = df['PONV_Outcome']
+                    # Every upload has its own file ID, so with the model version it names the
+                    # predictions below without hashing the cohort
+                    upload_key = cache.dataset_id("upload", file_id=uploaded_file.file_id, model=model_version)
+
+                    # Scale with the same scaler, predict with both models and compute the hybrid score for
+                    # every row (vectorized; the muscle relaxant is not part of the upload schema and
+                    # contributes 0), once per upload
+                    uploaded_scores = score_upload(upload_key, service.Scorer(scaler, xgb_model, lgb_model, model_version),
+                                                   uploaded_features)
+                    df['Predicted_Risk_XGBoost'] = uploaded_scores['prob_xgb']
+                    df['Predicted_Risk_LightGBM'] = uploaded_scores['prob_lgb']
+                    df['Hybrid_Score_Calculated'] = uploaded_scores['hybrid_score']
+
+                    st.subheader("Evaluation on Uploaded Data")
+
+                    if len(np.unique(uploaded_outcomes)) < 2:
+                        st.warning("Uploaded data contains only one class for 'PONV_Outcome'. Cannot calculate performance metrics.")
+                    else:
+                        # Calculate and display metrics for each model on uploaded data
+                        uploaded_metrics = {
+                            model_name: evaluation.threshold_metrics(uploaded_outcomes, uploaded_scores[key], decision_threshold)
+                            for model_name, key in evaluation.MODEL_SCORES.items()
+                        }
+
+                        # Create DataFrame for uploaded data metrics
+                        df_uploaded_metrics = pd.DataFrame.from_dict(uploaded_metrics, orient='index', columns=['Accuracy', 'Precision', 'Recall', 'F1-score'])
+                        for col in ['Accuracy', 'Precision', 'Recall', 'F1-score']:
+                            df_uploaded_metrics[col] = df_uploaded_metrics[col].apply(lambda x: '{:.2f}'.format(x) if pd.notna(x) else 'N/A')
+                        df_uploaded_metrics['AUC (95% CI)'] = [
+                                format_ci(run_bootstrap((upload_key, model_name), uploaded_outcomes.to_numpy(),
+                                                    uploaded_scores[evaluation.MODEL_SCORES[model_name]])['AUC'])
+                            for model_name in df_uploaded_metrics.index
+                        ]
+
+                        st.write("Model Performance Metrics on Uploaded Data:")
+                        st.table(df_uploaded_metrics)
+
+                        # Calculate and plot ROC curve for uploaded data
+                        st.subheader("ROC Curve on Uploaded Data")
+                        show_roc(upload_key, evaluation.roc_curves(uploaded_outcomes, uploaded_scores),
+                                 'ROC Curve on Uploaded Data', figsize=(8, 6))
+
+                        st.subheader("Decision Curve Analysis on Uploaded Data")
+                        curves_uploaded = run_decision_curves(
+                            upload_key, uploaded_outcomes.to_numpy(), evaluation.strategies(uploaded_scores, hybrid_calibrator)
+                        )
+                        show_decision_curves(curves_uploaded, "Decision Curves on Uploaded Data")
 
+                    # Per-patient explanations for the whole cohort: one native contribution call per model
+                    # per upload; the CSV is only built when the button is clicked
+                    cohort_contribs = cohort_contributions(upload_key, xgb_model, lgb_model, uploaded_scores['X_scaled'])
+                    st.download_button(
+                        label="📥 Download Per-Patient Model Contributions (CSV)",
+                        data=lambda: explain.cohort_contributions_csv(cohort_contribs, feature_names),
+                        file_name='ponv_patient_contributions.csv',
+                        mime='text/csv',
+                        key='download_contributions_button',
+                    )
 
-        except Exception as e:
-            st.error(f"Error processing uploaded CSV file: {str(e)}")
+
+            except Exception as e:
+                st.error(f"Error processing uploaded CSV file: {str(e)}")
+
+    upload_panel()
+    run_timer.skip()
 
 
     # ------------------------- LOG ENTRY AND SHOW ENTRIES -------------------------
+    # The schema was prepared with the model registry above (db_path)
     # Initialize database connection
     # Use st.session_state to store the connection and cursor to avoid re-initializing
     # on every rerun, which can lead to issues with SQLite.
     if 'conn' not in st.session_state:
-        st.session_state.conn = sqlite3.connect('ponv_logs.db', check_same_thread=False)
+        st.session_state.conn = sqlite3.connect(db_path, check_same_thread=False)
         st.session_state.cursor = st.session_state.conn.cursor()
 
     conn = st.session_state.conn
     cursor = st.session_state.cursor
 
-    # Create table if it doesn't exist
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            gender TEXT,
-            smoker TEXT,
-            history_ponv TEXT,
-            age INTEGER,
-            anxiety TEXT,
-            abdominal_surgery TEXT,
-            volatile TEXT,
-            n2o TEXT,
-            midazolam REAL,
-            ondansetron REAL,
-            dexamethasone REAL,
-            glycopyrrolate REAL,
-            nalbuphine REAL,
-            fentanyl REAL,
-            butorphanol REAL,
-            pentazocine REAL,
-            propofol_mode TEXT,
-            muscle_relaxant TEXT,
-            hybrid_score INTEGER,
-            predicted_risk_xgb REAL,
-            predicted_risk_lgb REAL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit() # Commit table creation if it happened
-
-    # Check and add columns if they don't exist (schema migration)
-    def add_column_if_not_exists(cursor, table_name, column_name, column_type):
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [col[1] for col in cursor.fetchall()]
-        if column_name not in columns:
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
-            conn.commit()
-            # st.info(f"Added column '{column_name}' to table '{table_name}'.") # Removed this info message
-
-    # Add any new columns here with their types
-    # Note: These checks are already in the user's snippet, ensuring they are present.
-    add_column_if_not_exists(cursor, 'logs', 'glycopyrrolate', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'nalbuphine', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'fentanyl', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'butorphanol', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'pentazocine', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'propofol_mode', 'TEXT')
-    add_column_if_not_exists(cursor, 'logs', 'muscle_relaxant', 'TEXT')
-    add_column_if_not_exists(cursor, 'logs', 'predicted_risk_xgb', 'REAL')
-    add_column_if_not_exists(cursor, 'logs', 'predicted_risk_lgb', 'REAL')
-
-
-        # Add opioid calculation before database logging
-    opioid = "Yes" if (nalbuphine_dose > 0 or fentanyl_dose > 0 or
-                         butorphanol_dose > 0 or pentazocine_dose > 0) else "No"
-
-    # Enhanced logging section with better UI
-    st.markdown("""
+    # Logging runs as its own fragment: its buttons rerun only this section, and it logs the
+    # inputs and predictions risk_panel() last published in st.session_state.
+    @st.fragment
+    @metrics.timed("logging")
+    def log_panel():
+        entry = st.session_state['risk_assessment']
+
+        # Enhanced logging section with better UI
+        st.markdown("""
     <div style='margin: 20px 0; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 10px; border-left: 4px solid #ff8800;'>
         <h4 style='margin: 0 0 10px 0; color: #ff8800;'>📝 Data Logging</h4>
         <p style='margin: 0; font-size: 0.9em; color: #ccc;'>Log this assessment for future reference and analysis.</p>
     </div>
     """, unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("💾 Log This Entry", key='log_entry_button', use_container_width=True):
-            with st.spinner("Saving to database..."):
-                try:
-                    cursor.execute('''
-                        INSERT INTO logs (
-                            gender, smoker, history_ponv, age, anxiety,
-                            abdominal_surgery, volatile, n2o, midazolam,
-                            ondansetron, dexamethasone, glycopyrrolate,
-                            nalbuphine, fentanyl, butorphanol, pentazocine,
-                            propofol_mode, muscle_relaxant, hybrid_score,
-                            predicted_risk_xgb, predicted_risk_lgb
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        "Female" if gender == "Yes" else "Male",
-                        "No" if smoker == "Yes" else "Yes",
-                        "Yes" if history_ponv == "Yes" else "No",
-                        age,
-                        "Yes" if preop_anxiety == "Yes" else "No",
-                        "Yes" if (abdominal_surgery == "Yes" or ent_surgery == "Yes" or gynae_surgery == "Yes") else "No",
-                        "Yes" if volatile_agents == "Yes" else "No",
-                        "Yes" if nitrous_oxide == "Yes" else "No",
-                        midazolam_dose,
-                        ondansetron_dose,
-                        dexamethasone_dose,
-                        glycopyrrolate_dose,
-                        nalbuphine_dose,
-                        fentanyl_dose,
-                        butorphanol_dose,
-                        pentazocine_dose,
-                        propofol_mode,
-                        muscle_relaxant,
-                        hybrid_score,
-                        prob_xgb,
-                        prob_lgb
-                    ))
-                    conn.commit()
-                    st.markdown("""
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Log This Entry", key='log_entry_button', width="stretch"):
+                with st.spinner("Saving to database..."):
+                    try:
+                        cursor.execute(db.INSERT_LOG, (
+                            "Female" if entry['gender'] == "Yes" else "Male",
+                            "No" if entry['smoker'] == "Yes" else "Yes",
+                            "Yes" if entry['history_ponv'] == "Yes" else "No",
+                            entry['age'],
+                            "Yes" if entry['preop_anxiety'] == "Yes" else "No",
+                            "Yes" if (entry['abdominal_surgery'] == "Yes" or entry['ent_surgery'] == "Yes" or entry['gynae_surgery'] == "Yes") else "No",
+                            "Yes" if entry['volatile_agents'] == "Yes" else "No",
+                            "Yes" if entry['nitrous_oxide'] == "Yes" else "No",
+                            entry['midazolam_dose'],
+                            entry['ondansetron_dose'],
+                            entry['dexamethasone_dose'],
+                            entry['glycopyrrolate_dose'],
+                            entry['nalbuphine_dose'],
+                            entry['fentanyl_dose'],
+                            entry['butorphanol_dose'],
+                            entry['pentazocine_dose'],
+                            entry['propofol_mode'],
+                            entry['muscle_relaxant'],
+                            entry['hybrid_score'],
+                            entry['prob_xgb'],
+                            entry['prob_lgb'],
+                            entry['model_version'],
+                        ))
+                        conn.commit()
+                        st.markdown("""
                     <div class='success-message'>
                         ✅ <strong>Entry logged successfully!</strong><br>
                         <small>Data saved to local database for future analysis.</small>
                     </div>
                     """, unsafe_allow_html=True)
-                except sqlite3.Error as e:
-                    st.markdown(f"""
+                    except sqlite3.Error as e:
+                        st.markdown(f"""
                     <div class='error-message'>
                         ❌ <strong>Database error:</strong> {str(e)}
                     </div>
                     """, unsafe_allow_html=True)
-                except NameError as e:
-                    st.markdown(f"""
+                    except KeyError as e:
+                        st.markdown(f"""
                     <div class='error-message'>
                         ❌ <strong>Logging error:</strong> {str(e)}<br>
                         <small>Please ensure all input fields are selected/filled.</small>
                     </div>
                     """, unsafe_allow_html=True)
     
-    with col2:
-        if st.button("📊 Show All Entries", key='show_entries_button', use_container_width=True):
-            with st.spinner("Loading database entries..."):
-                cursor.execute('SELECT * FROM logs ORDER BY timestamp DESC')
-                rows = cursor.fetchall()
-                if rows:
-                    columns = [description[0] for description in cursor.description]
-                    df_log = pd.DataFrame(rows, columns=columns)
+        with col2:
+            if st.button("📊 Show All Entries", key='show_entries_button', width="stretch"):
+                with st.spinner("Loading database entries..."):
+                    cursor.execute('SELECT * FROM logs ORDER BY timestamp DESC')
+                    rows = cursor.fetchall()
+                    if rows:
+                        columns = [description[0] for description in cursor.description]
+                        df_log = pd.DataFrame(rows, columns=columns)
                     
-                    st.markdown("""
+                        st.markdown("""
                     <div class='success-message'>
                         📋 <strong>Database Entries Loaded</strong><br>
                         <small>Found {} entries in the database.</small>
                     </div>
                     """.format(len(rows)), unsafe_allow_html=True)
                     
-                    st.dataframe(df_log, use_container_width=True)
-
-                    if not df_log.empty:
-                        csv = df_log.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            label="📥 Download All Entries as CSV",
-                            data=csv,
-                            file_name='logged_ponv_entries.csv',
-                            mime='text/csv',
-                            key='download_button',
-                            use_container_width=True
-                        )
+                        st.dataframe(df_log, width="stretch")
+
+                        if not df_log.empty:
+                            csv = df_log.to_csv(index=False).encode('utf-8')
+                            st.download_button(
+                                label="📥 Download All Entries as CSV",
+                                data=csv,
+                                file_name='logged_ponv_entries.csv',
+                                mime='text/csv',
+                                key='download_button',
+                                width="stretch"
+                            )
+                        else:
+                            st.warning("No data available to download")
                     else:
-                        st.warning("No data available to download")
-                else:
-                    st.markdown("""
+                        st.markdown("""
                     <div class='error-message'>
                         📭 <strong>No entries found</strong><br>
                         <small>The database is empty. Log some entries first.</small>
                     </div>
                     """, unsafe_allow_html=True)
 
-
-
+    run_timer.lap("logging.database")
+    log_panel()
 
     # Close the database connection when the app is done (or session ends)
     # This might not be strictly necessary in all Streamlit deployments,
@@ -1799,368 +1240,116 @@ with tab1:
     # Explicitly closing might be tricky without a clear app exit event.
     # conn.close() # Avoid closing here as it will break on rerun
 
-    # Add a note about database persistence
-    st.markdown("""
-    <div style='font-size: 0.8em; text-align: center; color: #6c757d; margin: 20px 0;'>
-        <div class='interactive-card' style='padding: 15px; background: rgba(255,255,255,0.05); border-radius: 10px;'>
-            <h5 style='margin: 0 0 10px 0; color: #ff8800;'>💾 Data Persistence</h5>
-            <p style='margin: 0; font-size: 0.9em;'>Data is logged to a local SQLite file (`ponv_logs.db`). This file will persist as long as the Streamlit application's data directory is maintained.</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Add floating action button for quick actions
-    st.markdown("""
-    <div class='fab' onclick='window.scrollTo({top: 0, behavior: "smooth"})' title='Scroll to Top'>
-        ↑
-    </div>
-    """, unsafe_allow_html=True)
-
-
     # ------------------------- DISCLAIMER -------------------------
-    st.markdown("""
-    <div style='margin: 30px 0; padding: 20px; background: #18191a; border-radius: 15px; border-left: 5px solid #fff;'>
-        <div style='display: flex; align-items: center; margin-bottom: 10px;'>
-            <div style='font-size: 1.5em; margin-right: 10px; color: #fff;'>⚠️</div>
-            <h4 style='margin: 0; color: #ff3333; font-family: Arial, Helvetica, sans-serif; font-weight: 700;'>Medical Disclaimer</h4>
-        </div>
-        <p style='margin: 0; font-size: 1em; line-height: 1.6; color: #fff; font-family: Arial, Helvetica, sans-serif;'>
-            <strong>Important:</strong> This application is for informational and educational purposes only and should not be considered a substitute for professional medical advice. The predictions and recommendations provided are based on statistical models and should be used as decision support tools only. Always consult with a qualified healthcare provider for diagnosis and treatment decisions.
-        </p>
-        <div style='margin-top: 10px; font-size: 0.95em; color: #fff; font-family: Arial, Helvetica, sans-serif;'>
-            <strong>Developed by:</strong> Department of Pharmacology - MKCG MedAI Labs<br>
-            <strong>Last Updated:</strong> May 2025
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-with tab2:
-    # ------------------------- DETAILED SCORING BREAKDOWN (Expandable) -------------------------
-    st.subheader("Detailed Scoring Breakdown")
-    with st.expander("View Individual Parameter Contributions"):
-        # Define the score contribution for each parameter based on the sidebar selection
-        parameter_scores = {
-            "Female Gender": binary(gender),
-            "Non-Smoker": binary(smoker),
-            "History of PONV or Motion Sickness": binary(history_ponv),
-            "Age": 1 if age > 50 else 0,
-            "Preoperative Anxiety": binary(preop_anxiety),
-            "History of Migraine": binary(history_migraine),
-            "BMI > 30": binary(obesity),
-            "Abdominal or Laparoscopic Surgery": binary(abdominal_surgery),
-            "ENT/Neurosurgery/Ophthalmic Surgery": binary(ent_surgery),
-            "Gynecological or Breast Surgery": binary(gynae_surgery),
-            "Surgery Duration > 60 min": binary(surgery_duration),
-            "Major Blood Loss > 500 mL": binary(major_blood_loss),
-            "Use of Volatile Agents (Sevo/Iso/Des)": binary(volatile_agents),
-            "Use of Nitrous Oxide": binary(nitrous_oxide),
-            "Midazolam Dose": midazolam_score(midazolam_dose),
-            "Ondansetron Dose": ondansetron_score(ondansetron_dose),
-            "Dexamethasone Dose": dexamethasone_score(dexamethasone_dose),
-            "Glycopyrrolate Dose": glycopyrrolate_score(glycopyrrolate_dose),
-            "Nalbuphine Dose": nalbuphine_score(nalbuphine_dose),
-            "Fentanyl Dose": fentanyl_score(fentanyl_dose),
-            "Butorphanol Dose": butorphanol_score(butorphanol_dose),
-            "Pentazocine Dose": pentazocine_score(pentazocine_dose),
-            "Propofol Use": propofol_score(propofol_mode),
-            "Muscle Relaxant Used": muscle_relaxant_score(muscle_relaxant, muscle_relaxant_dose),
-        }
-
-        # Create a DataFrame for the detailed scoring breakdown
-        df_scoring_breakdown = pd.DataFrame(list(parameter_scores.items()), columns=['Parameter', 'Score Contribution'])
-
-        # Define a function to apply color based on the score
-        def color_score(val):
-            if val > 0:
-                return f'color: #dc3545; font-weight: bold;'  # Red for positive contribution (risk increasing)
-            elif val < 0:
-                return f'color: #28a745; font-weight: bold;'  # Green for negative contribution (risk decreasing)
-            else:
-                return ''  # Default color for 0 contribution
-
-        # Apply the color function to the 'Score Contribution' column
-        styled_df = df_scoring_breakdown.style.applymap(color_score, subset=['Score Contribution'])
-
-        # Display the styled table
-        st.table(styled_df)
+    # Database persistence note, scroll-to-top button and medical disclaimer (static HTML)
+    st.markdown(assets.read('footer.html'), unsafe_allow_html=True)
+    run_timer.skip()
 
 with tab3:
-    st.markdown("""
+    if tab_open(tab3):
+        st.markdown("""
     <div style='font-size:2.2em; font-weight:800; color:#fff; text-align:center; margin-bottom:0.5em;'>Model Training Timeline and Methodological Summary</div>
     """, unsafe_allow_html=True)
-    with st.expander("View Model Training Timeline", expanded=False):
-        st.markdown("""
-        <style>
-        .timeline-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 1.5em;
-            margin-bottom: 1.5em;
-            font-size: 0.9em;
-            font-family: 'Inter', sans-serif;
-            box-shadow: 0 0 20px rgba(0, 0, 0, 0.15);
-            border-radius: 10px;
-            overflow: hidden;
-        }
-        .timeline-table thead tr {
-            background-color: #2b5876;
-            color: #ffffff;
-            text-align: left;
-            font-weight: bold;
-        }
-        .timeline-table th,
-        .timeline-table td {
-            padding: 12px 15px;
-            border: 1px solid #dddddd;
-        }
-        .timeline-table tbody tr {
-            border-bottom: 1px solid #dddddd;
-        }
-        .timeline-table tbody tr:nth-of-type(even) {
-            background-color: #f3f3f3;
-        }
-        .timeline-table tbody tr:last-of-type {
-            border-bottom: 2px solid #2b5876;
-        }
-        .timeline-table tbody tr:hover {
-            background-color: #e9ecef;
-            cursor: pointer;
-        }
-        .phase-cell {
-            font-weight: 600;
-            color: #2b5876;
-        }
-        .dates-cell {
-            font-style: italic;
-            color: #495057;
-        }
-        .n-cell {
-            text-align: center;
-            font-weight: 500;
-        }
-        .key-activities-cell ul {
-            margin: 0;
-            padding-left: 20px;
-        }
-        .key-activities-cell li {
-            margin-bottom: 5px;
-        }
-        .biostat-notes-cell {
-            font-size: 0.85em;
-            color: #495057;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        st.markdown("""
-        <table class="timeline-table">
-            <thead>
-                <tr>
-                    <th>Phase</th>
-                    <th>n</th>
-                    <th>Key Activities</th>
-                    <th>Biostatistical Notes</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td class="phase-cell">1. Synthetic Data Simulation</td>
-                    <td class="n-cell">2,000</td>
-                    <td class="key-activities-cell">
-                        <ul>
-                            <li>Generate CTGAN- and <code>make_classification</code>-based dataset</li>
-                            <li>Apply SMOTE for class balance</li>
-                        </ul>
-                    </td>
-                    <td class="biostat-notes-cell">
-                        • Cross-validate models (k=5)<br>
-                        • Establish Youden's cutoffs on ROC
-                    </td>
-                </tr>
-                <tr>
-                    <td class="phase-cell">2. Pre-Pilot Prospective</td>
-                    <td class="n-cell">250</td>
-                    <td class="key-activities-cell">
-                        <ul>
-                            <li>Real-time EHR capture in OR/Recovery</li>
-                            <li>App usability testing</li>
-                        </ul>
-                    </td>
-                    <td class="biostat-notes-cell">
-                        • Assess score distribution vs. synthetic<br>
-                        • Early calibration by Platt scaling (Logistic regression)
-                    </td>
-                </tr>
-                <tr>
-                    <td class="phase-cell">3. Pilot Retrospective</td>
-                    <td class="n-cell">250</td>
-                    <td class="key-activities-cell">
-                        <ul>
-                            <li>Chart review of historical cases</li>
-                            <li>Verify hybrid score consistency across surgical subtypes</li>
-                        </ul>
-                    </td>
-                    <td class="biostat-notes-cell">
-                        • External validation set: compute AUC, calibration plots, decision curve analysis
-                    </td>
-                </tr>
-            </tbody>
-        </table>
-        """, unsafe_allow_html=True)
-        st.markdown("""
-        <div style='font-size:1.3em; font-weight:700; color:#fff; margin-top:2em; margin-bottom:0.5em;'>Upcoming Project Phases</div>
-        """, unsafe_allow_html=True)
-        st.markdown("""
-        <table class="timeline-table">
-            <thead>
-                <tr>
-                    <th>Phase</th>
-                    <th>n</th>
-                    <th>Key Activities</th>
-                    <th>Biostatistical Notes</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td class="phase-cell">4. Alpha Build Prospective</td>
-                    <td class="n-cell">500</td>
-                    <td class="key-activities-cell">
-                        <ul>
-                            <li>Integrated app deployment in two OR theatres</li>
-                            <li>Prospectively collect outcomes</li>
-                        </ul>
-                    </td>
-                    <td class="biostat-notes-cell">
-                        • Assess model performance on real-world data<br>
-                        • Refine calibration and model parameters
-                    </td>
-                </tr>
-                <tr>
-                    <td class="phase-cell">5. Beta Build Prospective</td>
-                    <td class="n-cell">1,000</td>
-                    <td class="key-activities-cell">
-                        <ul>
-                            <li>Full OR suite deployment</li>
-                            <li>Evaluate impact on clinical workflow and PONV incidence</li>
-                        </ul>
-                    </td>
-                    <td class="biostat-notes-cell">
-                        • Final model validation and performance assessment<br>
-                        • Cost-effectiveness analysis (future)
-                    </td>
-                </tr>
-            </tbody>
-        </table>
-        """, unsafe_allow_html=True)
+        with st.expander("View Model Training Timeline", expanded=False):
+            st.markdown(assets.read('timeline.html'), unsafe_allow_html=True)
+        run_timer.lap("tab3")
 
 with tab4:
-    st.markdown("""
+    if tab_open(tab4):
+        st.markdown("""
     <div style='font-size:2.2em; font-weight:800; color:#fff; text-align:center; margin-bottom:0.5em;'>References</div>
     """, unsafe_allow_html=True)
-    st.markdown("""
-    <table style='width:100%; border-collapse: collapse; margin-top: 1.5em; margin-bottom: 1.5em; font-size: 1em; font-family: Arial, Helvetica, sans-serif; box-shadow: 0 0 20px rgba(0,0,0,0.10); border-radius: 10px; overflow: hidden;'>
-        <thead>
-            <tr style='background-color: #2b5876; color: #fff; text-align: left; font-weight: bold;'>
-                <th style='padding: 12px 15px; border: 1px solid #dddddd;'>Score Name</th>
-                <th style='padding: 12px 15px; border: 1px solid #dddddd;'>Purpose/Context</th>
-                <th style='padding: 12px 15px; border: 1px solid #dddddd;'>Key Reference(s) & Link</th>
-            </tr>
-        </thead>
-        <tbody>
-            <tr style='border-bottom: 1px solid #dddddd;'>
-                <td style='font-weight: 600; color: #2b5876; padding: 12px 15px; border: 1px solid #dddddd;'>Apfel Score</td>
-                <td style='font-size: 0.97em; color: #212529; padding: 12px 15px; border: 1px solid #dddddd;'>PONV risk prediction; 4 risk factors (female gender, non-smoker, history of PONV/motion sickness, postoperative opioids)</td>
-                <td style='font-size: 0.95em; color: #495057; padding: 12px 15px; border: 1px solid #dddddd;'>Apfel CC, Läärä E, Koivuranta M, Greim CA, Roewer N. "A simplified risk score for predicting postoperative nausea and vomiting: Conclusions from cross-validations between two centers." Anesthesiology 1999;91:693–700. <a href='https://doi.org/10.1097/00000542-199909000-00022' target='_blank'>[DOI]</a></td>
-            </tr>
-            <tr style='border-bottom: 1px solid #dddddd;'>
-                <td style='font-weight: 600; color: #2b5876; padding: 12px 15px; border: 1px solid #dddddd;'>Koivuranta Score</td>
-                <td style='font-size: 0.97em; color: #212529; padding: 12px 15px; border: 1px solid #dddddd;'>PONV risk prediction; 5 predictors (female gender, nonsmoking, history of PONV, history of motion sickness, duration of surgery &gt;60 min)</td>
-                <td style='font-size: 0.95em; color: #495057; padding: 12px 15px; border: 1px solid #dddddd;'>Koivuranta M, Läärä E, Snåre L, Alahuhta S. "A survey of postoperative nausea and vomiting." Anaesthesia 1997;52:443–449. <a href='https://doi.org/10.1111/j.1365-2044.1997.00443.x' target='_blank'>[DOI]</a></td>
-            </tr>
-            <tr style='border-bottom: 1px solid #dddddd;'>
-                <td style='font-weight: 600; color: #2b5876; padding: 12px 15px; border: 1px solid #dddddd;'>Sand Score</td>
-                <td style='font-size: 0.97em; color: #212529; padding: 12px 15px; border: 1px solid #dddddd;'>PONV risk prediction; simplified Apfel 4-point model</td>
-                <td style='font-size: 0.95em; color: #495057; padding: 12px 15px; border: 1px solid #dddddd;'>Same as Apfel Score (see above): <a href='https://doi.org/10.1097/00000542-199909000-00022' target='_blank'>[DOI]</a></td>
-            </tr>
-            <tr style='border-bottom: 1px solid #dddddd;'>
-                <td style='font-weight: 600; color: #2b5876; padding: 12px 15px; border: 1px solid #dddddd;'>Bellville Score</td>
-                <td style='font-size: 0.97em; color: #212529; padding: 12px 15px; border: 1px solid #dddddd;'>Severity grading of PONV; measures intensity and frequency</td>
-                <td style='font-size: 0.95em; color: #495057; padding: 12px 15px; border: 1px solid #dddddd;'>Kumar A et al. Indian J Anaesth. 2021;65(6):453-459. <a href='https://www.ijaweb.org/article.asp?issn=0019-5049;year=2021;volume=65;issue=6;spage=453;epage=459;aulast=Kumar' target='_blank'>[IJA 2021]</a><br>JCDR 2022;16(1):UC01-UC05. <a href='https://www.jcdr.net/article_fulltext.asp?issn=0973-709x;year=2022;volume=16;issue=1;page=UC01-UC05' target='_blank'>[JCDR 2022]</a><br>Preoperative ondansetron vs dexamethasone: <a href='https://pubmed.ncbi.nlm.nih.gov/23049494/' target='_blank'>[PubMed]</a></td>
-            </tr>
-        </tbody>
-    </table>
-    <div style='color:#fff; font-size:0.95em; margin-top:1em;'>
-    You can use these links to access the full texts or abstracts of the referenced research papers.
-    </div>
-    """, unsafe_allow_html=True)
+        st.markdown(assets.read('references.html'), unsafe_allow_html=True)
+        run_timer.lap("tab4")
 
 with tab5:
-    st.markdown("""
+    if tab_open(tab5):
+        st.markdown("""
     <div style='background: #000; padding: 30px 10px 30px 10px; border-radius: 16px; box-shadow: 0 4px 32px rgba(0,0,0,0.25);'>
-        <div style='font-size:2.2em; font-weight:800; color:#fff; text-align:center; margin-bottom:0.5em;'>Global Feature Importance (LightGBM)</div>
-        <div style='font-size:1.1em; color:#fff; text-align:center; margin-bottom:1em;'>This section shows which variables have the highest global association with the model's predictions, based on LightGBM's feature importances.</div>
+        <div style='font-size:2.2em; font-weight:800; color:#fff; text-align:center; margin-bottom:0.5em;'>Global Feature Importance</div>
+        <div style='font-size:1.1em; color:#fff; text-align:center; margin-bottom:1em;'>This section shows which variables have the highest global association with the model's predictions, based on LightGBM's and XGBoost's built-in feature importances (total gain or number of splits).</div>
     """, unsafe_allow_html=True)
-    try:
-        import matplotlib.cm as cm
-        importances = lgb_model.feature_importances_
-        indices = np.argsort(importances)[::-1]
-        top_n = 10
-        top_features = np.array(feature_names)[indices][:top_n][::-1]
-        top_importances = importances[indices][:top_n][::-1]
-
-        # Use a colorful colormap
-        cmap = cm.get_cmap('plasma', top_n)
-        colors = [cmap(i) for i in range(top_n)]
-
-        fig, ax = plt.subplots(figsize=(7, 5))
-        fig.patch.set_facecolor('#000')
-        ax.set_facecolor('#000')
-        bars = ax.barh(top_features, top_importances, color=colors, edgecolor='white')
-
-        # Add value labels
-        for bar in bars:
-            ax.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height()/2,
-                    f'{bar.get_width():.0f}', va='center', ha='left', color='white', fontsize=11, fontweight='bold')
-
-        # Set y-tick labels (feature names) to black, bold, simple font
-        ax.set_yticklabels(top_features, color='black', fontweight='bold', fontname='Arial')
-
-        ax.set_xlabel('Importance', color='white')
-        ax.set_title('Top 10 Features (LightGBM)', color='#ffb366', fontsize=16, fontweight='bold')
-        ax.tick_params(axis='x', colors='white')
-        ax.xaxis.label.set_color('white')
-        ax.yaxis.label.set_color('white')
-        ax.title.set_color('#ffb366')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['right'].set_color('white')
-        plt.tight_layout()
-        st.pyplot(fig)
-        # Table of top 10 features
-        import pandas as pd
-        df_feat = pd.DataFrame({
-            'Feature': np.array(feature_names)[indices][:top_n],
-            'Importance': importances[indices][:top_n]
-        })
-        st.subheader("Top 10 Most Important Features")
-        st.table(df_feat)
-    except Exception as e:
-        st.warning(f"Could not display feature importance: {e}")
-    st.markdown("</div>", unsafe_allow_html=True)
 
-plt.rcParams.update({
-    "figure.facecolor": "#ffffff",
-    "axes.facecolor": "#ffffff",
-    "axes.edgecolor": "#000000",
-    "axes.labelcolor": "#000000",
-    "xtick.color": "#000000",
-    "ytick.color": "#000000",
-    "text.color": "#000000",
-    "axes.titlecolor": "#000000",
-    "legend.edgecolor": "#000000",
-    "legend.facecolor": "#ffffff",
-    "legend.labelcolor": "#000000",
-    "savefig.facecolor": "#ffffff",
-    "savefig.edgecolor": "#ffffff",
-    "grid.color": "#cccccc"
-})
+        # Importances for both models and both modes are computed once per model version, and each
+        # chart is rendered once to PNG bytes; later views only look them up.
+        @st.cache_data
+        def importance_table(model_version, _xgb_model, _lgb_model):
+            return importance.global_importance(_xgb_model, _lgb_model, modeling.FEATURE_NAMES)
+
+        @st.cache_data
+        def importance_chart(model_version, model_name, mode, _table):
+            if USE_PLOTLY:
+                return charts.importance_spec(importance.top_features(_table, model_name, mode), model_name, mode)
+            return importance.render_importance_png(_table, model_name, mode)
+
+        try:
+            col1, col2 = st.columns(2)
+            with col1:
+                importance_model = st.radio("Model", ["LightGBM", "XGBoost"], horizontal=True, key='importance_model')
+            with col2:
+                importance_mode = st.radio("Importance type", list(importance.MODES), horizontal=True, key='importance_mode')
+
+            df_importance = importance_table(model_version, xgb_model, lgb_model)
+            importance_figure = importance_chart(model_version, importance_model, importance_mode, df_importance)
+            if USE_PLOTLY:
+                st.plotly_chart(importance_figure, width="stretch")
+            else:
+                st.image(importance_figure)
+
+            # Table of top 10 features
+            st.subheader("Top 10 Most Important Features")
+            st.table(importance.top_features(df_importance, importance_model, importance_mode))
+        except Exception as e:
+            st.warning(f"Could not display feature importance: {e}")
+        st.markdown("</div>", unsafe_allow_html=True)
+        run_timer.lap("tab5")
+
+# Figure lifecycle gauge: open figures should stay at 0 between reruns however long the server runs
+with st.sidebar.expander("Chart Rendering Stats"):
+    figure_stats = figures.stats()
+    st.write(f"Open matplotlib figures: {figures.open_figure_count()}")
+    st.write(f"Cached PNGs: {figure_stats['cached_pngs']} ({figure_stats['cached_bytes'] / 1024:.0f} KB)")
+    st.write(f"Cache hits / misses: {figure_stats['hits']} / {figure_stats['misses']}")
+
+# Live-prediction batching across sessions (see batching.InferenceBroker)
+with st.sidebar.expander("Inference Batching"):
+    broker_stats = inference_broker.stats()
+    st.write(f"Batches / rows: {broker_stats['batches']} / {broker_stats['rows']}")
+    if broker_stats['batches']:
+        st.write(f"Mean batch size: {broker_stats['mean_batch_size']:.1f} (max {broker_stats['max_batch']})")
+        st.write(f"Batch latency p50 / p95: ≤{broker_stats['batch_latency_p50_ms']:g} / ≤{broker_stats['batch_latency_p95_ms']:g} ms")
+        st.write(f"Queue wait p95: ≤{broker_stats['queue_wait_p95_ms']:g} ms (max wait {broker_stats['max_wait_ms']:g} ms)")
+
+# Which model answers predictions and lands in the log's model_version column
+with st.sidebar.expander("Model Version"):
+    st.write(f"Serving: {model_version} ({'registry, active' if served_from_registry else 'trained in app'})")
+    st.write(f"Registered versions: {len(model_registry.versions())}")
+    st.caption("python -m ponv_core.registry list / activate VERSION / rollback")
+
+# Cold-start timings (first script run of this server process); python -m ponv_core.startup reports the same
+# marks together with per-module import costs
+with st.sidebar.expander("Startup Timing"):
+    startup.mark("page_complete")
+    for name, ms in startup.marks().items():
+        st.write(f"{name.replace('_', ' ').capitalize()}: {ms / 1000:.2f} s")
+
+# Per-section timings (PONV_METRICS=1); the same histograms are exported for Prometheus through
+# PONV_METRICS_FILE and/or PONV_METRICS_PORT
+if metrics.ENABLED:
+    with st.sidebar.expander("Section Timings"):
+        for name, section in metrics.section_stats().items():
+            st.write(f"{name}: {section['count']} runs, mean {section['mean_ms']:.1f} ms, p95 ≤{section['p95_ms']:g} ms")
+run_timer.lap("sidebar")
+run_timer.total("rerun")
+metrics.export()
+
+# Profiles of full runs (PONV_PROFILE): rolling top functions and allocation sites over recent profiled runs;
+# with PONV_PROFILE=admin the switches below turn capture on for this session only
+if profiling.ENABLED:
+    with st.sidebar.expander("Profiling"):
+        if "admin" in profiling.MODES:
+            st.toggle("Profile CPU (cProfile)", key='profile_cpu')
+            st.toggle("Profile memory (tracemalloc)", key='profile_memory')
+        st.caption(f"Profiles and summary.txt are written to {profiling.PROFILE_DIR}")
+        st.text(profiling.summary_text(10))
+    profiling.end()
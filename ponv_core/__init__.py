@@ -0,0 +1,2 @@
+# Non-UI building blocks shared by the Streamlit app (ponv.py) and offline tooling.
+# Nothing in this package imports streamlit, so it can run in worker processes.
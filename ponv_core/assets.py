@@ -0,0 +1,30 @@
+import functools
+import hashlib
+from pathlib import Path
+
+# Theme CSS and static HTML fragments (timeline, references, footer) shipped with the package
+STATIC_DIR = Path(__file__).with_name("static")
+
+
+@functools.lru_cache(maxsize=None)
+def read(name):
+    # Each file is read from disk once per process
+    return (STATIC_DIR / name).read_text(encoding="utf-8")
+
+
+@functools.lru_cache(maxsize=None)
+def version():
+    # Short content hash over every static file; changes whenever any of them is edited
+    h = hashlib.sha1()
+    for path in sorted(STATIC_DIR.iterdir()):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()[:10]
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet():
+    # The whole theme as one <style> block tagged with the asset version. Streamlit caches messages
+    # of 10 KB or more in the browser and afterwards sends only their hash, so an unchanged
+    # stylesheet costs a hash reference per rerun instead of ~17 KB.
+    return f"<style>\n/* ponv theme {version()} */\n{read('theme.css')}</style>"
@@ -0,0 +1,128 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from ponv_core.metrics import LATENCY_BUCKETS_MS, SIZE_BUCKETS, Histogram
+
+# Rows per batched model call, and how long the first request of a batch may wait for company
+MAX_BATCH = int(os.environ.get("PONV_BATCH_MAX", 64))
+MAX_WAIT_MS = float(os.environ.get("PONV_BATCH_WAIT_MS", 2.0))
+
+
+class _Request:
+    __slots__ = ("X", "future", "queued_at")
+
+    def __init__(self, X):
+        self.X = X
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+
+# ------------------------- INFERENCE BROKER -------------------------
+class InferenceBroker:
+    # Collects concurrent requests (a few rows each, usually one) from any thread - Streamlit sessions,
+    # API handlers - and answers them with one batched call. The first request of a batch waits at most
+    # max_wait_ms for others; a batch closes early once it holds max_batch rows. A single worker
+    # thread runs predict(X) -> {name: (n,) array} on the stacked rows and hands each caller its slice,
+    # so the models' fixed per-call overhead is paid once per batch instead of once per request.
+    def __init__(self, predict, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.predict_batch = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size = Histogram(SIZE_BUCKETS)
+        self.batch_latency_ms = Histogram(LATENCY_BUCKETS_MS)  # model call per batch
+        self.queue_wait_ms = Histogram(LATENCY_BUCKETS_MS)  # submit -> batch start, per request
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="ponv-inference-broker", daemon=True)
+        self._worker.start()
+
+    def submit(self, X):
+        # X: one feature row or an (n, d) block; returns a Future of {name: (n,) array}
+        request = _Request(np.atleast_2d(np.asarray(X, dtype=float)))
+        # Checked and queued under close()'s lock, so nothing lands behind the worker's stop marker
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("inference broker is closed")
+            self._queue.put(request)
+        return request.future
+
+    def predict(self, X, timeout=None):
+        return self.submit(X).result(timeout)
+
+    def close(self):
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        carry = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is None:
+                return
+            batch, rows = [first], len(first.X)
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while rows < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                if rows + len(request.X) > self.max_batch:
+                    carry = request  # opens the next batch
+                    break
+                batch.append(request)
+                rows += len(request.X)
+            self._run_batch(batch, rows)
+            if stop:
+                return
+
+    def _run_batch(self, batch, rows):
+        started = time.perf_counter()
+        for request in batch:
+            self.queue_wait_ms.observe((started - request.queued_at) * 1000.0)
+        try:
+            out = self.predict_batch(np.vstack([request.X for request in batch]))
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        finally:
+            self.batch_latency_ms.observe((time.perf_counter() - started) * 1000.0)
+            self.batch_size.observe(rows)
+        start = 0
+        for request in batch:
+            stop = start + len(request.X)
+            request.future.set_result({name: values[start:stop] for name, values in out.items()})
+            start = stop
+
+    def stats(self):
+        size = self.batch_size.snapshot()
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": size["count"],
+            "rows": int(size["sum"]),
+            "mean_batch_size": self.batch_size.mean(),
+            "batch_latency_p50_ms": self.batch_latency_ms.quantile(0.5),
+            "batch_latency_p95_ms": self.batch_latency_ms.quantile(0.95),
+            "queue_wait_p95_ms": self.queue_wait_ms.quantile(0.95),
+            "histograms": {
+                "batch_size": size,
+                "batch_latency_ms": self.batch_latency_ms.snapshot(),
+                "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            },
+        }
@@ -0,0 +1,242 @@
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ponv_core import calibration, db, evaluation, explain, modeling, scoring
+from ponv_core.service import Scorer
+
+# A benchmark is slower than its baseline when its median grows by more than this fraction
+DEFAULT_THRESHOLD = 0.25
+
+UPLOAD_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_UPLOAD_SIZES = (10_000,)
+# The full upload evaluation (bootstrap CIs and per-patient contributions included) at these sizes;
+# 1M rows is only scored
+EVALUATION_SIZES = (10_000, 100_000)
+QUICK_EVALUATION_SIZES = (10_000,)
+SYNTHETIC_SIZES = (500, 5_000, 50_000)
+QUICK_SYNTHETIC_SIZES = (500, 5_000)
+
+
+# ------------------------- TIMING -------------------------
+def measure(fn, repeat=5, number=1, items=None, warmup=1):
+    # Median/min/mean wall time per call over `repeat` rounds of `number` calls, after `warmup` calls;
+    # `items` (rows, inserts, ...) handled per call turns the median into a throughput
+    for _ in range(warmup):
+        fn()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number * 1000.0)
+    result = {"median_ms": statistics.median(rounds), "min_ms": min(rounds), "mean_ms": statistics.fmean(rounds),
+              "repeat": repeat, "number": number}
+    if items:
+        result["items"] = items
+        result["items_per_s"] = items / (result["median_ms"] / 1000.0)
+    return result
+
+
+def metadata():
+    versions = {}
+    for package in ("numpy", "pandas", "scikit-learn", "imbalanced-learn", "lightgbm", "xgboost"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+# ------------------------- WORKLOADS -------------------------
+def cohort(n, seed=0):
+    # Feature matrix in the upload schema without the row-by-row synthetic generator, so 1M-row
+    # cohorts are cheap to build; outcomes follow the hybrid score so both classes are present
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n, modeling.N_FEATURES))
+    X[:, 0:14] = rng.binomial(1, 0.5, (n, 14))
+    X[:, 3] = rng.normal(45, 15, n)
+    X[:, 14:22] = rng.exponential(2, (n, 8))
+    X[:, 22] = rng.choice([-3, -1, 0], n)
+    y = (rng.random(n) < 1 / (1 + np.exp(-(scoring.hybrid_score_matrix(X) - 6) / 2))).astype(int)
+    return X, y
+
+
+def _log_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [("Female", "No", "Yes", int(rng.integers(18, 90)), "No", "Yes", "Yes", "No",
+             *map(float, rng.exponential(2, 8)), "TIVA", "None", int(rng.integers(-8, 20)),
+             float(rng.random()), float(rng.random()), "bench") for _ in range(n)]
+
+
+# ------------------------- SUITE -------------------------
+def run_suite(quick=False, only=None, log=print):
+    from sklearn.model_selection import train_test_split
+
+    results = {}
+    repeat = 3 if quick else 5
+
+    def bench(name, fn, **kwargs):
+        if only and not any(part in name for part in only):
+            return
+        log(f"  {name} ...", end="", flush=True)
+        results[name] = measure(fn, **{"repeat": repeat, **kwargs})
+        r = results[name]
+        rate = f"  {r['items_per_s']:,.0f}/s" if "items_per_s" in r else ""
+        log(f"\r  {name:<40} {r['median_ms']:10.3f} ms{rate}")
+
+    # Hybrid score
+    X_small, _ = cohort(1_000)
+    rows_small = X_small.tolist()
+    bench("hybrid_score.scalar[1k rows]", lambda: [scoring.hybrid_score(row) for row in rows_small], items=1_000)
+    X_big, _ = cohort(100_000)
+    bench("hybrid_score.batch[100k rows]", lambda: scoring.hybrid_score_matrix(X_big), items=100_000)
+
+    # Synthetic data
+    for n in (QUICK_SYNTHETIC_SIZES if quick else SYNTHETIC_SIZES):
+        bench(f"synthetic_data[{n}]", lambda n=n: modeling.generate_synthetic_data(n), items=n,
+              repeat=1 if n >= 50_000 else repeat, warmup=0 if n >= 50_000 else 1)
+
+    # Split / scale / SMOTE and training on the app's 500-row data
+    X, y = modeling.generate_synthetic_data(500)
+
+    def preprocess():
+        X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+        return modeling.fit_preprocess(X_train, y_train)
+
+    bench("pipeline.split_scale_smote[500]", preprocess)
+    _, _, X_bal, y_bal = preprocess()
+    bench("train_models[app data]", lambda: modeling.train_models(X_bal, y_bal, lgb_params={"verbose": -1}), repeat=3)
+
+    # Prediction
+    scorer = Scorer.train()
+    row = X[:1]
+    row_scaled = scorer.scaler.transform(row)
+    bench("predict_proba.single_row[xgb]", lambda: scorer.xgb_model.predict_proba(row_scaled), number=50)
+    bench("predict_proba.single_row[lgb]", lambda: scorer.lgb_model.predict_proba(row_scaled), number=50)
+    X_10k_scaled = scorer.scaler.transform(X_big[:10_000])
+    bench("predict_proba.batch[xgb, 10k]", lambda: scorer.xgb_model.predict_proba(X_10k_scaled), items=10_000)
+    bench("predict_proba.batch[lgb, 10k]", lambda: scorer.lgb_model.predict_proba(X_10k_scaled), items=10_000)
+
+    # Upload: the panel's steps (ponv_core.evaluation) with the app's Platt-calibrated hybrid score
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+    hybrid_calibrator = calibration.fit_calibrator(y_train, scoring.hybrid_score_matrix(X_train), "Platt")
+    for n in (QUICK_UPLOAD_SIZES if quick else UPLOAD_SIZES):
+        X_up, _ = cohort(n, seed=1)
+        bench(f"upload.score[{n}]", lambda X_up=X_up: evaluation.score_upload(scorer, X_up),
+              items=n, repeat=1 if n >= 1_000_000 else repeat)
+    for n in (QUICK_EVALUATION_SIZES if quick else EVALUATION_SIZES):
+        X_up, y_up = cohort(n, seed=1)
+        big = n >= 100_000
+        bench(f"upload.evaluate[{n}]",
+              lambda X_up=X_up, y_up=y_up: evaluation.evaluate_upload(scorer, X_up, y_up, hybrid_calibrator),
+              items=n, repeat=1 if big else repeat, warmup=0 if big else 1)
+    X_up, y_up = cohort(10_000, seed=1)
+    contribs = evaluation.evaluate_upload(scorer, X_up, y_up, hybrid_calibrator)["contributions"]
+    bench("upload.contributions_csv[10k]", lambda: explain.cohort_contributions_csv(contribs, modeling.FEATURE_NAMES),
+          items=10_000)
+
+    # SQLite: the app's insert-and-commit per entry, a batched insert, and "Show All Entries"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = db.prepare_database(os.path.join(tmp, "bench.db"))
+        conn = sqlite3.connect(path)
+        rows = _log_rows(200)
+
+        def insert_each():
+            for r in rows:
+                conn.execute(db.INSERT_LOG, r)
+                conn.commit()
+
+        def insert_batch():
+            conn.executemany(db.INSERT_LOG, rows)
+            conn.commit()
+
+        bench("sqlite.insert_commit_each[200]", insert_each, items=200)
+        bench("sqlite.insert_batch[200]", insert_batch, items=200)
+        conn.executemany(db.INSERT_LOG, _log_rows(10_000 - conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]))
+        conn.commit()
+        bench("sqlite.select_all[10k]", lambda: conn.execute("SELECT * FROM logs ORDER BY timestamp DESC").fetchall(),
+              items=10_000)
+        conn.close()
+    return results
+
+
+# ------------------------- COMPARISON -------------------------
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # One row per benchmark present in both runs; ratio > 1 means slower than the baseline
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        rows.append({"name": name, "baseline_ms": base["median_ms"], "current_ms": result["median_ms"],
+                     "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the PONV hot paths, with JSON output and "
+                                                 "regression checks against a saved baseline.")
+    parser.add_argument("-o", "--output", help="write results and machine metadata to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON from an earlier -o run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of the median before a benchmark counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer rounds (skips 1M rows)")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run benchmarks whose name contains NAME")
+    args = parser.parse_args(argv)
+
+    meta = metadata()
+    print(f"PONV benchmarks on {meta['platform']} ({meta['cpu_count']} CPUs), commit {meta['git_commit']}")
+    report = {"metadata": {**meta, "quick": args.quick}, "results": run_suite(args.quick, args.only)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.threshold)
+    print(f"\nAgainst {args.compare} (commit {baseline['metadata'].get('git_commit')}, "
+          f"{baseline['metadata'].get('cpu_count')} CPUs), regression above +{args.threshold:.0%}:")
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"  {row['name']:<40} {row['baseline_ms']:10.3f} -> {row['current_ms']:10.3f} ms "
+              f"({row['ratio']:5.2f}x) {flag}")
+    regressions = [row["name"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Replicates x rows handled per chunk (each replicate x row matrix is then ~16 MB of float64)
+CHUNK_ELEMENTS = 2_000_000
+# Below this many replicate-rows a process pool costs more than it saves
+PARALLEL_MIN_ELEMENTS = 20_000_000
+
+
+def _prepare(y_true, scores):
+    # Sort once by score and find the tie groups; every replicate reuses this ordering
+    y_true = np.asarray(y_true).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(scores, kind="mergesort")
+    s = scores[order]
+    group_starts = np.r_[0, np.flatnonzero(np.diff(s)) + 1]
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    return position, y_true[order], s, group_starts
+
+
+def _by_group(weights, group_starts):
+    # Sum tied columns together (skipped when every score is distinct)
+    if len(group_starts) == weights.shape[-1]:
+        return weights
+    return np.add.reduceat(weights, group_starts, axis=-1)
+
+
+def _above(weights, s_sorted, grid):
+    # Weight at or above each threshold of the grid: one cumulative sum, then one lookup per threshold
+    cut = np.searchsorted(s_sorted, grid, side="left")
+    before = np.concatenate([np.zeros(weights.shape[:-1] + (1,)), np.cumsum(weights, axis=-1)], axis=-1)
+    return before[..., -1:] - before[..., cut]
+
+
+def _chunk_metrics(prepared, grid, n_reps, seed):
+    # Bootstrap a block of replicates at once. Each replicate is an index row; turning it into
+    # per-patient resample counts lets AUC be computed from ranks for all rows in the block:
+    # AUC = sum over positives of (negatives with lower score + half the tied ones) / (P * N).
+    # Sensitivity and specificity come out for every threshold in grid from the same resamples.
+    position, y_sorted, s_sorted, group_starts = prepared
+    n = len(y_sorted)
+    rng = np.random.default_rng(seed)
+    # Sampled patients are mapped to their position in score order, then counted per (replicate, position)
+    flat = position[rng.integers(0, n, size=(n_reps, n))]
+    flat += np.arange(n_reps)[:, None] * n
+    counts = np.bincount(flat.ravel(), minlength=n_reps * n).reshape(n_reps, n).astype(float)
+
+    pos_w = counts * y_sorted
+    neg_w = counts - pos_w
+    pos_g = _by_group(pos_w, group_starts)
+    neg_g = _by_group(neg_w, group_starts)
+    neg_below = np.cumsum(neg_g, axis=1) - neg_g
+    n_pos = pos_g.sum(axis=1)
+    n_neg = neg_g.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = (pos_g * (neg_below + 0.5 * neg_g)).sum(axis=1) / (n_pos * n_neg)
+        sens = _above(pos_w, s_sorted, grid) / n_pos[:, None]
+        spec = 1.0 - _above(neg_w, s_sorted, grid) / n_neg[:, None]
+    return auc, sens, spec
+
+
+def _point_grid(y_true, scores, grid):
+    # Same formulas on the original sample (every patient counted once)
+    _, y_sorted, s_sorted, group_starts = _prepare(y_true, scores)
+    pos_g = _by_group(y_sorted.astype(float), group_starts)
+    neg_g = _by_group(1.0 - y_sorted, group_starts)
+    neg_below = np.cumsum(neg_g) - neg_g
+    n_pos, n_neg = pos_g.sum(), neg_g.sum()
+    return (float((pos_g * (neg_below + 0.5 * neg_g)).sum() / (n_pos * n_neg)),
+            _above(y_sorted.astype(float), s_sorted, grid) / n_pos,
+            1.0 - _above(1.0 - y_sorted, s_sorted, grid) / n_neg)
+
+
+def point_estimates(y_true, scores, threshold=0.5):
+    auc, sens, spec = _point_grid(y_true, scores, np.array([threshold], dtype=float))
+    return {"AUC": auc, "Sensitivity": float(sens[0]), "Specificity": float(spec[0])}
+
+
+# ------------------------- BOOTSTRAP CONFIDENCE INTERVALS -------------------------
+def bootstrap_grid(y_true, scores, grid, n_boot=2000, alpha=0.05, seed=42, n_jobs=None):
+    # Percentile CIs for AUC, and for sensitivity and specificity at every threshold in grid, from
+    # one set of replicates: {"AUC": (point, lo, hi), "Sensitivity"/"Specificity": (points, los, his)}
+    # with one array entry per threshold. Replicates are split into fixed chunks, each with its own
+    # child seed, so the result is the same whether the chunks run serially or across a process pool.
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores, dtype=float)
+    grid = np.atleast_1d(np.asarray(grid, dtype=float))
+    n = len(y_true)
+    reps_per_chunk = max(1, min(n_boot, CHUNK_ELEMENTS // max(n, 1)))
+    sizes = [min(reps_per_chunk, n_boot - start) for start in range(0, n_boot, reps_per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    prepared = _prepare(y_true, scores)
+    if n_jobs is None:
+        n_jobs = (os.cpu_count() or 1) if n_boot * n >= PARALLEL_MIN_ELEMENTS else 1
+    n_jobs = min(n_jobs, len(sizes))
+    if n_jobs > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=ctx) as pool:
+            parts = list(pool.map(_chunk_metrics, [prepared] * len(sizes), [grid] * len(sizes), sizes, seeds))
+    else:
+        parts = [_chunk_metrics(prepared, grid, size, s) for size, s in zip(sizes, seeds)]
+
+    points = _point_grid(y_true, scores, grid)
+    result = {}
+    for i, name in enumerate(["AUC", "Sensitivity", "Specificity"]):
+        reps = np.concatenate([part[i] for part in parts])
+        lo, hi = np.nanpercentile(reps, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+        result[name] = (points[i], lo, hi)
+    return result
+
+
+def ci_at(grid_ci, index):
+    # The bootstrap_ci-style result at one threshold of a bootstrap_grid result
+    return {name: tuple(float(v[index]) if np.ndim(v) else float(v) for v in estimate)
+            for name, estimate in grid_ci.items()}
+
+
+def bootstrap_ci(y_true, scores, threshold=0.5, n_boot=2000, alpha=0.05, seed=42, n_jobs=None):
+    # Percentile CIs for AUC, sensitivity and specificity (at `threshold`)
+    return ci_at(bootstrap_grid(y_true, scores, [threshold], n_boot, alpha, seed, n_jobs), 0)
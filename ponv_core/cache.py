@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+# Root for on-disk caches; override with PONV_CACHE_DIR (e.g. a mounted volume in deployment)
+DEFAULT_CACHE_DIR = os.environ.get("PONV_CACHE_DIR", ".ponv_cache")
+
+# fingerprint() reads this many evenly spaced blocks of this many bytes, whatever the array size
+FINGERPRINT_BLOCKS = 64
+FINGERPRINT_BLOCK_BYTES = 1024
+
+
+def dataset_hash(*arrays, extra=None):
+    # Content hash of one or more arrays (shape + dtype + bytes), plus optional JSON-able extras
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(str(arr.shape).encode())
+        h.update(str(arr.dtype).encode())
+        h.update(arr.tobytes())
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def dataset_id(source, **params):
+    # Identity of a dataset by lineage instead of content: a generator with its seed and size, an
+    # upload with its file ID, or a parent dataset_id plus the step applied to it. Costs the same at
+    # any data size, so it can key caches of large arrays.
+    return hashlib.sha1(json.dumps({"source": source, **params}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def fingerprint(*arrays, extra=None):
+    # Constant-time stand-in for dataset_hash on numeric arrays without a lineage: shape, dtype and
+    # FINGERPRINT_BLOCKS sampled blocks (first and last included; rows of a strided view). Small
+    # arrays are hashed whole. Arrays that differ only between the samples collide, so this keys
+    # results derived from arrays that change as a whole (curves, predictions), not raw data.
+    h = hashlib.sha1()
+    budget = FINGERPRINT_BLOCKS * FINGERPRINT_BLOCK_BYTES
+    for arr in arrays:
+        arr = np.asarray(arr)
+        h.update(str(arr.shape).encode())
+        h.update(str(arr.dtype).encode())
+        if arr.nbytes <= budget:
+            h.update(np.ascontiguousarray(arr).tobytes())
+        elif arr.flags.c_contiguous:
+            flat = arr.reshape(-1).view(np.uint8)
+            for start in np.linspace(0, flat.size - FINGERPRINT_BLOCK_BYTES, FINGERPRINT_BLOCKS).astype(np.int64):
+                h.update(flat[start:start + FINGERPRINT_BLOCK_BYTES].tobytes())
+        else:
+            rows = np.linspace(0, len(arr) - 1, FINGERPRINT_BLOCKS * 16).astype(np.int64)
+            h.update(np.ascontiguousarray(arr[rows]).tobytes())
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class DiskCache:
+    # Pickle-per-key store: <root>/<namespace>/<key>.pkl, written atomically
+    def __init__(self, namespace, root=None):
+        self.dir = os.path.join(root or DEFAULT_CACHE_DIR, namespace)
+
+    def _path(self, key):
+        return os.path.join(self.dir, f"{key}.pkl")
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return default
+
+    def set(self, key, value):
+        os.makedirs(self.dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from ponv_core.cache import DiskCache, dataset_hash
+
+METHODS = ("Platt", "Isotonic")
+
+
+# ------------------------- CALIBRATORS -------------------------
+class Calibrator:
+    # Stores only the fitted mapping, so applying it is a single vectorized array op:
+    # Platt -> sigmoid(a * p + b), Isotonic -> piecewise-linear interpolation over the fitted steps
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+
+    def __call__(self, proba):
+        proba = np.asarray(proba, dtype=float)
+        if self.method == "Platt":
+            return 1.0 / (1.0 + np.exp(-(self.params["a"] * proba + self.params["b"])))
+        return np.interp(proba, self.params["x"], self.params["y"])
+
+
+def fit_calibrator(y_true, proba, method="Platt"):
+    from sklearn.isotonic import IsotonicRegression
+    from sklearn.linear_model import LogisticRegression
+
+    y_true = np.asarray(y_true).astype(int)
+    proba = np.asarray(proba, dtype=float)
+    if method == "Platt":
+        lr = LogisticRegression(C=1e6)
+        lr.fit(proba.reshape(-1, 1), y_true)
+        return Calibrator("Platt", {"a": float(lr.coef_[0, 0]), "b": float(lr.intercept_[0])})
+    iso = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0)
+    iso.fit(proba, y_true)
+    return Calibrator("Isotonic", {"x": iso.X_thresholds_, "y": iso.y_thresholds_})
+
+
+# ------------------------- RELIABILITY / BRIER -------------------------
+def brier_score(y_true, proba):
+    return float(np.mean((np.asarray(proba, dtype=float) - np.asarray(y_true, dtype=float)) ** 2))
+
+
+def reliability_curve(y_true, proba, n_bins=10):
+    # Equal-width bins via one digitize + bincount pass (no per-bin Python loop)
+    y_true = np.asarray(y_true, dtype=float)
+    proba = np.asarray(proba, dtype=float)
+    bins = np.clip((proba * n_bins).astype(int), 0, n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    sum_pred = np.bincount(bins, weights=proba, minlength=n_bins)
+    sum_true = np.bincount(bins, weights=y_true, minlength=n_bins)
+    nonempty = count > 0
+    return pd.DataFrame({
+        "Bin": np.arange(n_bins)[nonempty],
+        "Mean Predicted": sum_pred[nonempty] / count[nonempty],
+        "Observed Rate": sum_true[nonempty] / count[nonempty],
+        "Count": count[nonempty],
+    })
+
+
+def calibration_report(y_true, proba_by_model, calibrators, n_bins=10):
+    # {model: {"Raw"|"Platt"|"Isotonic": {"brier": float, "curve": DataFrame}}}
+    report = {}
+    for model_name, proba in proba_by_model.items():
+        variants = {"Raw": np.asarray(proba, dtype=float)}
+        for method in METHODS:
+            variants[method] = calibrators[model_name][method](proba)
+        report[model_name] = {
+            name: {"brier": brier_score(y_true, p), "curve": reliability_curve(y_true, p, n_bins)}
+            for name, p in variants.items()
+        }
+    return report
+
+
+# ------------------------- PERSISTENCE -------------------------
+def load_or_fit(model_version, y_holdout, proba_by_model, cache_dir=None):
+    # Calibrators and their report are fitted once per model version + held-out set and kept on disk
+    key = f"{model_version}-{dataset_hash(np.asarray(y_holdout), *proba_by_model.values())[:16]}"
+    cache = DiskCache("calibration", root=cache_dir)
+    stored = cache.get(key)
+    if stored is None:
+        calibrators = {
+            model_name: {method: fit_calibrator(y_holdout, proba, method) for method in METHODS}
+            for model_name, proba in proba_by_model.items()
+        }
+        stored = {"calibrators": calibrators, "report": calibration_report(y_holdout, proba_by_model, calibrators)}
+        cache.set(key, stored)
+    return stored["calibrators"], stored["report"]
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+
+try:
+    import plotly.graph_objects as go
+except ImportError:  # plotly is optional; the app falls back to static matplotlib charts
+    go = None
+
+# Upper bound on points shipped per curve, whatever the size of the dataset behind it
+MAX_CURVE_POINTS = 200
+MODEL_COLORS = {"LightGBM": "#1f77b4", "XGBoost": "#ff7f0e", "Hybrid Score": "#2ca02c"}
+
+
+def use_plotly():
+    # PONV_CHARTS=matplotlib forces the static fallback (e.g. for printing)
+    return go is not None and os.environ.get("PONV_CHARTS", "plotly") != "matplotlib"
+
+
+# ------------------------- DOWNSAMPLING -------------------------
+def downsample_curve(x, y, max_points=MAX_CURVE_POINTS):
+    # Keep points evenly spaced along the curve's path length (ROC/DCA curves are monotone in x),
+    # always keeping both end points, so the shape survives while the payload stays bounded.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= max_points:
+        return x, y
+    path = np.r_[0.0, np.cumsum(np.hypot(np.diff(x), np.diff(y)))]
+    # The last target is the last point itself (not the first point reaching the full length, which
+    # repeated end points would make a different one), so at most max_points are kept
+    targets = np.linspace(0.0, path[-1], max_points)[:-1]
+    keep = np.unique(np.r_[np.searchsorted(path, targets), len(x) - 1])
+    return x[keep], y[keep]
+
+
+def _white_layout(title, xaxis_title, yaxis_title, height=350):
+    return dict(
+        title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title,
+        template="plotly_white", height=height, margin=dict(l=40, r=20, t=50, b=40),
+        legend=dict(x=0.99, y=0.01, xanchor="right", yanchor="bottom"),
+    )
+
+
+# ------------------------- CHART SPECS -------------------------
+def roc_spec(curves, title, height=350):
+    # curves: list of (model name, fpr, tpr, auc); returns a JSON-able Plotly figure dict
+    fig = go.Figure()
+    for name, fpr, tpr, roc_auc in curves:
+        fpr, tpr = downsample_curve(fpr, tpr)
+        fig.add_trace(go.Scatter(x=fpr, y=tpr, mode="lines", name=f"{name} (AUC = {roc_auc:.3f})",
+                                 line=dict(color=MODEL_COLORS.get(name))))
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode="lines", name="Chance (AUC = 0.50)",
+                             line=dict(color="black", dash="dash")))
+    fig.update_layout(**_white_layout(title, "False Positive Rate", "True Positive Rate", height))
+    return fig.to_dict()
+
+
+def reliability_spec(report, model_name, height=350):
+    # report: {"Raw"|"Platt"|"Isotonic": {"curve": DataFrame, ...}} for one model
+    fig = go.Figure()
+    for variant, entry in report.items():
+        curve = entry["curve"]
+        fig.add_trace(go.Scatter(x=curve["Mean Predicted"], y=curve["Observed Rate"], mode="lines+markers",
+                                 name=variant, customdata=curve["Count"],
+                                 hovertemplate="Predicted %{x:.2f}<br>Observed %{y:.2f}<br>n = %{customdata}"))
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode="lines", name="Perfect calibration",
+                             line=dict(color="black", dash="dash")))
+    layout = _white_layout(f"Reliability Curve ({model_name})", "Mean Predicted Probability", "Observed PONV Rate", height)
+    layout["legend"] = dict(x=0.01, y=0.99)
+    fig.update_layout(**layout)
+    return fig.to_dict()
+
+
+def decision_curve_spec(curves, title, height=400):
+    # curves: DataFrame from dca.decision_curves
+    fig = go.Figure()
+    for strategy in ["LightGBM", "XGBoost", "Hybrid Score"]:
+        x, y = downsample_curve(curves["Threshold"], curves[strategy])
+        fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=strategy, line=dict(color=MODEL_COLORS[strategy])))
+    fig.add_trace(go.Scatter(x=curves["Threshold"], y=curves["Treat All"], mode="lines", name="Treat All",
+                             line=dict(color="grey")))
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 0], mode="lines", name="Treat None",
+                             line=dict(color="black", dash="dash")))
+    top = max(curves[["LightGBM", "XGBoost", "Hybrid Score", "Treat All"]].max().max(), 0.05)
+    layout = _white_layout(title, "Threshold Probability", "Net Benefit", height)
+    layout["legend"] = dict(x=0.99, y=0.99, xanchor="right")
+    fig.update_layout(**layout)
+    fig.update_yaxes(range=[-0.05, top * 1.1])
+    return fig.to_dict()
+
+
+def importance_spec(top, model_name, mode):
+    # top: DataFrame(Feature, Importance) sorted descending, as from importance.top_features
+    top = top.iloc[::-1]
+    label_fmt = "%{x:.0f}" if mode == "Split" else "%{x:.1f}"
+    fig = go.Figure(go.Bar(
+        x=top["Importance"], y=top["Feature"], orientation="h",
+        marker=dict(color=np.arange(len(top)), colorscale="Plasma", line=dict(color="white", width=1)),
+        texttemplate=label_fmt, textposition="outside", textfont=dict(color="white"),
+    ))
+    fig.update_layout(
+        title=dict(text=f"Top {len(top)} Features ({model_name}, {mode})", font=dict(color="#ffb366", size=18)),
+        paper_bgcolor="#000", plot_bgcolor="#000", font=dict(color="white"), height=450,
+        xaxis=dict(title=f"Importance ({mode.lower()})", range=[0, (top["Importance"].max() or 1) * 1.18],
+                   showgrid=False, linecolor="white"),
+        yaxis=dict(linecolor="white"), margin=dict(l=10, r=20, t=50, b=40),
+    )
+    return fig.to_dict()
@@ -0,0 +1,163 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from ponv_core import db, modeling, registry, scoring, tuning
+from ponv_core.service import Scorer
+
+# Rows read, scored and written per step; memory stays bounded by workers x chunk size
+DEFAULT_CHUNK_ROWS = 10_000
+
+_worker_scorer = None
+
+
+# ------------------------- CHUNK SCORING -------------------------
+def score_frame(scorer, df):
+    # Input columns plus the same result columns as the app's upload evaluation
+    scores = scorer.score_matrix(df[modeling.FEATURE_NAMES].to_numpy(dtype=scorer.dtype))
+    out = df.copy()
+    out["Hybrid_Score_Calculated"] = scores["hybrid_score"]
+    out["Risk_Category"] = [scoring.risk_category(int(s))[0] for s in scores["hybrid_score"]]
+    out["Predicted_Risk_XGBoost"] = scores["prob_xgb"]
+    out["Predicted_Risk_LightGBM"] = scores["prob_lgb"]
+    return out
+
+
+def _init_worker(scorer):
+    # One thread per model inside each worker so N workers use N cores, not N x all cores
+    global _worker_scorer
+    scorer.xgb_model.set_params(n_jobs=1)
+    scorer.lgb_model.set_params(n_jobs=1)
+    _worker_scorer = scorer
+
+
+def _score_chunk(df):
+    return score_frame(_worker_scorer, df)
+
+
+# ------------------------- STREAMING PIPELINE -------------------------
+def score_csv(src, dst, scorer, workers=1, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None):
+    # Reads src in chunks, scores them on `workers` processes and appends each scored chunk to dst
+    # in input order as soon as it and every chunk before it are done. At most 2 x workers chunks
+    # are in flight, so input of any length streams through in bounded memory.
+    reader = pd.read_csv(src, chunksize=chunk_rows, dtype=modeling.csv_dtypes())
+    rows = 0
+    header = True
+
+    def write(frame):
+        nonlocal rows, header
+        frame.to_csv(dst, index=False, header=header)
+        header = False
+        rows += len(frame)
+        if progress:
+            progress(rows)
+
+    def check(chunk):
+        missing = [name for name in modeling.FEATURE_NAMES if name not in chunk.columns]
+        if missing:
+            raise ValueError(f"input is missing columns: {', '.join(missing)}")
+        return chunk
+
+    if workers <= 1:
+        for chunk in reader:
+            write(score_frame(scorer, check(chunk)))
+        return rows
+
+    # "spawn" avoids forking a parent that already holds OpenMP threads (as in cv.py)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(scorer,)) as pool:
+        pending = deque()
+        for chunk in reader:
+            pending.append(pool.submit(_score_chunk, check(chunk)))
+            while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    return rows
+
+
+# ------------------------- COMMAND LINE -------------------------
+@contextmanager
+def _stdout_to_stderr():
+    # LightGBM/XGBoost log from native code straight to file descriptor 1; keep that out of a CSV on stdout
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def score_command(args):
+    # A missing input is reported before the models are loaded or trained
+    if args.input != "-" and not os.path.isfile(args.input):
+        raise FileNotFoundError(f"no such input file: {args.input}")
+    started = time.perf_counter()
+    with _stdout_to_stderr():
+        scorer = Scorer.serving(args.tuning_dir, args.db, args.model_dir, log=lambda msg: print(msg, file=sys.stderr))
+    ready = time.perf_counter()
+    print(f"Model {scorer.model_version} ready in {ready - started:.1f} s", file=sys.stderr)
+
+    def progress(rows):
+        elapsed = time.perf_counter() - ready
+        print(f"\r{rows:,} rows  {rows / elapsed:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    src = sys.stdin if args.input == "-" else args.input
+    if args.output == "-":
+        rows = score_csv(src, sys.stdout, scorer, args.workers, args.chunk_rows, None if args.quiet else progress)
+    else:
+        # Written next to the output and renamed over it on success, so a failed run leaves no partial file
+        tmp = f"{args.output}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", newline="") as dst:
+                rows = score_csv(src, dst, scorer, args.workers, args.chunk_rows, None if args.quiet else progress)
+            os.replace(tmp, args.output)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+    elapsed = time.perf_counter() - ready
+    print(f"{'' if args.quiet else chr(10)}Scored {rows:,} rows in {elapsed:.1f} s "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s, {args.workers} worker(s))", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ponv", description="PONV Risk Pro command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score a CSV (upload schema) without the UI",
+                                description="Adds Hybrid_Score_Calculated, Risk_Category, Predicted_Risk_XGBoost "
+                                            "and Predicted_Risk_LightGBM to every row, streaming in chunks.")
+    score.add_argument("input", help="CSV with the feature columns of the upload schema ('-' for stdin)")
+    score.add_argument("-o", "--output", default="-", help="output CSV (default: stdout)")
+    score.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                       help="worker processes (default: one per core)")
+    score.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    score.add_argument("--tuning-dir", default=tuning.DEFAULT_TUNING_DIR)
+    score.add_argument("--db", default=db.DEFAULT_DB_PATH, help="database holding the model registry")
+    score.add_argument("--model-dir", default=registry.DEFAULT_MODEL_DIR)
+    score.add_argument("-q", "--quiet", action="store_true", help="no progress line")
+    score.set_defaults(run=score_command)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ponv_core.cache import DiskCache, dataset_hash
+from ponv_core.modeling import RANDOM_STATE, fit_preprocess, train_models
+
+MODEL_NAMES = ("LightGBM", "XGBoost")
+
+
+# ------------------------- SINGLE FOLD -------------------------
+def _run_fold(fold, X, y, train_idx, test_idx, xgb_params, lgb_params):
+    # Scaling and SMOTE are fitted inside the fold so no information leaks from the held-out rows
+    from sklearn.metrics import roc_auc_score
+
+    scaler, _, X_bal, y_bal = fit_preprocess(X[train_idx], y[train_idx])
+    xgb_model, lgb_model = train_models(X_bal, y_bal, xgb_params, lgb_params)
+    X_test = scaler.transform(X[test_idx])
+    y_test = y[test_idx]
+    proba = {
+        "LightGBM": lgb_model.predict_proba(X_test)[:, 1],
+        "XGBoost": xgb_model.predict_proba(X_test)[:, 1],
+    }
+    auc_scores = {}
+    for name in MODEL_NAMES:
+        auc_scores[name] = roc_auc_score(y_test, proba[name]) if len(np.unique(y_test)) > 1 else np.nan
+    return {"fold": fold, "test_idx": test_idx, "y_true": y_test, "proba": proba, "auc": auc_scores}
+
+
+# ------------------------- K-FOLD ENGINE -------------------------
+def cross_validate(X, y, k=5, seed=RANDOM_STATE, n_jobs=None, xgb_params=None, lgb_params=None, cache_dir=None):
+    from sklearn.model_selection import StratifiedKFold
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    key = dataset_hash(X, y, extra={"k": k, "seed": seed, "xgb": xgb_params, "lgb": lgb_params})
+    cache = DiskCache(f"cv/{key}", root=cache_dir)
+
+    folds = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=seed).split(X, y))
+    results = [cache.get(f"fold_{i}") for i in range(k)]
+    missing = [i for i, r in enumerate(results) if r is None]
+
+    if missing:
+        n_jobs = n_jobs or min(len(missing), os.cpu_count() or 1)
+        if n_jobs > 1:
+            # One thread per model inside each worker so the pool doesn't oversubscribe cores.
+            # "spawn" avoids forking a parent that already holds OpenMP/Streamlit threads.
+            worker_xgb = {**(xgb_params or {}), "n_jobs": 1}
+            worker_lgb = {**(lgb_params or {}), "n_jobs": 1}
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=ctx) as pool:
+                futures = {
+                    i: pool.submit(_run_fold, i, X, y, folds[i][0], folds[i][1], worker_xgb, worker_lgb)
+                    for i in missing
+                }
+                for i, fut in futures.items():
+                    results[i] = fut.result()
+                    cache.set(f"fold_{i}", results[i])
+        else:
+            for i in missing:
+                results[i] = _run_fold(i, X, y, folds[i][0], folds[i][1], xgb_params, lgb_params)
+                cache.set(f"fold_{i}", results[i])
+
+    return results
+
+
+def cv_summary(results):
+    # Mean ± SD of per-fold AUC for each model
+    rows = []
+    for name in MODEL_NAMES:
+        scores = np.array([r["auc"][name] for r in results], dtype=float)
+        rows.append({
+            "Model": name,
+            "Mean AUC": np.nanmean(scores),
+            "SD AUC": np.nanstd(scores, ddof=1) if np.sum(~np.isnan(scores)) > 1 else np.nan,
+            "Folds": int(np.sum(~np.isnan(scores))),
+        })
+    return pd.DataFrame(rows)
+
+
+def out_of_fold_predictions(results, n_samples):
+    # Reassemble fold predictions into one out-of-fold vector per model
+    oof = {name: np.full(n_samples, np.nan) for name in MODEL_NAMES}
+    for r in results:
+        for name in MODEL_NAMES:
+            oof[name][r["test_idx"]] = r["proba"][name]
+    return oof
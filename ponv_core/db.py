@@ -0,0 +1,103 @@
+import sqlite3
+
+# Risk-assessment log written by the app's "Log This Entry" button
+DEFAULT_DB_PATH = "ponv_logs.db"
+
+LOGS_TABLE = '''
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gender TEXT,
+    smoker TEXT,
+    history_ponv TEXT,
+    age INTEGER,
+    anxiety TEXT,
+    abdominal_surgery TEXT,
+    volatile TEXT,
+    n2o TEXT,
+    midazolam REAL,
+    ondansetron REAL,
+    dexamethasone REAL,
+    glycopyrrolate REAL,
+    nalbuphine REAL,
+    fentanyl REAL,
+    butorphanol REAL,
+    pentazocine REAL,
+    propofol_mode TEXT,
+    muscle_relaxant TEXT,
+    hybrid_score INTEGER,
+    predicted_risk_xgb REAL,
+    predicted_risk_lgb REAL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    model_version TEXT
+)
+'''
+
+# Model registry (see registry.py): one row per registered model, and a single-row pointer to the
+# version the app serves
+MODELS_TABLE = '''
+CREATE TABLE IF NOT EXISTS models (
+    version TEXT PRIMARY KEY,
+    artifact_path TEXT NOT NULL,
+    artifact_sha256 TEXT NOT NULL,
+    data_fingerprint TEXT,
+    metrics TEXT,
+    params TEXT,
+    source TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+ACTIVE_MODEL_TABLE = '''
+CREATE TABLE IF NOT EXISTS active_model (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version TEXT REFERENCES models(version),
+    previous_version TEXT,
+    activated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+# Columns added after the first release; older databases get them on start-up
+MIGRATIONS = [
+    ("glycopyrrolate", "REAL"),
+    ("nalbuphine", "REAL"),
+    ("fentanyl", "REAL"),
+    ("butorphanol", "REAL"),
+    ("pentazocine", "REAL"),
+    ("propofol_mode", "TEXT"),
+    ("muscle_relaxant", "TEXT"),
+    ("predicted_risk_xgb", "REAL"),
+    ("predicted_risk_lgb", "REAL"),
+    ("model_version", "TEXT"),
+]
+
+INSERT_LOG = '''
+INSERT INTO logs (
+    gender, smoker, history_ponv, age, anxiety,
+    abdominal_surgery, volatile, n2o, midazolam,
+    ondansetron, dexamethasone, glycopyrrolate,
+    nalbuphine, fentanyl, butorphanol, pentazocine,
+    propofol_mode, muscle_relaxant, hybrid_score,
+    predicted_risk_xgb, predicted_risk_lgb, model_version
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def add_column_if_not_exists(conn, table_name, column_name, column_type):
+    columns = [col[1] for col in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
+    if column_name not in columns:
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+        conn.commit()
+
+
+def prepare_database(db_path=DEFAULT_DB_PATH):
+    # Create the logs and registry tables if needed and bring an older logs table up to the current columns
+    conn = sqlite3.connect(db_path)
+    try:
+        for table in (LOGS_TABLE, MODELS_TABLE, ACTIVE_MODEL_TABLE):
+            conn.execute(table)
+        conn.commit()
+        for column_name, column_type in MIGRATIONS:
+            add_column_if_not_exists(conn, "logs", column_name, column_type)
+    finally:
+        conn.close()
+    return db_path
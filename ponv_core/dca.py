@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from ponv_core.cache import DiskCache, dataset_hash
+
+# Threshold probabilities evaluated by default (1% to 99% in 0.5% steps)
+DEFAULT_THRESHOLDS = np.round(np.arange(0.01, 0.9901, 0.005), 4)
+
+
+# ------------------------- NET BENEFIT -------------------------
+def net_benefit(y_true, proba, thresholds=DEFAULT_THRESHOLDS):
+    # Net benefit = TP/n - FP/n * pt / (1 - pt) for every threshold pt.
+    # Predictions are sorted once; a single searchsorted over all thresholds gives how many
+    # patients would be treated at each pt, and cumulative sums give the TP/FP among them.
+    y_true = np.asarray(y_true, dtype=float)
+    proba = np.asarray(proba, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+    n = len(y_true)
+    order = np.argsort(-proba, kind="mergesort")
+    tp_cum = np.r_[0.0, np.cumsum(y_true[order])]
+    treated = np.searchsorted(-proba[order], -thresholds, side="right")
+    tp = tp_cum[treated]
+    fp = treated - tp
+    return tp / n - fp / n * thresholds / (1 - thresholds)
+
+
+def treat_all(y_true, thresholds=DEFAULT_THRESHOLDS):
+    prevalence = float(np.mean(y_true))
+    thresholds = np.asarray(thresholds, dtype=float)
+    return prevalence - (1 - prevalence) * thresholds / (1 - thresholds)
+
+
+def decision_curves(y_true, proba_by_strategy, thresholds=DEFAULT_THRESHOLDS):
+    curves = {"Threshold": np.asarray(thresholds, dtype=float)}
+    for name, proba in proba_by_strategy.items():
+        curves[name] = net_benefit(y_true, proba, thresholds)
+    curves["Treat All"] = treat_all(y_true, thresholds)
+    curves["Treat None"] = np.zeros(len(curves["Threshold"]))
+    return pd.DataFrame(curves)
+
+
+def cached_decision_curves(y_true, proba_by_strategy, thresholds=DEFAULT_THRESHOLDS, cache_dir=None):
+    # Decision curves persisted per dataset hash (outcomes + every strategy's predictions)
+    key = dataset_hash(np.asarray(y_true), np.asarray(thresholds), *proba_by_strategy.values(),
+                       extra=sorted(proba_by_strategy))
+    cache = DiskCache("dca", root=cache_dir)
+    curves = cache.get(key)
+    if curves is None:
+        curves = decision_curves(y_true, proba_by_strategy, thresholds)
+        cache.set(key, curves)
+    return curves
@@ -0,0 +1,68 @@
+import numpy as np
+
+from ponv_core import bootstrap, dca, explain, modeling, scoring
+
+# Result keys of score_upload per model, in the order the app reports them
+MODEL_SCORES = {"XGBoost": "prob_xgb", "LightGBM": "prob_lgb"}
+
+
+# ------------------------- UPLOAD EVALUATION -------------------------
+# The upload panel's computations. The app runs each step through its own caches (keyed per upload);
+# the benchmarks run evaluate_upload, the same steps uncached, so a step that gets slower shows up there.
+def score_upload(scorer, X):
+    # Both models' probabilities and the hybrid score for every row, plus the scaled features the
+    # contributions are computed from
+    X = modeling.as_features(X, scorer.dtype)
+    X_scaled = scorer.scaler.transform(X)
+    return {
+        "hybrid_score": scoring.hybrid_score_matrix(X),
+        "prob_xgb": scorer.xgb_model.predict_proba(X_scaled)[:, 1],
+        "prob_lgb": scorer.lgb_model.predict_proba(X_scaled)[:, 1],
+        "X_scaled": X_scaled,
+    }
+
+
+def threshold_metrics(y_true, proba, threshold=0.5):
+    # Accuracy, precision, recall and F1 when predicting PONV at proba >= threshold
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    preds = (np.asarray(proba) >= threshold).astype(int)
+    values = [accuracy_score(y_true, preds)]
+    for metric in (precision_score, recall_score, f1_score):
+        try:
+            values.append(metric(y_true, preds, zero_division=0))
+        except ValueError:
+            values.append(np.nan)
+    return tuple(values)
+
+
+def roc_curves(y_true, scores):
+    # (model name, fpr, tpr, AUC) per model, as show_roc draws them
+    from sklearn.metrics import auc, roc_curve
+
+    curves = []
+    for name, key in MODEL_SCORES.items():
+        fpr, tpr, _ = roc_curve(y_true, scores[key])
+        curves.append((name, fpr, tpr, auc(fpr, tpr)))
+    return curves
+
+
+def strategies(scores, hybrid_calibrator):
+    # Predictions compared on the net-benefit scale; the hybrid score goes through its Platt calibrator
+    return {"LightGBM": scores["prob_lgb"], "XGBoost": scores["prob_xgb"],
+            "Hybrid Score": hybrid_calibrator(scores["hybrid_score"])}
+
+
+def evaluate_upload(scorer, X, y_true, hybrid_calibrator, threshold=0.5, n_boot=2000):
+    # Everything the upload panel computes for a new upload with both outcomes present
+    y_true = np.asarray(y_true)
+    scores = score_upload(scorer, X)
+    return {
+        "scores": scores,
+        "metrics": {name: threshold_metrics(y_true, scores[key], threshold) for name, key in MODEL_SCORES.items()},
+        "auc_ci": {name: bootstrap.bootstrap_ci(y_true, scores[key], n_boot=n_boot)["AUC"]
+                   for name, key in MODEL_SCORES.items()},
+        "roc": roc_curves(y_true, scores),
+        "decision_curves": dca.decision_curves(y_true, strategies(scores, hybrid_calibrator)),
+        "contributions": explain.tree_contributions(scorer.xgb_model, scorer.lgb_model, scores["X_scaled"]),
+    }
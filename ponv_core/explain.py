@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MODEL_NAMES = ("LightGBM", "XGBoost")
+
+
+# ------------------------- NATIVE TREE CONTRIBUTIONS -------------------------
+def tree_contributions(xgb_model, lgb_model, X_scaled):
+    # Exact TreeSHAP attributions from each library's own C++ implementation, one call per model
+    # for the whole batch. Shape (n_rows, n_features + 1) in log-odds; the last column is the bias.
+    import xgboost as xgb
+
+    X_scaled = np.asarray(X_scaled, dtype=float)
+    return {
+        "LightGBM": np.asarray(lgb_model.predict(X_scaled, pred_contrib=True)),
+        "XGBoost": xgb_model.get_booster().predict(xgb.DMatrix(X_scaled), pred_contribs=True),
+    }
+
+
+class ContributionCache:
+    # LRU of per-row contributions keyed by (model version, feature-vector bytes). A cohort lookup
+    # computes only the rows it hasn't seen, still in a single native call per model.
+    def __init__(self, max_rows=50_000):
+        self.max_rows = max_rows
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_version, xgb_model, lgb_model, X_scaled):
+        X_scaled = np.ascontiguousarray(X_scaled, dtype=float)
+        keys = [(model_version, row.tobytes()) for row in X_scaled]
+        with self._lock:
+            cached = [self._rows.get(k) for k in keys]
+            for k, hit in zip(keys, cached):
+                if hit is not None:
+                    self._rows.move_to_end(k)
+        missing = [i for i, hit in enumerate(cached) if hit is None]
+        if missing:
+            fresh = tree_contributions(xgb_model, lgb_model, X_scaled[missing])
+            with self._lock:
+                for j, i in enumerate(missing):
+                    cached[i] = {name: fresh[name][j] for name in MODEL_NAMES}
+                    self._rows[keys[i]] = cached[i]
+                while len(self._rows) > self.max_rows:
+                    self._rows.popitem(last=False)
+        return {name: np.vstack([row[name] for row in cached]) for name in MODEL_NAMES}
+
+
+def contribution_frame(contrib_row, feature_names, feature_values=None, top_n=None):
+    # One patient's attribution table, largest absolute effect first
+    frame = pd.DataFrame({"Feature": list(feature_names), "Contribution (log-odds)": contrib_row[:-1]})
+    if feature_values is not None:
+        frame.insert(1, "Value", np.asarray(feature_values))
+    frame = frame.reindex(frame["Contribution (log-odds)"].abs().sort_values(ascending=False).index)
+    return frame.head(top_n).reset_index(drop=True) if top_n else frame.reset_index(drop=True)
+
+
+def cohort_contributions_frame(contribs, feature_names):
+    # Wide per-patient table: one column per (model, feature) plus each model's bias term
+    columns = {}
+    for name in MODEL_NAMES:
+        for j, feature in enumerate(feature_names):
+            columns[f"{name}: {feature}"] = contribs[name][:, j]
+        columns[f"{name}: Bias"] = contribs[name][:, -1]
+    return pd.DataFrame(columns)
+
+
+def cohort_contributions_csv(contribs, feature_names):
+    # Download payload; six significant digits are plenty for log-odds and keep large cohorts small
+    frame = cohort_contributions_frame(contribs, feature_names)
+    return frame.to_csv(index=False, float_format="%.6g").encode("utf-8")
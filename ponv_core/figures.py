@@ -0,0 +1,99 @@
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ponv_core.cache import fingerprint
+
+# Rendered PNGs kept in memory (LRU); charts are a few tens of KB each
+MAX_CACHED_PNGS = 128
+
+# White chart theme, scoped to each render so the process-wide rcParams stay untouched
+# (matplotlib is imported on the first render only)
+RC_PARAMS = {
+    "figure.facecolor": "#ffffff",
+    "axes.facecolor": "#ffffff",
+    "axes.edgecolor": "#000000",
+    "axes.labelcolor": "#000000",
+    "xtick.color": "#000000",
+    "ytick.color": "#000000",
+    "text.color": "#000000",
+    "axes.titlecolor": "#000000",
+    "legend.edgecolor": "#000000",
+    "legend.facecolor": "#ffffff",
+    "legend.labelcolor": "#000000",
+    "savefig.facecolor": "#ffffff",
+    "savefig.edgecolor": "#ffffff",
+    "grid.color": "#cccccc",
+}
+
+_png_cache = OrderedDict()
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "rendered": 0, "live": 0}
+
+
+def content_key(*parts):
+    # Hash of everything a chart depends on (arrays by sampled fingerprint, everything else by repr)
+    h = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray) or hasattr(part, "to_numpy"):
+            h.update(fingerprint(part.to_numpy() if hasattr(part, "to_numpy") else part).encode())
+        else:
+            h.update(repr(part).encode())
+    return h.hexdigest()
+
+
+def figure_to_png(draw, figsize=(6, 4), dpi=100):
+    # Draw on a Figure that is never registered with pyplot, save it and release it immediately
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    fig = None
+    with _lock:
+        _counters["live"] += 1
+    try:
+        with matplotlib.rc_context(RC_PARAMS):
+            fig = Figure(figsize=figsize)
+            draw(fig)
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png", facecolor=fig.get_facecolor(), dpi=dpi)
+        return buf.getvalue()
+    finally:
+        if fig is not None:
+            fig.clear()
+        with _lock:
+            _counters["live"] -= 1
+            _counters["rendered"] += 1
+
+
+def render_png(key, draw, figsize=(6, 4), dpi=100):
+    # Memoized figure_to_png: identical content keys reuse the stored bytes
+    with _lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+            _counters["hits"] += 1
+            return png
+        _counters["misses"] += 1
+    png = figure_to_png(draw, figsize, dpi)
+    with _lock:
+        _png_cache[key] = png
+        while len(_png_cache) > MAX_CACHED_PNGS:
+            _png_cache.popitem(last=False)
+    return png
+
+
+def open_figure_count():
+    # Gauge: figures currently alive, i.e. being drawn here plus anything left in pyplot's registry
+    # (only if something has imported pyplot; reading the gauge must not import it)
+    plt = sys.modules.get("matplotlib.pyplot")
+    return _counters["live"] + (len(plt.get_fignums()) if plt is not None else 0)
+
+
+def stats():
+    with _lock:
+        return {**_counters, "cached_pngs": len(_png_cache),
+                "cached_bytes": sum(len(v) for v in _png_cache.values())}
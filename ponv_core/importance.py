@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from ponv_core.figures import figure_to_png
+
+MODES = ("Gain", "Split")
+# XGBoost calls split counts "weight"
+_XGB_TYPES = {"Gain": "total_gain", "Split": "weight"}
+_LGB_TYPES = {"Gain": "gain", "Split": "split"}
+
+
+# ------------------------- IMPORTANCE DATA -------------------------
+def global_importance(xgb_model, lgb_model, feature_names):
+    # Long table (Model, Mode, Feature, Importance) for both models in both modes
+    rows = []
+    booster = xgb_model.get_booster()
+    for mode in MODES:
+        lgb_values = lgb_model.booster_.feature_importance(importance_type=_LGB_TYPES[mode])
+        xgb_scores = booster.get_score(importance_type=_XGB_TYPES[mode])
+        for j, feature in enumerate(feature_names):
+            rows.append(("LightGBM", mode, feature, float(lgb_values[j])))
+            rows.append(("XGBoost", mode, feature, float(xgb_scores.get(f"f{j}", 0.0))))
+    return pd.DataFrame(rows, columns=["Model", "Mode", "Feature", "Importance"])
+
+
+def top_features(table, model_name, mode, top_n=10):
+    subset = table[(table["Model"] == model_name) & (table["Mode"] == mode)]
+    return subset.sort_values("Importance", ascending=False).head(top_n)[["Feature", "Importance"]].reset_index(drop=True)
+
+
+# ------------------------- CHART -------------------------
+def render_importance_png(table, model_name, mode, top_n=10):
+    # Static chart as PNG bytes; the figure is released as soon as it has been saved
+    import matplotlib
+
+    top = top_features(table, model_name, mode, top_n).iloc[::-1]
+    cmap = matplotlib.colormaps["plasma"].resampled(top_n)
+    colors = [cmap(i) for i in range(len(top))]
+
+    def draw(fig):
+        ax = fig.subplots()
+        fig.patch.set_facecolor('#000')
+        ax.set_facecolor('#000')
+        bars = ax.barh(top["Feature"], top["Importance"], color=colors, edgecolor='white')
+
+        # Add value labels
+        label_fmt = '{:.0f}' if mode == "Split" else '{:.1f}'
+        pad = 0.01 * (top["Importance"].max() or 1)
+        for bar in bars:
+            ax.text(bar.get_width() + pad, bar.get_y() + bar.get_height() / 2,
+                    label_fmt.format(bar.get_width()), va='center', ha='left', color='white', fontsize=11, fontweight='bold')
+
+        ax.set_xlim(0, (top["Importance"].max() or 1) * 1.18)  # room for the value labels
+        ax.set_yticks(np.arange(len(top)))
+        ax.set_yticklabels(top["Feature"], color='white', fontweight='bold')
+        ax.set_xlabel(f'Importance ({mode.lower()})', color='white')
+        ax.set_title(f'Top {top_n} Features ({model_name}, {mode})', color='#ffb366', fontsize=16, fontweight='bold')
+        ax.tick_params(axis='x', colors='white')
+        for side in ['bottom', 'top', 'left', 'right']:
+            ax.spines[side].set_color('white')
+        fig.tight_layout()
+
+    return figure_to_png(draw, figsize=(7, 5))
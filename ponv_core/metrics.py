@@ -0,0 +1,205 @@
+import bisect
+import functools
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Default bucket upper bounds; the last bucket (+Inf) is implicit
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class Histogram:
+    # Fixed-bucket histogram (Prometheus-style upper bounds) with a running count and sum; cheap
+    # enough to record from every request thread
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts, count, total = list(self._counts), self._count, self._sum
+        # counts has one entry more than buckets: the last one is the +Inf bucket
+        return {"buckets": list(self.buckets), "counts": counts, "count": count, "sum": total}
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (None before the first observation)
+        snap = self.snapshot()
+        if not snap["count"]:
+            return None
+        rank = q * snap["count"]
+        seen = 0
+        for bound, n in zip(snap["buckets"] + [math.inf], snap["counts"]):
+            seen += n
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def mean(self):
+        with self._lock:
+            return self._sum / self._count if self._count else None
+
+
+# ------------------------- SECTION TIMING -------------------------
+# Off unless PONV_METRICS=1: disabled, laps() hands out a shared no-op and timed() returns the function
+# unchanged, so instrumented code pays one attribute lookup per section boundary
+ENABLED = os.environ.get("PONV_METRICS", "0") not in ("", "0")
+# Where enabled metrics go: a textfile rewritten after every run and/or a /metrics endpoint
+TEXTFILE = os.environ.get("PONV_METRICS_FILE")
+PORT = os.environ.get("PONV_METRICS_PORT")
+SECTION_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_sections = {}
+_sections_lock = threading.Lock()
+
+
+def observe_section(name, ms):
+    histogram = _sections.get(name)
+    if histogram is None:
+        with _sections_lock:
+            histogram = _sections.setdefault(name, Histogram(SECTION_BUCKETS_MS))
+    histogram.observe(ms)
+
+
+class Laps:
+    # Stopwatch for a straight-line script: lap(name) records the time since the previous lap under
+    # `name`, skip() restarts the clock without recording (for parts timed elsewhere)
+    def __init__(self):
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        observe_section(name, (now - self._last) * 1000.0)
+        self._last = now
+
+    def skip(self):
+        self._last = time.perf_counter()
+
+    def total(self, name):
+        observe_section(name, (time.perf_counter() - self._start) * 1000.0)
+
+
+class _NullLaps:
+    def lap(self, name):
+        pass
+
+    def skip(self):
+        pass
+
+    def total(self, name):
+        pass
+
+
+_NULL_LAPS = _NullLaps()
+
+
+def laps():
+    return Laps() if ENABLED else _NULL_LAPS
+
+
+def timed(name):
+    # Decorator recording every call of a function (e.g. a fragment, which also reruns on its own)
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe_section(name, (time.perf_counter() - start) * 1000.0)
+        return wrapper
+    return decorate
+
+
+def section_stats():
+    with _sections_lock:
+        sections = dict(_sections)
+    stats = {}
+    for name, histogram in sorted(sections.items()):
+        snap = histogram.snapshot()
+        stats[name] = {"count": snap["count"], "total_ms": snap["sum"], "mean_ms": histogram.mean(),
+                       "p50_ms": histogram.quantile(0.5), "p95_ms": histogram.quantile(0.95)}
+    return stats
+
+
+# ------------------------- PROMETHEUS EXPORT -------------------------
+def prometheus_text():
+    # Text exposition format; section durations are exported in seconds, as Prometheus expects
+    lines = ["# HELP ponv_section_duration_seconds Wall time of each instrumented app section per run.",
+             "# TYPE ponv_section_duration_seconds histogram"]
+    with _sections_lock:
+        sections = dict(_sections)
+    for name, histogram in sorted(sections.items()):
+        snap = histogram.snapshot()
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in zip(snap["buckets"] + [math.inf], snap["counts"]):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else repr(bound / 1000.0)
+            lines.append(f'ponv_section_duration_seconds_bucket{{section="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'ponv_section_duration_seconds_sum{{section="{label}"}} {snap["sum"] / 1000.0!r}')
+        lines.append(f'ponv_section_duration_seconds_count{{section="{label}"}} {snap["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path):
+    # For node_exporter's textfile collector: written to a temp file and renamed, never half-written
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        data = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def serve(port, host="127.0.0.1"):
+    # /metrics on its own port, started once per process whichever session asks first
+    global _server
+    with _sections_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="ponv-metrics", daemon=True).start()
+    return _server
+
+
+def export():
+    # Called at the end of each app run: refresh the textfile and make sure the endpoint is up
+    if not ENABLED:
+        return
+    if TEXTFILE:
+        write_textfile(TEXTFILE)
+    if PORT:
+        serve(int(PORT))
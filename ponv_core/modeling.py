@@ -0,0 +1,155 @@
+import os
+
+import numpy as np
+
+from ponv_core.cache import dataset_hash, dataset_id
+from ponv_core.scoring import BINARY_COLUMNS
+
+# Column order of the 23-feature vector built in the app (also the CSV upload schema)
+FEATURE_NAMES = [
+    "Female", "Non-Smoker", "History PONV", "Age", "Preop Anxiety", "Migraine", "Obesity",
+    "Abdominal Surg", "ENT/Neuro/Ophthalmic", "Gynae/Breast Surg", "Surg >60min",
+    "Blood Loss >500ml", "Volatile Agents", "Nitrous Oxide",
+    "Midazolam (mg)", "Ondansetron (mg)", "Dexamethasone (mg)", "Glycopyrrolate (mg)",
+    "Nalbuphine (mg)", "Fentanyl (mg)", "Butorphanol (mg)", "Pentazocine (mg)",
+    "Propofol Score"
+]
+N_FEATURES = len(FEATURE_NAMES)
+RANDOM_STATE = 42
+
+# Opt-in compact mode (PONV_FLOAT32=1): feature matrices are float32 from generation through scaling,
+# SMOTE, training and inference, half the memory of float64; python -m ponv_core.precision checks
+# that predictions and AUCs match float64
+FLOAT32 = os.environ.get("PONV_FLOAT32", "0") not in ("", "0")
+FEATURE_DTYPE = np.float32 if FLOAT32 else np.float64
+NUMERIC_COLUMNS = [i for i in range(N_FEATURES) if i not in BINARY_COLUMNS]
+
+# Hand-picked defaults used by the app; tuning / CV can override any of these
+XGB_PARAMS = {
+    "max_depth": 3,
+    "learning_rate": 0.03,
+    "n_estimators": 50,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "random_state": RANDOM_STATE,
+    "use_label_encoder": False,
+    "eval_metric": "auc",
+}
+LGB_PARAMS = {
+    "n_estimators": 50,
+    "max_depth": 3,
+}
+
+
+# ------------------------- SYNTHETIC DATA -------------------------
+def generate_synthetic_data(n_samples=500, n_features=N_FEATURES, dtype=None):
+    X = np.zeros((n_samples, n_features), dtype=dtype or FEATURE_DTYPE)
+    y = np.zeros(n_samples)
+    np.random.seed(42)
+    for i in range(n_samples):
+        X[i, 0:14] = np.random.binomial(1, 0.5, 14)
+        X[i, 3] = np.random.normal(45, 15)
+        X[i, 14:22] = np.maximum(0, np.random.exponential(2, 8))
+        X[i, 22] = np.random.choice([-3, -1, 0])
+        risk_factors = (
+            2.5 * X[i, 0] +
+            2.0 * X[i, 2] +
+            1.5 * X[i, 4] +
+            1.5 * X[i, 5] +
+            1.2 * X[i, 6] +
+            2.0 * X[i, 7] +
+            1.5 * X[i, 8] +
+            1.5 * X[i, 9] +
+            1.2 * X[i, 11] +
+            2.5 * X[i, 12] +
+            1.5 * X[i, 13]
+        )
+        protective_factors = (
+            1.5 * X[i, 14] +
+            2.5 * X[i, 15] +
+            2.5 * X[i, 16] +
+            1.5 * X[i, 17]
+        )
+        # Adjusted sigmoid for ROC AUC ~0.8-0.9
+        prob = 1 / (1 + np.exp(-2.0 * (risk_factors - protective_factors)))
+        y[i] = np.random.binomial(1, prob)
+    return X, y
+
+
+def synthetic_dataset_ids(n_samples=500, n_features=N_FEATURES, dtype=None, test_size=0.3, split_seed=42):
+    # Lineage ids (cache.dataset_id) of the synthetic data and the app's splits of it, for keying the
+    # app's in-memory caches without hashing arrays on every rerun. They do not see code changes, so
+    # anything persisted (model versions, .ponv_cache) stays keyed by content.
+    data = dataset_id("synthetic", seed=42, n_samples=n_samples, n_features=n_features,
+                      dtype=np.dtype(dtype or FEATURE_DTYPE).name)
+    split = {"test_size": test_size, "random_state": split_seed}
+    train = dataset_id(data, split="train", **split)
+    return {"data": data, "train": train, "val": dataset_id(data, split="val", **split),
+            "balanced": dataset_id(train, step="scale+smote", random_state=RANDOM_STATE)}
+
+
+# ------------------------- COMPACT STORAGE -------------------------
+def as_features(X, dtype=None):
+    # Feature matrix in the working dtype (no copy when it already is)
+    return np.asarray(X, dtype=dtype or FEATURE_DTYPE)
+
+
+def csv_dtypes():
+    # read_csv dtypes for the feature columns in float32 mode: float32 throughout, binary risk factors
+    # included, so blank cells read as NaN instead of failing the parse (an integer dtype cannot hold
+    # them); callers cast to the working dtype after checking the columns. None (pandas' inference)
+    # otherwise. The uint8 layout of pack_features is for the store and the parity report only.
+    if not FLOAT32:
+        return None
+    return dict.fromkeys(FEATURE_NAMES, np.float32)
+
+
+def pack_features(X):
+    # Binary risk factors as uint8 (1 byte instead of 8) next to float32 age, doses and propofol score
+    X = np.asarray(X)
+    return X[:, BINARY_COLUMNS].astype(np.uint8), X[:, NUMERIC_COLUMNS].astype(np.float32)
+
+
+def unpack_features(binary, numeric, dtype=None):
+    X = np.empty((len(binary), N_FEATURES), dtype=dtype or FEATURE_DTYPE)
+    X[:, BINARY_COLUMNS] = binary
+    X[:, NUMERIC_COLUMNS] = numeric
+    return X
+
+
+# ------------------------- PREPROCESSING -------------------------
+def fit_preprocess(X_train, y_train):
+    # Scale on the training split only, then SMOTE-balance the scaled training rows; both keep
+    # the dtype of X_train (float32 stays float32)
+    from sklearn.preprocessing import StandardScaler
+    from imblearn.over_sampling import SMOTE
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    smote = SMOTE(random_state=RANDOM_STATE)
+    X_train_balanced, y_train_balanced = smote.fit_resample(X_train_scaled, y_train)
+    return scaler, X_train_scaled, X_train_balanced, y_train_balanced
+
+
+# ------------------------- MODELS -------------------------
+def make_models(xgb_params=None, lgb_params=None):
+    # The model libraries are imported on first use; together they are most of the app's cold start
+    import lightgbm as lgb
+    from xgboost import XGBClassifier
+
+    xgb_model = XGBClassifier(**{**XGB_PARAMS, **(xgb_params or {})})
+    lgb_model = lgb.LGBMClassifier(**{**LGB_PARAMS, **(lgb_params or {})})
+    return xgb_model, lgb_model
+
+
+def train_models(X_train_balanced, y_train_balanced, xgb_params=None, lgb_params=None):
+    xgb_model, lgb_model = make_models(xgb_params, lgb_params)
+    xgb_model.fit(X_train_balanced, y_train_balanced)
+    lgb_model.fit(X_train_balanced, y_train_balanced)
+    return xgb_model, lgb_model
+
+
+def model_version(X_train_balanced, y_train_balanced, xgb_params=None, lgb_params=None):
+    # Training is deterministic for fixed data and parameters, so their hash identifies the fitted models
+    extra = {"xgb": {**XGB_PARAMS, **(xgb_params or {})}, "lgb": {**LGB_PARAMS, **(lgb_params or {})}}
+    return dataset_hash(X_train_balanced, y_train_balanced, extra=extra)[:16]
@@ -0,0 +1,101 @@
+import argparse
+import sys
+
+import numpy as np
+
+from ponv_core import modeling, tuning
+from ponv_core.service import Scorer
+
+# Largest allowed differences between the float32 and float64 pipelines
+DEFAULT_PROBA_TOLERANCE = 0.02
+DEFAULT_AUC_TOLERANCE = 0.005
+
+
+# ------------------------- PARITY CHECK -------------------------
+def parity(n_samples=500, cohort_rows=100_000, tuning_dir=tuning.DEFAULT_TUNING_DIR):
+    # Trains the app's pipeline once per dtype and scores the same validation split and upload-sized
+    # cohort with both: probability differences per model, AUCs, hybrid-score agreement and the
+    # feature-matrix memory of each mode. The cohort is built in float64 and cast, as an upload is.
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from ponv_core.bench import cohort
+
+    X_cohort, y_cohort = cohort(cohort_rows, seed=1)
+    runs = {}
+    for dtype in (np.float64, np.float32):
+        X, y = modeling.generate_synthetic_data(n_samples, modeling.N_FEATURES, dtype)
+        _, X_val, _, y_val = train_test_split(X, y, test_size=0.3, random_state=42)
+        scorer = Scorer.train(n_samples, tuning_dir, dtype)
+        X_up = X_cohort.astype(dtype)
+        runs[dtype] = {"scorer": scorer, "val": scorer.score_matrix(X_val), "y_val": y_val,
+                       "cohort": scorer.score_matrix(X_up), "bytes": X_up.nbytes}
+
+    binary, numeric = modeling.pack_features(X_cohort.astype(np.float32))
+    report = {"n_samples": n_samples, "cohort_rows": cohort_rows,
+              "labels_match": bool(np.array_equal(runs[np.float64]["y_val"], runs[np.float32]["y_val"])),
+              "bytes": {"float64": runs[np.float64]["bytes"], "float32": runs[np.float32]["bytes"],
+                        "packed": binary.nbytes + numeric.nbytes},
+              "packed_round_trip": bool(np.array_equal(modeling.unpack_features(binary, numeric, np.float32),
+                                                       X_cohort.astype(np.float32))),
+              "hybrid_score_mismatches": int((runs[np.float64]["cohort"]["hybrid_score"]
+                                              != runs[np.float32]["cohort"]["hybrid_score"]).sum()),
+              "models": {}}
+    for name, key in (("XGBoost", "prob_xgb"), ("LightGBM", "prob_lgb")):
+        diff = np.abs(runs[np.float64]["cohort"][key] - runs[np.float32]["cohort"][key])
+        report["models"][name] = {
+            "max_abs_diff": float(diff.max()),
+            "mean_abs_diff": float(diff.mean()),
+            "auc_val_float64": float(roc_auc_score(runs[np.float64]["y_val"], runs[np.float64]["val"][key])),
+            "auc_val_float32": float(roc_auc_score(runs[np.float32]["y_val"], runs[np.float32]["val"][key])),
+            "auc_cohort_float64": float(roc_auc_score(y_cohort, runs[np.float64]["cohort"][key])),
+            "auc_cohort_float32": float(roc_auc_score(y_cohort, runs[np.float32]["cohort"][key])),
+        }
+    return report
+
+
+def failures(report, proba_tolerance=DEFAULT_PROBA_TOLERANCE, auc_tolerance=DEFAULT_AUC_TOLERANCE):
+    problems = []
+    if report["hybrid_score_mismatches"]:
+        problems.append(f"hybrid score differs on {report['hybrid_score_mismatches']} rows")
+    if not report["packed_round_trip"]:
+        problems.append("uint8/float32 packing does not round-trip")
+    for name, m in report["models"].items():
+        if m["max_abs_diff"] > proba_tolerance:
+            problems.append(f"{name}: probabilities differ by up to {m['max_abs_diff']:.4f}")
+        for split in ("val", "cohort"):
+            delta = abs(m[f"auc_{split}_float64"] - m[f"auc_{split}_float32"])
+            if delta > auc_tolerance:
+                problems.append(f"{name}: {split} AUC differs by {delta:.4f}")
+    return problems
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy parity of the float32 mode (PONV_FLOAT32=1) "
+                                                 "against float64.")
+    parser.add_argument("--samples", type=int, default=500, help="synthetic training rows, as in the app")
+    parser.add_argument("--cohort-rows", type=int, default=100_000, help="rows of the scored upload-like cohort")
+    parser.add_argument("--proba-tolerance", type=float, default=DEFAULT_PROBA_TOLERANCE)
+    parser.add_argument("--auc-tolerance", type=float, default=DEFAULT_AUC_TOLERANCE)
+    parser.add_argument("--tuning-dir", default=tuning.DEFAULT_TUNING_DIR)
+    args = parser.parse_args(argv)
+
+    report = parity(args.samples, args.cohort_rows, args.tuning_dir)
+    b = report["bytes"]
+    print(f"Feature matrix for {report['cohort_rows']:,} rows: float64 {b['float64'] / 2**20:.1f} MB, "
+          f"float32 {b['float32'] / 2**20:.1f} MB, uint8 + float32 packed {b['packed'] / 2**20:.1f} MB")
+    print(f"Synthetic labels identical: {report['labels_match']}; "
+          f"hybrid score mismatches: {report['hybrid_score_mismatches']}")
+    for name, m in report["models"].items():
+        print(f"{name:<9} |p64 - p32| max {m['max_abs_diff']:.5f} mean {m['mean_abs_diff']:.6f}  "
+              f"AUC val {m['auc_val_float64']:.4f} / {m['auc_val_float32']:.4f}  "
+              f"cohort {m['auc_cohort_float64']:.4f} / {m['auc_cohort_float32']:.4f}")
+    problems = failures(report, args.proba_tolerance, args.auc_tolerance)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    print("float32 parity: " + ("FAILED" if problems else "ok"))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
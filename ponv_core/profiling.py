@@ -0,0 +1,205 @@
+import collections
+import datetime
+import os
+import threading
+import time
+
+# Opt-in profiling of whole script runs. PONV_PROFILE lists what every full rerun captures ("cpu",
+# "memory" or "cpu,memory"); "admin" captures nothing by default but shows per-session switches in
+# the sidebar. Profiles go to PROFILE_DIR as <timestamp>_<session id>.prof (cProfile, open with
+# pstats or snakeviz) and .tracemalloc (tracemalloc.Snapshot.load), and summary.txt is rewritten
+# with the top functions and allocation sites over the last WINDOW profiled runs.
+MODES = {part.strip() for part in os.environ.get("PONV_PROFILE", "").split(",") if part.strip()}
+ENABLED = bool(MODES)
+PROFILE_DIR = os.environ.get("PONV_PROFILE_DIR", ".ponv_profiles")
+TOP_N = int(os.environ.get("PONV_PROFILE_TOP", "15"))
+WINDOW = int(os.environ.get("PONV_PROFILE_WINDOW", "20"))
+
+_lock = threading.Lock()
+_active = {}
+_cpu_window = collections.deque(maxlen=WINDOW)
+_memory_window = collections.deque(maxlen=WINDOW)
+_last_snapshot = None
+_tracing_runs = 0
+
+
+def session_id():
+    # Streamlit session of the running script ("main" outside a Streamlit run)
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "main"
+
+
+# ------------------------- RUN CAPTURE -------------------------
+class RunProfile:
+    # cProfile (this thread only) and/or tracemalloc (process-wide, so allocations of concurrent
+    # sessions show up too) from begin() to end()
+    def __init__(self, session, cpu, memory):
+        self.session = session
+        self.started = datetime.datetime.now()
+        self.start_time = time.perf_counter()
+        self.profiler = None
+        self.memory = memory
+        if cpu:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if memory:
+            _start_tracing()
+
+    def finish(self, interrupted=False):
+        import pstats
+        import tracemalloc
+
+        elapsed = time.perf_counter() - self.start_time
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stem = os.path.join(PROFILE_DIR, f"{self.started:%Y%m%d-%H%M%S-%f}_{self.session}")
+        run = {"session": self.session, "started": self.started.isoformat(timespec="seconds"),
+               "seconds": elapsed, "interrupted": interrupted, "files": []}
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(stem + ".prof")
+            run["files"].append(stem + ".prof")
+            # (file, line, function) -> (calls, own seconds, cumulative seconds)
+            stats = pstats.Stats(self.profiler).stats
+            _cpu_window.append({key: (nc, tt, ct) for key, (_, nc, tt, ct, _) in stats.items()})
+        if self.memory:
+            # Leave out the profilers' own bookkeeping
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, pstats.__file__),
+                tracemalloc.Filter(False, "*/cProfile.py"),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ])
+            _stop_tracing()
+            snapshot.dump(stem + ".tracemalloc")
+            run["files"].append(stem + ".tracemalloc")
+            _memory_window.append(_memory_record(snapshot))
+        return run
+
+
+def _start_tracing():
+    import tracemalloc
+
+    global _tracing_runs
+    _tracing_runs += 1
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _stop_tracing():
+    import tracemalloc
+
+    global _tracing_runs
+    _tracing_runs -= 1
+    if _tracing_runs <= 0:
+        _tracing_runs = 0
+        tracemalloc.stop()
+
+
+def _memory_record(snapshot):
+    # Bytes held per source line at the end of the run, and growth since the previous profiled run
+    # (memory that keeps growing from run to run, e.g. leaked figures, stands out here)
+    global _last_snapshot
+    held = {str(stat.traceback): stat.size for stat in snapshot.statistics("lineno")[:TOP_N * 4]}
+    growth = {}
+    if _last_snapshot is not None:
+        for stat in snapshot.compare_to(_last_snapshot, "lineno")[:TOP_N * 4]:
+            if stat.size_diff > 0:
+                growth[str(stat.traceback)] = stat.size_diff
+    _last_snapshot = snapshot
+    return {"held": held, "growth": growth}
+
+
+def session_modes(state):
+    # What this session's runs capture: PONV_PROFILE itself, or with "admin" the sidebar switches
+    if "admin" in MODES:
+        return {mode for mode in ("cpu", "memory") if state.get(f"profile_{mode}")}
+    return MODES
+
+
+def begin(modes=None):
+    # Start capturing this session's run; modes defaults to PONV_PROFILE. A run of the same session
+    # that never reached end() (interrupted by a rerun) is written out first, marked as such.
+    modes = MODES if modes is None else set(modes)
+    cpu, memory = "cpu" in modes, "memory" in modes
+    session = session_id()
+    with _lock:
+        previous = _active.pop(session, None)
+        if previous is not None:
+            _finish(previous, interrupted=True)
+        if cpu or memory:
+            _active[session] = RunProfile(session, cpu, memory)
+
+
+def end():
+    with _lock:
+        profile = _active.pop(session_id(), None)
+        return _finish(profile) if profile is not None else None
+
+
+def _finish(profile, interrupted=False):
+    run = profile.finish(interrupted)
+    with open(os.path.join(PROFILE_DIR, "summary.txt"), "w") as f:
+        f.write(summary_text())
+    return run
+
+
+# ------------------------- ROLLING SUMMARY -------------------------
+def _format_function(key):
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def cpu_summary(n=TOP_N):
+    # Functions by own time and by cumulative time, summed over the profiled runs in the window;
+    # "runs" is how many of those runs called the function
+    totals = {}
+    for run in list(_cpu_window):
+        for key, (calls, own, cumulative) in run.items():
+            t = totals.setdefault(key, [0, 0.0, 0.0, 0])
+            t[0] += calls
+            t[1] += own
+            t[2] += cumulative
+            t[3] += 1
+    rows = [{"function": _format_function(key), "calls": t[0], "own_s": t[1], "cumulative_s": t[2], "runs": t[3]}
+            for key, t in totals.items()]
+    return {"runs": len(_cpu_window),
+            "own": sorted(rows, key=lambda r: r["own_s"], reverse=True)[:n],
+            "cumulative": sorted(rows, key=lambda r: r["cumulative_s"], reverse=True)[:n]}
+
+
+def memory_summary(n=TOP_N):
+    # Allocation sites by bytes held at the end of the latest run, and by growth summed over the window
+    runs = list(_memory_window)
+    growth = collections.Counter()
+    for run in runs:
+        growth.update(run["growth"])
+    held = runs[-1]["held"] if runs else {}
+    return {"runs": len(runs),
+            "held": sorted(held.items(), key=lambda item: item[1], reverse=True)[:n],
+            "growth": growth.most_common(n)}
+
+
+def summary_text(n=TOP_N):
+    cpu, memory = cpu_summary(n), memory_summary(n)
+    lines = [f"PONV profile summary, {datetime.datetime.now():%Y-%m-%d %H:%M:%S}", ""]
+    if cpu["runs"]:
+        for order, column in (("own", "own_s"), ("cumulative", "cumulative_s")):
+            lines.append(f"Top {n} functions by {order} time over the last {cpu['runs']} profiled run(s):")
+            for r in cpu[order]:
+                lines.append(f"  {r[column]:9.3f} s  {r['calls']:>9} calls  {r['runs']:>3} runs  {r['function']}")
+            lines.append("")
+    if memory["runs"]:
+        lines.append(f"Top {n} allocation sites held at the end of the latest run:")
+        lines += [f"  {size / 1024:10.1f} KB  {site}" for site, size in memory["held"]]
+        lines.append("")
+        lines.append(f"Top {n} allocation sites growing between runs (last {memory['runs']} run(s)):")
+        lines += [f"  {size / 1024:+10.1f} KB  {site}" for site, size in memory["growth"]]
+        lines.append("")
+    return "\n".join(lines)
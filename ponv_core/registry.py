@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+
+from ponv_core import db
+
+# Pickled scorers (scaler + both models) live here, one file per version; the registry tables sit
+# in the app's SQLite database next to the logs that reference them
+DEFAULT_MODEL_DIR = os.environ.get("PONV_MODEL_DIR", "models")
+
+
+class RegistryError(ValueError):
+    pass
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ------------------------- REGISTRY -------------------------
+class ModelRegistry:
+    # Versioned scorers with their metrics and training-data fingerprint. Which version the app
+    # serves is one row in active_model, so activating or rolling back is a single UPDATE and never
+    # retrains; with no active version the app serves the model it trains itself.
+    def __init__(self, db_path=db.DEFAULT_DB_PATH, model_dir=DEFAULT_MODEL_DIR):
+        self.db_path = db.prepare_database(db_path)
+        self.model_dir = model_dir
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def register(self, scorer, metrics=None, data_fingerprint=None, params=None, source=None):
+        # Idempotent: a version that is already registered keeps its artifact and row
+        existing = self.get(scorer.model_version)
+        if existing is not None:
+            return existing
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = os.path.join(self.model_dir, f"{scorer.model_version}.pkl")
+        fd, tmp = tempfile.mkstemp(dir=self.model_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(scorer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO models (version, artifact_path, artifact_sha256, data_fingerprint, metrics, "
+                "params, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (scorer.model_version, path, _sha256(path), data_fingerprint, json.dumps(metrics or {}),
+                 json.dumps(params or {}, default=str), source))
+        conn.close()
+        return self.get(scorer.model_version)
+
+    def get(self, version):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE version = ?", (version,)).fetchone()
+        conn.close()
+        return dict(row) if row is not None else None
+
+    def versions(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM models ORDER BY created_at DESC, version").fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def active(self):
+        # {"version", "previous_version", "activated_at"}, or None when the app serves its own model
+        with self._connect() as conn:
+            row = conn.execute("SELECT version, previous_version, activated_at FROM active_model WHERE id = 1").fetchone()
+        conn.close()
+        return dict(row) if row is not None and row["version"] is not None else None
+
+    def active_version(self):
+        active = self.active()
+        return active["version"] if active else None
+
+    def activate(self, version):
+        # The pointer swap; the replaced version is kept for rollback()
+        if version is not None and self.get(version) is None:
+            raise RegistryError(f"unknown model version {version}")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO active_model (id, version, previous_version, activated_at) "
+                "VALUES (1, ?, (SELECT version FROM active_model WHERE id = 1), CURRENT_TIMESTAMP)", (version,))
+        conn.close()
+
+    def rollback(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT previous_version FROM active_model WHERE id = 1").fetchone()
+        conn.close()
+        previous = row["previous_version"] if row is not None else None
+        if previous is None:
+            raise RegistryError("no previous version to roll back to")
+        self.activate(previous)
+        return previous
+
+    def load(self, version):
+        # The registered scorer, after checking the artifact is the one that was registered
+        entry = self.get(version)
+        if entry is None:
+            raise RegistryError(f"unknown model version {version}")
+        if _sha256(entry["artifact_path"]) != entry["artifact_sha256"]:
+            raise RegistryError(f"artifact {entry['artifact_path']} does not match its registered hash")
+        with open(entry["artifact_path"], "rb") as f:
+            return pickle.load(f)
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Model registry: list registered versions, activate one for "
+                                                 "the app or roll back to the previous one.")
+    parser.add_argument("--db", default=db.DEFAULT_DB_PATH)
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="registered versions, newest first (* marks the active one)")
+    show = commands.add_parser("show", help="one version's metrics, fingerprint and parameters")
+    show.add_argument("version")
+    activate = commands.add_parser("activate", help="serve this version (running apps pick it up on their next run)")
+    activate.add_argument("version")
+    commands.add_parser("rollback", help="re-activate the version that was active before the current one")
+    commands.add_parser("deactivate", help="clear the pointer: the app serves the model it trains itself")
+    register = commands.add_parser("register", help="register a pickled scorer (python -m ponv_core.store train -o)")
+    register.add_argument("artifact")
+    register.add_argument("--activate", action="store_true")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.db, args.model_dir)
+    try:
+        if args.command == "list":
+            active = registry.active_version()
+            for entry in registry.versions():
+                metrics = json.loads(entry["metrics"] or "{}")
+                summary = ", ".join(f"{k} {v:.3f}" for k, v in metrics.items() if isinstance(v, float))
+                print(f"{'*' if entry['version'] == active else ' '} {entry['version']}  {entry['created_at']}  "
+                      f"{entry['source'] or '':<6} data {(entry['data_fingerprint'] or '-')[:16]}  {summary}")
+        elif args.command == "show":
+            entry = registry.get(args.version)
+            if entry is None:
+                raise RegistryError(f"unknown model version {args.version}")
+            for key in ("metrics", "params"):
+                entry[key] = json.loads(entry[key] or "{}")
+            print(json.dumps(entry, indent=2))
+        elif args.command == "activate":
+            registry.activate(args.version)
+            print(f"Active model: {args.version}")
+        elif args.command == "rollback":
+            print(f"Active model: {registry.rollback()}")
+        elif args.command == "deactivate":
+            registry.activate(None)
+            print("No active model: the app serves the model it trains")
+        elif args.command == "register":
+            with open(args.artifact, "rb") as f:
+                scorer = pickle.load(f)
+            entry = registry.register(scorer, source="file")
+            if args.activate:
+                registry.activate(entry["version"])
+            print(f"Registered {entry['version']}{' (active)' if args.activate else ''}")
+    except RegistryError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
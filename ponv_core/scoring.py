@@ -0,0 +1,158 @@
+import numpy as np
+
+# ------------------------- HYBRID SCORE RULES -------------------------
+# Dose bands per drug: (edges, scores). A dose of 0 always scores 0; otherwise the score is
+# scores[number of edges the dose has passed]. An edge (e, True) is passed when dose > e
+# ("<= e" stays in the band), an edge (e, False) when dose >= e ("< e" stays in the band).
+DOSE_BANDS = {
+    "midazolam": ([(2, True), (10, True)], [-1, -2, -3]),
+    "ondansetron": ([(4, False), (8, False)], [-1, -2, -3]),
+    "dexamethasone": ([(4, False), (10, True)], [-1, -2, -3]),
+    "glycopyrrolate": ([(0.2, True)], [1, 2]),
+    "nalbuphine": ([(10, True)], [1, 2]),
+    "fentanyl": ([(100, True), (500, True)], [1, 2, 3]),  # mcg
+    "butorphanol": ([(2, True)], [1, 2]),
+    "pentazocine": ([(100, True), (200, True)], [1, 2, 3]),
+}
+
+# Feature-matrix columns (see modeling.FEATURE_NAMES) that add +1 when set
+BINARY_COLUMNS = [0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
+AGE_COLUMN = 3
+DOSE_COLUMNS = {
+    "midazolam": 14, "ondansetron": 15, "dexamethasone": 16, "glycopyrrolate": 17,
+    "nalbuphine": 18, "fentanyl": 19, "butorphanol": 20, "pentazocine": 21,
+}
+PROPOFOL_COLUMN = 22
+
+
+def binary(val):
+    return 1 if val == "Yes" else 0
+
+
+def dose_score(drug, dose):
+    if dose == 0:
+        return 0
+    edges, scores = DOSE_BANDS[drug]
+    passed = sum(1 for edge, inclusive in edges if (dose > edge if inclusive else dose >= edge))
+    return scores[passed]
+
+
+def dose_score_array(drug, doses):
+    # Vectorized dose_score: counts passed edges for the whole column at once
+    doses = np.asarray(doses, dtype=float)
+    edges, scores = DOSE_BANDS[drug]
+    passed = np.zeros(doses.shape, dtype=np.int64)
+    for edge, inclusive in edges:
+        passed += (doses > edge) if inclusive else (doses >= edge)
+    return np.where(doses == 0, 0, np.asarray(scores)[passed])
+
+
+def propofol_score(mode):
+    return -3 if mode == "TIVA" else -1 if mode == "Induction Only" else 0
+
+
+def midazolam_score(dose):
+    return dose_score("midazolam", dose)
+
+
+def ondansetron_score(dose):
+    return dose_score("ondansetron", dose)
+
+
+def dexamethasone_score(dose):
+    return dose_score("dexamethasone", dose)
+
+
+def glycopyrrolate_score(dose):
+    return dose_score("glycopyrrolate", dose)
+
+
+def nalbuphine_score(dose):
+    return dose_score("nalbuphine", dose)
+
+
+def fentanyl_score(dose):
+    return dose_score("fentanyl", dose)
+
+
+def butorphanol_score(dose):
+    return dose_score("butorphanol", dose)
+
+
+def pentazocine_score(dose):
+    return dose_score("pentazocine", dose)
+
+
+def muscle_relaxant_score(muscle_relaxant, dose):
+    if muscle_relaxant == "None":
+        return 0
+    elif muscle_relaxant == "Succinylcholine":
+        if dose < 1.5:
+            return 1
+        else:
+            return 2
+    elif muscle_relaxant == "Rocuronium":
+        if dose < 0.6:
+            return 0
+        elif dose <= 1.0:
+            return 1
+        else:
+            return 2
+    elif muscle_relaxant == "Vecuronium":
+        if dose < 0.1:
+            return 0
+        else:
+            return 1
+    elif muscle_relaxant == "Atracurium" or muscle_relaxant == "Cisatracurium":
+        if dose < 0.4:
+            return 1
+        else:
+            return 2
+    else:
+        return 0
+
+
+def risk_category(score):
+    if score <= -5:
+        return "Very Low Risk", "very-low-risk"  # CSS class
+    elif -4 <= score <= 3:
+        return "Low Risk", "low-risk"  # CSS class
+    elif 4 <= score <= 9:
+        return "Moderate Risk", "moderate-risk"  # CSS class
+    elif 10 <= score <= 15:
+        return "High Risk", "high-risk"  # CSS class
+    else:
+        return "Very High Risk", "very-high-risk"  # CSS class
+
+
+def hybrid_score(row, muscle_relaxant="None", muscle_relaxant_dose=0.0):
+    # One patient's hybrid score from a feature row (modeling.FEATURE_NAMES order) with the scalar
+    # rules, as the app's sidebar computes it. Fentanyl is in mg in the row and banded in mcg; the
+    # muscle relaxant is not a feature and is scored from the sidebar choice.
+    score = sum(1 for c in BINARY_COLUMNS if row[c] == 1) + (1 if row[AGE_COLUMN] > 50 else 0)
+    for drug, col in DOSE_COLUMNS.items():
+        score += dose_score(drug, round(row[col] * 1000.0, 6) if drug == "fentanyl" else row[col])
+    score += int(row[PROPOFOL_COLUMN])
+    return score + muscle_relaxant_score(muscle_relaxant, muscle_relaxant_dose)
+
+
+# ------------------------- BATCH SCORING -------------------------
+def hybrid_score_matrix(X):
+    # Hybrid score for every row of a 23-column feature matrix (the model's input layout).
+    # Fentanyl is stored in mg there, so it is converted back to mcg (rounded to undo the
+    # float error of the mcg -> mg division) before banding.
+    # The muscle relaxant is not part of the feature vector and contributes 0.
+    X = np.asarray(X)
+    if X.dtype == np.float32:
+        # float32 storage turns a 0.2 mg dose into 0.200000003, which would pass the 0.2 edge;
+        # rounding to 6 decimals restores the dose as entered
+        X = np.round(X.astype(float), 6)
+    else:
+        X = np.asarray(X, dtype=float)
+    score = (X[:, BINARY_COLUMNS] == 1).sum(axis=1)
+    score += X[:, AGE_COLUMN] > 50
+    for drug, col in DOSE_COLUMNS.items():
+        doses = np.round(X[:, col] * 1000.0, 6) if drug == "fentanyl" else X[:, col]
+        score += dose_score_array(drug, doses)
+    score += X[:, PROPOFOL_COLUMN].astype(np.int64)
+    return score
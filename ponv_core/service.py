@@ -0,0 +1,220 @@
+import argparse
+import json
+import math
+import os
+import socket
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from ponv_core import batching, db, modeling, registry, scoring, tuning
+
+# Largest request accepted, and the most patients scored in one request
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_PATIENTS = 10_000
+
+
+class ValidationError(ValueError):
+    pass
+
+
+# ------------------------- SCORER -------------------------
+class Scorer:
+    # Hybrid score, risk category and both model probabilities for a batch of patients, with the
+    # same scaler and models the app serves. Every call is one vectorized pass per model, so an
+    # array of patients costs little more than one. Prediction only reads the fitted models, so one
+    # Scorer is shared by all request threads. Inputs are cast to the dtype the models were trained
+    # on (modeling.FEATURE_DTYPE unless given).
+    def __init__(self, scaler, xgb_model, lgb_model, model_version, dtype=None):
+        self.scaler = scaler
+        self.xgb_model = xgb_model
+        self.lgb_model = lgb_model
+        self.model_version = model_version
+        self.dtype = dtype or modeling.FEATURE_DTYPE
+
+    @classmethod
+    def train(cls, n_samples=500, tuning_dir=tuning.DEFAULT_TUNING_DIR, dtype=None):
+        # Same data, split, preprocessing and (tuned) parameters as ponv.py; training is
+        # deterministic, so the models match the app's (same model_version)
+        from sklearn.model_selection import train_test_split
+
+        X, y = modeling.generate_synthetic_data(n_samples, modeling.N_FEATURES, dtype)
+        X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+        scaler, _, X_bal, y_bal = modeling.fit_preprocess(X_train, y_train)
+        xgb_params, lgb_params = tuning.load_best_params(tuning_dir)
+        xgb_model, lgb_model = modeling.train_models(X_bal, y_bal, xgb_params, lgb_params)
+        return cls(scaler, xgb_model, lgb_model, modeling.model_version(X_bal, y_bal, xgb_params, lgb_params), X.dtype)
+
+    @classmethod
+    def serving(cls, tuning_dir=tuning.DEFAULT_TUNING_DIR, db_path=db.DEFAULT_DB_PATH,
+                model_dir=registry.DEFAULT_MODEL_DIR, log=None):
+        # The model the app serves: the registry's active version when one is set (python -m
+        # ponv_core.registry activate), else the app's own. As in the app, an active version that
+        # cannot be loaded falls back to the app's own model, reported through log.
+        if os.path.exists(db_path):
+            model_registry = registry.ModelRegistry(db_path, model_dir)
+            version = model_registry.active_version()
+            if version is not None:
+                try:
+                    return model_registry.load(version)
+                except (registry.RegistryError, OSError) as e:
+                    if log:
+                        log(f"Active model {version} could not be loaded ({e}); serving the app's own model.")
+        return cls.train(tuning_dir=tuning_dir)
+
+    def score_matrix(self, X):
+        # X: (n, 23) feature matrix in modeling.FEATURE_NAMES order
+        X = modeling.as_features(X, self.dtype)
+        X_scaled = self.scaler.transform(X)
+        return {
+            "hybrid_score": scoring.hybrid_score_matrix(X),
+            "prob_xgb": self.xgb_model.predict_proba(X_scaled)[:, 1],
+            "prob_lgb": self.lgb_model.predict_proba(X_scaled)[:, 1],
+        }
+
+    def score_records(self, records, broker=None):
+        # records: list of {feature name: value}; returns one result dict per record, in order.
+        # With a broker (wrapping score_matrix) the rows join other callers' rows in one batch.
+        X = records_to_matrix(records)
+        scores = broker.predict(X) if broker is not None else self.score_matrix(X)
+        return [
+            {
+                "hybrid_score": int(score),
+                "risk_category": scoring.risk_category(int(score))[0],
+                "prob_xgb": float(p_xgb),
+                "prob_lgb": float(p_lgb),
+                "model_version": self.model_version,
+            }
+            for score, p_xgb, p_lgb in zip(scores["hybrid_score"], scores["prob_xgb"], scores["prob_lgb"])
+        ]
+
+
+def records_to_matrix(records):
+    # Patients are named by the upload schema (modeling.FEATURE_NAMES); other keys are ignored,
+    # as extra CSV columns are in the app. Booleans count as 1/0.
+    X = np.empty((len(records), modeling.N_FEATURES), dtype=modeling.FEATURE_DTYPE)
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValidationError(f"patient {i}: expected an object keyed by feature name")
+        missing = [name for name in modeling.FEATURE_NAMES if name not in record]
+        if missing:
+            raise ValidationError(f"patient {i}: missing {', '.join(missing)}")
+        for j, name in enumerate(modeling.FEATURE_NAMES):
+            value = record[name]
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValidationError(f"patient {i}: {name} must be a finite number, got {value!r}")
+            X[i, j] = value
+    return X
+
+
+# ------------------------- HTTP -------------------------
+class ScoringHandler(BaseHTTPRequestHandler):
+    # POST /score with one patient object (answered with one result object) or an array of them
+    # (answered with an array, same order). GET /health reports the model version and the schema,
+    # GET /stats the batching histograms.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            return self._send(200, {"status": "ok", "model_version": self.server.scorer.model_version,
+                                    "features": modeling.FEATURE_NAMES})
+        if path == "/stats" and self.server.broker is not None:
+            return self._send(200, self.server.broker.stats())
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/score":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            return self._send(411, {"error": "Content-Length required"})
+        if length < 0:
+            # rfile.read(-1) would block this thread until the client closes the connection
+            self.close_connection = True
+            return self._send(400, {"error": "invalid Content-Length"})
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            return self._send(413, {"error": f"request body over {MAX_BODY_BYTES} bytes"})
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return self._send(400, {"error": f"invalid JSON: {e}"})
+
+        single = isinstance(payload, dict)
+        records = [payload] if single else payload
+        if not isinstance(records, list) or not records:
+            return self._send(400, {"error": "expected a patient object or a non-empty array of them"})
+        if len(records) > MAX_PATIENTS:
+            return self._send(413, {"error": f"at most {MAX_PATIENTS} patients per request"})
+        try:
+            results = self.server.scorer.score_records(records, self.server.broker)
+        except ValidationError as e:
+            return self._send(422, {"error": str(e)})
+        self._send(200, results[0] if single else results)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    # The default listen backlog (5) resets connections from bursts of concurrent clients
+    request_queue_size = socket.SOMAXCONN
+    daemon_threads = True
+
+
+def make_server(scorer, host="127.0.0.1", port=8502, verbose=False, broker=None):
+    # One thread per connection; port=0 picks a free port (server.server_address has the real one).
+    # Pass a batching.InferenceBroker over scorer.score_matrix to batch rows across connections.
+    server = ScoringServer((host, port), ScoringHandler)
+    server.scorer = scorer
+    server.broker = broker
+    server.verbose = verbose
+    return server
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON scoring service: hybrid score, risk category and "
+                                                 "XGBoost/LightGBM probabilities per patient.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--tuning-dir", default=tuning.DEFAULT_TUNING_DIR)
+    parser.add_argument("--db", default=db.DEFAULT_DB_PATH, help="database holding the model registry")
+    parser.add_argument("--model-dir", default=registry.DEFAULT_MODEL_DIR)
+    parser.add_argument("--max-batch", type=int, default=batching.MAX_BATCH,
+                        help="rows per batched model call across concurrent requests (1 disables batching)")
+    parser.add_argument("--max-wait-ms", type=float, default=batching.MAX_WAIT_MS,
+                        help="how long a request may wait for others to share its batch")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    scorer = Scorer.serving(args.tuning_dir, args.db, args.model_dir, log=lambda msg: print(msg, file=sys.stderr))
+    broker = batching.InferenceBroker(scorer.score_matrix, args.max_batch, args.max_wait_ms) if args.max_batch > 1 else None
+    server = make_server(scorer, args.host, args.port, args.verbose, broker)
+    host, port = server.server_address[:2]
+    print(f"Scoring service (model {scorer.model_version}) on http://{host}:{port}/score", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if broker is not None:
+            broker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# Imported first by ponv.py, so this is the moment the app's first script run started
+_T0 = time.perf_counter()
+
+# What a cold process has to import; the first group is what ponv.py loads before its first paint,
+# the rest is loaded lazily where it is first used
+EAGER_MODULES = ("streamlit", "numpy", "pandas", "sqlite3", "plotly.graph_objects", "ponv_core.charts")
+LAZY_MODULES = ("sklearn.metrics", "sklearn.model_selection", "imblearn.over_sampling", "lightgbm",
+                "xgboost", "matplotlib.figure", "scipy.stats")
+
+# Default budget for the first paint of a cold start
+DEFAULT_BUDGET_MS = 1500
+
+_marks = {}
+_lock = threading.Lock()
+
+
+# ------------------------- FIRST-RUN MARKS -------------------------
+def mark(name):
+    # Milliseconds from process start (the first import of this module) to the first time a point is
+    # reached; later reruns hit the same points again but never overwrite the cold-start value
+    with _lock:
+        if name not in _marks:
+            _marks[name] = (time.perf_counter() - _T0) * 1000.0
+        return _marks[name]
+
+
+def marks():
+    with _lock:
+        return dict(_marks)
+
+
+# ------------------------- IMPORT COSTS -------------------------
+def import_cost_ms(module):
+    # Cumulative import time of one module in a fresh interpreter (python -X importtime), so the
+    # figure includes every dependency it pulls in and nothing already loaded by this process
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    pattern = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*" + re.escape(module) + r"\s*$")
+    for line in reversed(proc.stderr.splitlines()):
+        found = pattern.match(line)
+        if found:
+            return int(found.group(1)) / 1000.0
+    return None
+
+
+def import_costs(modules):
+    return {module: import_cost_ms(module) for module in modules}
+
+
+# ------------------------- COLD START -------------------------
+_APP_RUN = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+at.run()
+marks = sys.modules["ponv_core.startup"].marks() if "ponv_core.startup" in sys.modules else {}
+print(json.dumps({"marks": marks, "exceptions": [e.message for e in at.exception]}))
+"""
+
+
+def cold_start(app="ponv.py", timeout=300.0):
+    # Run the app's first script run headless in a fresh process and read its marks. Streamlit itself
+    # is already imported there, as it is in a server, so the marks start at the app's own imports.
+    proc = subprocess.run([sys.executable, "-c", _APP_RUN, app, str(timeout)],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(app)))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "app run failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start report for the PONV app: import cost per module "
+                                                 "and time to first paint.")
+    parser.add_argument("--app", default="ponv.py")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="exit with status 1 when the first paint takes longer than this")
+    parser.add_argument("--skip-imports", action="store_true", help="only run the app, not the per-module imports")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {"budget_ms": args.budget_ms}
+    if not args.skip_imports:
+        report["eager_imports_ms"] = import_costs(EAGER_MODULES)
+        report["lazy_imports_ms"] = import_costs(LAZY_MODULES)
+    report.update(cold_start(args.app))
+    first_paint = report["marks"].get("first_paint")
+    report["within_budget"] = first_paint is not None and first_paint <= args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for group in ("eager_imports_ms", "lazy_imports_ms"):
+            if group in report:
+                print(group.replace("_ms", "").replace("_", " ").capitalize())
+                for module, ms in report[group].items():
+                    print(f"  {module:<28} {'n/a' if ms is None else f'{ms:8.0f} ms'}")
+        print("First script run")
+        for name, ms in report["marks"].items():
+            print(f"  {name:<28} {ms:8.0f} ms")
+        for message in report["exceptions"]:
+            print(f"  exception: {message}")
+        print(f"First paint {'within' if report['within_budget'] else 'OVER'} the {args.budget_ms:.0f} ms budget")
+    return 0 if report["within_budget"] and not report["exceptions"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
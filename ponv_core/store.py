@@ -0,0 +1,334 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from ponv_core import db, modeling, registry, tuning
+from ponv_core.cache import dataset_hash
+from ponv_core.service import Scorer
+
+# Rows per chunk when filling the store and when streaming it into scaling and training
+DEFAULT_CHUNK_ROWS = 100_000
+META_FILE = "meta.json"
+
+
+# ------------------------- ON-DISK STORE -------------------------
+class TrainingStore:
+    # A cohort on disk as memory-mapped .npy files in the compact layout of modeling.pack_features:
+    # binary.npy (rows x 13 uint8), numeric.npy (rows x 10 float32) and y.npy (uint8), about 54 bytes
+    # a row against 184 for a float64 matrix. Chunks are read and unpacked on demand, so neither
+    # scaling nor training ever holds the cohort in memory.
+    def __init__(self, path, mode="r"):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.binary = np.load(os.path.join(path, "binary.npy"), mmap_mode=mode)
+        self.numeric = np.load(os.path.join(path, "numeric.npy"), mmap_mode=mode)
+        self.y = np.load(os.path.join(path, "y.npy"), mmap_mode=mode)
+
+    @property
+    def rows(self):
+        return len(self.y)
+
+    @classmethod
+    def create(cls, path, rows, source=None):
+        os.makedirs(path, exist_ok=True)
+        shapes = {"binary.npy": ((rows, len(modeling.BINARY_COLUMNS)), np.uint8),
+                  "numeric.npy": ((rows, len(modeling.NUMERIC_COLUMNS)), np.float32),
+                  "y.npy": ((rows,), np.uint8)}
+        for name, (shape, dtype) in shapes.items():
+            np.lib.format.open_memmap(os.path.join(path, name), mode="w+", dtype=dtype, shape=shape).flush()
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({"rows": rows, "features": modeling.FEATURE_NAMES, "source": source,
+                       "created": datetime.datetime.now().isoformat(timespec="seconds"), "content_hash": None}, f)
+        return cls(path, mode="r+")
+
+    @classmethod
+    def from_csv(cls, path, csv_path, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, shuffle_seed=0):
+        # Two streaming passes over the CSV (count, then fill); memory stays at one chunk. Rows are
+        # counted by pandas itself, so blank lines and quoted newlines count as it parses them.
+        # Rows are stored in a seeded random order (file order with shuffle_seed=None), so the
+        # trailing rows train() holds out are a random sample even of a CSV sorted by outcome or date.
+        import pandas as pd
+
+        rows = sum(len(chunk) for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, usecols=["PONV_Outcome"]))
+        store = cls.create(path, rows, source=os.path.abspath(csv_path))
+        store.meta["shuffle_seed"] = shuffle_seed
+        order = None if shuffle_seed is None else np.random.default_rng(shuffle_seed).permutation(rows)
+        start = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, usecols=modeling.FEATURE_NAMES + ["PONV_Outcome"]):
+            stop = start + len(chunk)
+            if stop > rows:
+                raise ValueError(f"{csv_path} changed while it was read")
+            store.write(start if order is None else order[start:stop],
+                        chunk[modeling.FEATURE_NAMES].to_numpy(dtype=np.float32), chunk["PONV_Outcome"].to_numpy())
+            start = stop
+            if progress:
+                progress(start)
+        return store.finish(start)
+
+    @classmethod
+    def from_arrays(cls, path, X, y, chunk_rows=DEFAULT_CHUNK_ROWS):
+        store = cls.create(path, len(y), source="arrays")
+        for start in range(0, len(y), chunk_rows):
+            store.write(start, X[start:start + chunk_rows], y[start:start + chunk_rows])
+        return store.finish(len(y))
+
+    def write(self, start, X, y):
+        # start: first row of a contiguous block, or the store positions of each row (shuffled builds)
+        binary, numeric = modeling.pack_features(X)
+        rows = slice(start, start + len(binary)) if np.isscalar(start) else start
+        self.binary[rows] = binary
+        self.numeric[rows] = numeric
+        self.y[rows] = y
+
+    def finish(self, rows):
+        # Flush the maps and record a content hash (hashed a chunk at a time) as the data fingerprint
+        if rows != self.rows:
+            raise ValueError(f"expected {self.rows} rows, wrote {rows}")
+        h = hashlib.sha1()
+        for start in range(0, self.rows, DEFAULT_CHUNK_ROWS):
+            stop = start + DEFAULT_CHUNK_ROWS
+            for arr in (self.binary[start:stop], self.numeric[start:stop], self.y[start:stop]):
+                h.update(np.ascontiguousarray(arr).tobytes())
+        for arr in (self.binary, self.numeric, self.y):
+            arr.flush()
+        self.meta["content_hash"] = h.hexdigest()
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(self.meta, f, indent=2)
+        return TrainingStore(self.path)
+
+    def features(self, start, stop, dtype=np.float32):
+        # Rows [start, stop) as a regular feature matrix (modeling.FEATURE_NAMES order)
+        return modeling.unpack_features(self.binary[start:stop], self.numeric[start:stop], dtype)
+
+    def chunks(self, stop=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        stop = self.rows if stop is None else stop
+        for start in range(0, stop, chunk_rows):
+            end = min(start + chunk_rows, stop)
+            yield start, self.features(start, end), np.asarray(self.y[start:end])
+
+
+# ------------------------- OUT-OF-CORE TRAINING -------------------------
+def fit_scaler(store, stop=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # The app's StandardScaler, fitted incrementally (partial_fit) one chunk at a time
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for _, X, _ in store.chunks(stop, chunk_rows):
+        scaler.partial_fit(X)
+    return scaler
+
+
+def _xgb_iter(store, scaler, stop, chunk_rows):
+    import xgboost as xgb
+
+    class ChunkIter(xgb.DataIter):
+        # Scaled chunks for QuantileDMatrix, which keeps only the quantized matrix
+        def __init__(self):
+            self._chunks = None
+            super().__init__()
+
+        def next(self, input_data):
+            if self._chunks is None:
+                self._chunks = store.chunks(stop, chunk_rows)
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            _, X, y = chunk
+            input_data(data=scaler.transform(X), label=y)
+            return 1
+
+        def reset(self):
+            self._chunks = None
+
+    return ChunkIter()
+
+
+def _lgb_sequence(store, scaler, stop, chunk_rows):
+    import lightgbm as lgb
+
+    # LightGBM fetches its bin-construction sample one row at a time, so rows are scaled with plain
+    # array arithmetic here rather than a scaler.transform call each
+    mean, scale = scaler.mean_, scaler.scale_
+    binary_columns, numeric_columns = modeling.BINARY_COLUMNS, modeling.NUMERIC_COLUMNS
+
+    class ChunkSequence(lgb.Sequence):
+        # Row access for lgb.Dataset: LightGBM samples rows for its bins, then reads batch_size rows at a time
+        batch_size = chunk_rows
+
+        def __len__(self):
+            return stop
+
+        def __getitem__(self, idx):
+            if isinstance(idx, slice):
+                start, end, _ = idx.indices(stop)
+                return (store.features(start, end, np.float64) - mean) / scale
+            row = np.empty(modeling.N_FEATURES)
+            row[binary_columns] = store.binary[idx]
+            row[numeric_columns] = store.numeric[idx]
+            return (row - mean) / scale
+
+    return ChunkSequence()
+
+
+class BoosterModel:
+    # A natively trained LightGBM Booster behind the few model calls the app, Scorer, explain and
+    # importance make (predict_proba, predict with pred_contrib/raw_score, booster_, set_params(n_jobs)).
+    # Only Booster's public API is used, so this does not depend on LGBMClassifier's private attributes.
+    classes_ = np.array([0, 1])
+
+    def __init__(self, booster, params=None):
+        self.booster_ = booster
+        self.params = dict(params or {})
+        self.n_features_in_ = booster.num_feature()
+
+    def get_params(self, deep=True):
+        return dict(self.params)
+
+    def set_params(self, **params):
+        self.params.update(params)
+        return self
+
+    def _threads(self):
+        n_jobs = self.params.get("n_jobs")
+        return {"num_threads": n_jobs} if n_jobs is not None and n_jobs > 0 else {}
+
+    def predict(self, X, raw_score=False, pred_contrib=False):
+        if raw_score or pred_contrib:
+            return self.booster_.predict(X, raw_score=raw_score, pred_contrib=pred_contrib, **self._threads())
+        return (self.booster_.predict(X, **self._threads()) >= 0.5).astype(int)
+
+    def predict_proba(self, X):
+        p = self.booster_.predict(X, **self._threads())
+        return np.column_stack([1.0 - p, p])
+
+
+def train(store, xgb_params=None, lgb_params=None, train_rows=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Both models on rows [0, train_rows) streamed from the store. SMOTE needs the whole scaled
+    # matrix in memory, so class imbalance is handled by weighting positives (scale_pos_weight)
+    # instead. Returns a Scorer, like Scorer.train.
+    import lightgbm as lgb
+    import xgboost as xgb
+    from xgboost import XGBClassifier
+
+    stop = store.rows if train_rows is None else train_rows
+    positives = sum(int(np.count_nonzero(store.y[s:min(s + chunk_rows, stop)])) for s in range(0, stop, chunk_rows))
+    if positives in (0, stop):
+        raise ValueError("training rows must contain both outcomes")
+    pos_weight = (stop - positives) / positives
+    scaler = fit_scaler(store, stop, chunk_rows)
+
+    xgb_sklearn = XGBClassifier(**{**modeling.XGB_PARAMS, **(xgb_params or {})})
+    native = {k: v for k, v in xgb_sklearn.get_xgb_params().items() if v is not None and k != "use_label_encoder"}
+    native["scale_pos_weight"] = pos_weight
+    dtrain = xgb.QuantileDMatrix(_xgb_iter(store, scaler, stop, chunk_rows))
+    booster = xgb.train(native, dtrain, num_boost_round=xgb_sklearn.get_num_boosting_rounds())
+    del dtrain
+    xgb_model = XGBClassifier(**{**modeling.XGB_PARAMS, **(xgb_params or {})})
+    xgb_model.load_model(bytearray(booster.save_raw("ubj")))
+
+    lgb_all = {**modeling.LGB_PARAMS, **(lgb_params or {})}
+    dataset = lgb.Dataset([_lgb_sequence(store, scaler, stop, chunk_rows)], label=np.asarray(store.y[:stop]),
+                          params={"verbose": -1})
+    lgb_booster = lgb.train({**lgb_all, "objective": "binary", "scale_pos_weight": pos_weight, "verbose": -1}, dataset)
+    del dataset
+    lgb_model = BoosterModel(lgb_booster, lgb_all)
+
+    version = dataset_hash(extra={"data": store.meta["content_hash"], "rows": stop, "xgb": xgb_params or {},
+                                  "lgb": lgb_params or {}, "store": True})[:16]
+    return Scorer(scaler, xgb_model, lgb_model, version, np.float32)
+
+
+def evaluate(scorer, store, start, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # AUC of both models on rows [start, rows), scored chunk by chunk (only the scores are kept)
+    from sklearn.metrics import roc_auc_score
+
+    scores = {"prob_xgb": [], "prob_lgb": []}
+    for s in range(start, store.rows, chunk_rows):
+        result = scorer.score_matrix(store.features(s, min(s + chunk_rows, store.rows)))
+        for key in scores:
+            scores[key].append(result[key])
+    y = np.asarray(store.y[start:])
+    if len(np.unique(y)) < 2:
+        return {}
+    return {key: float(roc_auc_score(y, np.concatenate(parts))) for key, parts in scores.items()}
+
+
+# ------------------------- COMMAND LINE -------------------------
+def _peak_rss_mb():
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped training store: build it from a cohort CSV, "
+                                                 "then train both models out of core.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="convert a CSV (upload schema + PONV_Outcome) into a store")
+    build.add_argument("csv")
+    build.add_argument("store")
+    build.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    build.add_argument("--seed", type=int, default=0, help="seed of the stored row order")
+    build.add_argument("--no-shuffle", action="store_true",
+                       help="keep the CSV's row order (the holdout is then the end of the file)")
+    fit = commands.add_parser("train", help="train both models from a store in chunks")
+    fit.add_argument("store")
+    fit.add_argument("-o", "--output", help="pickle the trained scorer (scaler, models, version) here")
+    fit.add_argument("--holdout", type=float, default=0.2,
+                     help="fraction of rows at the end of the store kept out of training for AUC (0 for none); "
+                          "a random sample unless the store was built with --no-shuffle")
+    fit.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    fit.add_argument("--tuning-dir", default=tuning.DEFAULT_TUNING_DIR)
+    fit.add_argument("--register", action="store_true",
+                     help="add the trained scorer to the model registry (with holdout AUCs and the store fingerprint)")
+    fit.add_argument("--activate", action="store_true", help="register it and make it the version the app serves")
+    fit.add_argument("--db", default=db.DEFAULT_DB_PATH, help="database holding the model registry")
+    fit.add_argument("--model-dir", default=registry.DEFAULT_MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "build":
+        store = TrainingStore.from_csv(args.store, args.csv, args.chunk_rows,
+                                       progress=lambda n: print(f"\r{n:,} rows", end="", file=sys.stderr),
+                                       shuffle_seed=None if args.no_shuffle else args.seed)
+        print(f"\nStored {store.rows:,} rows in {args.store} ({time.perf_counter() - started:.1f} s, "
+              f"fingerprint {store.meta['content_hash'][:16]}, peak RSS {_peak_rss_mb():.0f} MB)")
+        return 0
+
+    store = TrainingStore(args.store)
+    train_rows = store.rows - int(store.rows * args.holdout)
+    xgb_params, lgb_params = tuning.load_best_params(args.tuning_dir)
+    scorer = train(store, xgb_params, lgb_params, train_rows, args.chunk_rows)
+    print(f"Trained model {scorer.model_version} on {train_rows:,} rows in {time.perf_counter() - started:.1f} s "
+          f"(peak RSS {_peak_rss_mb():.0f} MB)")
+    aucs = {}
+    if train_rows < store.rows:
+        aucs = evaluate(scorer, store, train_rows, args.chunk_rows)
+        order = "file order" if store.meta.get("shuffle_seed", None) is None else "shuffled"
+        print(f"Holdout AUC on the last {store.rows - train_rows:,} rows ({order}): "
+              + ", ".join(f"{k}: {v:.4f}" for k, v in aucs.items()))
+    if args.register or args.activate:
+        model_registry = registry.ModelRegistry(args.db, args.model_dir)
+        model_registry.register(scorer, metrics={f"holdout_auc_{k[5:]}": v for k, v in aucs.items()},
+                          data_fingerprint=store.meta["content_hash"],
+                          params={"xgb": xgb_params, "lgb": lgb_params, "train_rows": train_rows}, source="store")
+        if args.activate:
+            model_registry.activate(scorer.model_version)
+        print(f"Registered model {scorer.model_version}{' (active)' if args.activate else ''}")
+    if args.output:
+        with open(args.output, "wb") as f:
+            pickle.dump(scorer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"Scorer written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
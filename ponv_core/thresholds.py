@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["Sensitivity", "Specificity", "PPV", "NPV", "Accuracy", "F1-score", "Youden J"]
+
+
+def _ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+# ------------------------- THRESHOLD TABLE -------------------------
+def threshold_table(y_true, scores):
+    # One sort + cumulative sums gives the confusion matrix at every distinct cutoff in O(n log n).
+    # Row i means "predict positive when score >= Threshold"; row 0 (Threshold = inf) predicts nobody.
+    y_true = np.asarray(y_true).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(-scores, kind="mergesort")
+    s = scores[order]
+    yt = y_true[order]
+
+    tp = np.cumsum(yt)
+    fp = np.cumsum(1 - yt)
+    # Last position of each run of tied scores, so ties move together
+    last = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1]
+    thresholds = np.r_[np.inf, s[last]]
+    tp = np.r_[0, tp[last]]
+    fp = np.r_[0, fp[last]]
+
+    pos = yt.sum()
+    neg = len(yt) - pos
+    fn = pos - tp
+    tn = neg - fp
+    sens = _ratio(tp, pos)
+    spec = _ratio(tn, neg)
+    ppv = _ratio(tp, tp + fp)
+    return pd.DataFrame({
+        "Threshold": thresholds,
+        "TP": tp, "FP": fp, "TN": tn, "FN": fn,
+        "Sensitivity": sens,
+        "Specificity": spec,
+        "PPV": ppv,
+        "NPV": _ratio(tn, tn + fn),
+        "Accuracy": (tp + tn) / max(len(yt), 1),
+        "F1-score": _ratio(2 * tp, 2 * tp + fp + fn),
+        "Youden J": sens + spec - 1,
+    })
+
+
+def youden_cutoff(table):
+    # Row with the largest Youden J (sensitivity + specificity - 1)
+    return table.iloc[int(np.nanargmax(table["Youden J"].to_numpy()))]
+
+
+def row_at(table, threshold):
+    # Rows are ordered by descending Threshold, so the operating point is the last row with Threshold >= t
+    count = np.searchsorted(-table["Threshold"].to_numpy(), -threshold, side="right")
+    return table.iloc[max(int(count) - 1, 0)]
+
+
+def slider_grid(step=0.01):
+    # Threshold at every slider position 0, step, ..., 1; position i is round(threshold / step)
+    return np.round(np.arange(0, 1 + step / 2, step), 10)
+
+
+def slider_index(table, step=0.01):
+    # Precomputed row index for every slider position 0, step, ..., 1 so a slider move is an O(1) lookup
+    grid = slider_grid(step)
+    counts = np.searchsorted(-table["Threshold"].to_numpy(), -grid, side="right")
+    return np.maximum(counts - 1, 0)
@@ -0,0 +1,180 @@
+import argparse
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from ponv_core.modeling import FEATURE_NAMES, RANDOM_STATE, generate_synthetic_data, make_models
+
+# Where the leaderboard and best config are written; the app reads best_params.json from here
+DEFAULT_TUNING_DIR = os.environ.get("PONV_TUNING_DIR", "tuning")
+BEST_PARAMS_FILE = "best_params.json"
+
+
+def search_spaces():
+    # Search spaces (n_estimators is not listed: it is the successive-halving budget). Built on demand
+    # so the app, which only reads best_params.json, never imports scipy or the search machinery.
+    from scipy.stats import loguniform, randint, uniform
+
+    return {
+        "xgb": {
+            "max_depth": randint(2, 8),
+            "learning_rate": loguniform(0.01, 0.3),
+            "subsample": uniform(0.6, 0.4),
+            "colsample_bytree": uniform(0.6, 0.4),
+            "min_child_weight": loguniform(0.5, 10),
+            "reg_lambda": loguniform(0.1, 10),
+        },
+        "lgb": {
+            "max_depth": randint(2, 8),
+            "num_leaves": randint(4, 64),
+            "learning_rate": loguniform(0.01, 0.3),
+            "min_child_samples": randint(5, 50),
+            "subsample": uniform(0.6, 0.4),
+            "subsample_freq": [1],
+            "colsample_bytree": uniform(0.6, 0.4),
+        },
+    }
+
+
+def _pipeline(model):
+    # Same preprocessing as the app, re-fitted inside every CV fold
+    from sklearn.preprocessing import StandardScaler
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline
+
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("smote", SMOTE(random_state=RANDOM_STATE)),
+        ("model", model),
+    ])
+
+
+# ------------------------- SUCCESSIVE HALVING SEARCH -------------------------
+def tune_model(model_key, X, y, n_candidates=81, factor=3, min_estimators=25, max_estimators=400,
+               cv_folds=3, n_jobs=-1, seed=RANDOM_STATE):
+    # Every candidate starts with min_estimators trees; only the best 1/factor survive
+    # to each next rung, which gets factor times more trees. Rungs run in parallel over n_jobs.
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+    from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold
+
+    xgb_model, lgb_model = make_models(
+        {"n_jobs": 1, "verbosity": 0},
+        {"n_jobs": 1, "verbose": -1},
+    )
+    model = xgb_model if model_key == "xgb" else lgb_model
+    space = {f"model__{name}": dist for name, dist in search_spaces()[model_key].items()}
+    search = HalvingRandomSearchCV(
+        _pipeline(model),
+        space,
+        n_candidates=n_candidates,
+        factor=factor,
+        resource="model__n_estimators",
+        min_resources=min_estimators,
+        max_resources=max_estimators,
+        cv=StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=seed),
+        scoring="roc_auc",
+        n_jobs=n_jobs,
+        random_state=seed,
+        refit=False,
+    )
+    search.fit(X, y)
+    return search
+
+
+def leaderboard(search):
+    res = pd.DataFrame(search.cv_results_)
+    board = pd.DataFrame({
+        "rung": res["iter"],
+        "n_estimators": res["n_resources"],
+        "mean_auc": res["mean_test_score"],
+        "sd_auc": res["std_test_score"],
+        "fit_time_s": res["mean_fit_time"],
+        "params": [json.dumps(_strip(p), default=_to_builtin) for p in res["params"]],
+    })
+    return board.sort_values(["rung", "mean_auc"], ascending=[False, False]).reset_index(drop=True)
+
+
+def _strip(params):
+    return {k.replace("model__", ""): _to_builtin(v) for k, v in params.items()}
+
+
+def _to_builtin(v):
+    return v.item() if isinstance(v, np.generic) else v
+
+
+# ------------------------- PERSISTENCE -------------------------
+def save_results(results, out_dir=DEFAULT_TUNING_DIR, n_rows=None):
+    # Merged into the existing best_params.json per model, so tuning one model keeps the other's config
+    os.makedirs(out_dir, exist_ok=True)
+    best = _read_best(out_dir)
+    best.update({"created": datetime.datetime.now().isoformat(timespec="seconds"), "n_rows": n_rows})
+    for model_key, search in results.items():
+        leaderboard(search).to_csv(os.path.join(out_dir, f"leaderboard_{model_key}.csv"), index=False)
+        best[model_key] = _strip(search.best_params_)
+        best[f"{model_key}_cv_auc"] = float(search.best_score_)
+    tmp = os.path.join(out_dir, f"{BEST_PARAMS_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(best, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, BEST_PARAMS_FILE))
+    return best
+
+
+def _read_best(out_dir):
+    try:
+        with open(os.path.join(out_dir, BEST_PARAMS_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def load_best_params(out_dir=DEFAULT_TUNING_DIR):
+    # Returns (xgb_params, lgb_params); empty dicts mean "use the hand-picked defaults"
+    best = _read_best(out_dir)
+    return best.get("xgb", {}), best.get("lgb", {})
+
+
+def training_split(X, y):
+    # The app's training rows (same split as ponv.py and Scorer.train). Its validation rows are where
+    # the app reports AUC and CIs, so they must not take part in choosing the parameters.
+    from sklearn.model_selection import train_test_split
+
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+    return X_train, y_train
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search for the PONV models.")
+    parser.add_argument("--data", help="CSV with the app's feature columns and PONV_Outcome (default: synthetic data); "
+                                       "only its 70%% training split is searched, as in the app")
+    parser.add_argument("--model", choices=["xgb", "lgb", "both"], default="both")
+    parser.add_argument("--n-candidates", type=int, default=81)
+    parser.add_argument("--factor", type=int, default=3)
+    parser.add_argument("--max-estimators", type=int, default=400)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--out-dir", default=DEFAULT_TUNING_DIR)
+    args = parser.parse_args(argv)
+
+    if args.data:
+        df = pd.read_csv(args.data)
+        X, y = df[FEATURE_NAMES].to_numpy(dtype=float), df["PONV_Outcome"].to_numpy()
+    else:
+        X, y = generate_synthetic_data()
+    X, y = training_split(X, y)
+
+    keys = ["xgb", "lgb"] if args.model == "both" else [args.model]
+    results = {}
+    for key in keys:
+        results[key] = tune_model(key, X, y, n_candidates=args.n_candidates, factor=args.factor,
+                                  max_estimators=args.max_estimators, cv_folds=args.cv, n_jobs=args.n_jobs)
+        print(f"{key}: best CV AUC {results[key].best_score_:.3f} with {_strip(results[key].best_params_)}")
+    save_results(results, args.out_dir, n_rows=len(y))
+    print(f"Leaderboards and {BEST_PARAMS_FILE} written to {args.out_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Readiness file written once the server process is hot; orchestrators poll it (or run --check)
+READY_FILE = os.environ.get("PONV_READY_FILE", ".ponv_ready")
+DEFAULT_URL = "http://localhost:8501"
+
+# Streamlit endpoints: liveness of the server, and a full run of the app's script inside the server
+# process (only served when server.scriptHealthCheckEnabled is on)
+HEALTH_ROUTE = "/_stcore/health"
+SCRIPT_RUN_ROUTE = "/_stcore/script-health-check"
+
+
+def _get(url, timeout):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read().decode(errors="replace")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode(errors="replace")
+    except (urllib.error.URLError, OSError) as e:
+        return None, str(e)
+
+
+# ------------------------- READINESS FILE -------------------------
+def write_ready(info, path=READY_FILE):
+    # Written atomically, so a poller never sees a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp, path)
+
+
+def clear_ready(path=READY_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_ready(path=READY_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# ------------------------- WARM-UP -------------------------
+def warm_up(url=DEFAULT_URL, timeout=600.0, poll=0.5, server=None):
+    # Wait for the server, then have it run the app once in-process. That first run pays for everything
+    # a first user would: synthetic data, scaling, SMOTE, both model fits, cross-validation, bootstrap,
+    # calibration and the DB schema, all left in the process-wide st.cache_* stores and the disk cache.
+    # Streamlit abandons a script run after 60 s and reports "timeout"; whatever finished stays cached,
+    # so the run is simply retried until it completes or the overall timeout is reached.
+    # With the server's process (serve), a server that exits (bad arguments, a crash, a forwarded
+    # SIGTERM) ends the wait at once instead of at the timeout.
+    url = url.rstrip("/")
+    start = time.monotonic()
+    deadline = start + timeout
+    attempts = 0
+    while True:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"the server exited with status {server.returncode} before it was warm")
+        status, body = _get(url + HEALTH_ROUTE, timeout=5)
+        if status == 200:
+            attempts += 1
+            status, body = _get(url + SCRIPT_RUN_ROUTE, timeout=max(deadline - time.monotonic(), 1))
+            if status == 200:
+                return {"url": url, "attempts": attempts, "warm_up_s": round(time.monotonic() - start, 2)}
+            if status == 404:
+                raise RuntimeError("server.scriptHealthCheckEnabled is off; start Streamlit with "
+                                   "--server.scriptHealthCheckEnabled true")
+            if body.strip() == "error":
+                raise RuntimeError("the app raised an exception during the warm-up run")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{url} not warm after {timeout:.0f} s (last response: {status} {body.strip()[:80]})")
+        time.sleep(poll)
+
+
+def serve(app, streamlit_args, url=DEFAULT_URL, timeout=600.0, ready_file=READY_FILE):
+    # Container entry point: start Streamlit, warm it, mark it ready, then stay attached to the server
+    clear_ready(ready_file)
+    server = subprocess.Popen([sys.executable, "-m", "streamlit", "run", app,
+                               "--server.scriptHealthCheckEnabled", "true", *streamlit_args])
+    # The orchestrator stops the container by signalling this process; pass that on to the server
+    signal.signal(signal.SIGTERM, lambda *_: server.terminate())
+    try:
+        info = warm_up(url, timeout, server=server)
+        write_ready({**info, "pid": server.pid, "ready_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, ready_file)
+        print(f"Warm after {info['warm_up_s']:.1f} s; readiness written to {ready_file}", flush=True)
+        return server.wait()
+    except BaseException:
+        server.terminate()
+        server.wait()
+        raise
+    finally:
+        clear_ready(ready_file)
+
+
+# ------------------------- COMMAND LINE -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Warm a PONV app server before it takes traffic, and probe whether it is ready.",
+        epilog="Anything after -- is passed to streamlit run (with --serve).")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--serve", metavar="APP", help="start `streamlit run APP`, warm it and write the ready file")
+    mode.add_argument("--check", action="store_true",
+                      help="readiness probe: exit 0 if the ready file exists, 1 otherwise")
+    parser.add_argument("--url", default=DEFAULT_URL, help="server to warm (default %(default)s)")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--ready-file", default=READY_FILE)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    streamlit_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+
+    if args.check:
+        info = read_ready(args.ready_file)
+        print(json.dumps(info) if info else "not ready")
+        return 0 if info else 1
+    if args.serve:
+        try:
+            return serve(args.serve, streamlit_args, args.url, args.timeout, args.ready_file)
+        except (RuntimeError, TimeoutError) as e:
+            print(f"Warm-up failed: {e}", file=sys.stderr)
+            return 1
+
+    # Warm a server started elsewhere (it must have server.scriptHealthCheckEnabled on)
+    clear_ready(args.ready_file)
+    try:
+        info = warm_up(args.url, args.timeout)
+    except (RuntimeError, TimeoutError) as e:
+        print(f"Warm-up failed: {e}", file=sys.stderr)
+        return 1
+    write_ready({**info, "ready_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, args.ready_file)
+    print(f"Warm after {info['warm_up_s']:.1f} s; readiness written to {args.ready_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
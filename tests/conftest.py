@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ponv_core import modeling
+
+
+# ------------------------- SHARED DATA -------------------------
+@pytest.fixture(scope="session")
+def synthetic():
+    # The app's synthetic cohort (500 rows, fixed seed)
+    return modeling.generate_synthetic_data(500)
+
+
+@pytest.fixture
+def labelled_scores():
+    # Outcomes and noisy scores with ties, as a model's probabilities on a validation split
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 400)
+    scores = np.round(np.clip(0.3 * y + rng.normal(0.35, 0.2, 400), 0, 1), 2)
+    return y, scores
+
+
+@pytest.fixture(scope="session")
+def scorer(tmp_path_factory):
+    # The app's scaler and models with the hand-picked parameters (an empty tuning directory)
+    from ponv_core.service import Scorer
+
+    return Scorer.train(tuning_dir=str(tmp_path_factory.mktemp("tuning")))
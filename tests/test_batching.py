@@ -0,0 +1,104 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ponv_core.batching import InferenceBroker
+from ponv_core.modeling import FEATURE_NAMES
+
+
+def _predict(calls):
+    def predict(X):
+        calls.append(len(X))
+        return {"sum": X.sum(axis=1), "first": X[:, 0]}
+    return predict
+
+
+def test_each_caller_gets_its_own_rows():
+    calls = []
+    broker = InferenceBroker(_predict(calls), max_batch=64, max_wait_ms=50)
+    try:
+        blocks = [np.full((i % 3 + 1, 4), i, dtype=float) for i in range(30)]
+        results = [None] * len(blocks)
+
+        def call(i):
+            results[i] = broker.predict(blocks[i], timeout=10)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(len(blocks))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for block, result in zip(blocks, results):
+            np.testing.assert_array_equal(result["sum"], block.sum(axis=1))
+            np.testing.assert_array_equal(result["first"], block[:, 0])
+        # Concurrent requests share model calls, none over max_batch rows
+        assert len(calls) < len(blocks)
+        assert sum(calls) == sum(len(b) for b in blocks) and max(calls) <= 64
+        assert broker.stats()["rows"] == sum(calls)
+    finally:
+        broker.close()
+
+
+def test_batch_closes_at_max_batch():
+    calls = []
+    broker = InferenceBroker(_predict(calls), max_batch=4, max_wait_ms=200)
+    try:
+        futures = [broker.submit(np.ones(3)) for _ in range(10)]
+        for f in futures:
+            assert f.result(timeout=10)["sum"].tolist() == [3.0]
+        assert max(calls) <= 4
+    finally:
+        broker.close()
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(X):
+        raise ValueError("bad batch")
+
+    broker = InferenceBroker(fail, max_batch=8, max_wait_ms=50)
+    try:
+        futures = [broker.submit(np.ones(2)) for _ in range(3)]
+        for f in futures:
+            with pytest.raises(ValueError, match="bad batch"):
+                f.result(timeout=10)
+    finally:
+        broker.close()
+    with pytest.raises(RuntimeError):
+        broker.submit(np.ones(2))
+
+
+def test_close_answers_every_accepted_request():
+    # Submitters racing close(): each submit is either refused or answered, never left pending
+    for _ in range(20):
+        broker = InferenceBroker(_predict([]), max_batch=8, max_wait_ms=1)
+        accepted = []
+        row = [1.0] * 5000  # a list, so converting it keeps submit() busy for a while
+
+        def submit_until_closed():
+            while True:
+                try:
+                    accepted.append(broker.submit(row))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit_until_closed) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.005)
+        broker.close()
+        for t in threads:
+            t.join()
+        assert all(f.done() for f in accepted)
+        broker.close()
+
+
+def test_scorer_through_the_broker(scorer, synthetic):
+    broker = InferenceBroker(scorer.score_matrix, max_batch=8, max_wait_ms=1)
+    try:
+        records = [dict(zip(FEATURE_NAMES, map(float, row))) for row in synthetic[0][:20]]
+        assert scorer.score_records(records, broker) == scorer.score_records(records)
+    finally:
+        broker.close()
+
@@ -0,0 +1,70 @@
+import numpy as np
+
+from ponv_core import modeling
+from ponv_core.cache import DiskCache, dataset_hash, dataset_id, fingerprint
+
+
+def test_dataset_hash_sees_content_shape_and_dtype():
+    X = np.arange(12, dtype=float).reshape(3, 4)
+    assert dataset_hash(X) == dataset_hash(X.copy())
+    assert dataset_hash(X) != dataset_hash(X.reshape(4, 3))
+    assert dataset_hash(X) != dataset_hash(X.astype(np.float32))
+    changed = X.copy()
+    changed[1, 2] += 1
+    assert dataset_hash(X) != dataset_hash(changed)
+    assert dataset_hash(X, extra={"k": 5}) != dataset_hash(X, extra={"k": 3})
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache("ns", root=tmp_path)
+    assert cache.get("key") is None
+    assert cache.get("key", default=1) == 1
+    cache.set("key", {"a": np.arange(3)})
+    assert "key" in cache
+    np.testing.assert_array_equal(cache.get("key")["a"], np.arange(3))
+    # No temp files are left behind by the atomic write
+    assert [p.name for p in (tmp_path / "ns").iterdir()] == ["key.pkl"]
+
+
+def test_disk_cache_ignores_truncated_entries(tmp_path):
+    cache = DiskCache("ns", root=tmp_path)
+    cache.set("key", [1, 2, 3])
+    (tmp_path / "ns" / "key.pkl").write_bytes(b"")
+    assert cache.get("key") is None
+
+
+def test_dataset_id_is_lineage_only():
+    assert dataset_id("upload", file_id="a", model="v1") == dataset_id("upload", model="v1", file_id="a")
+    assert dataset_id("upload", file_id="a", model="v1") != dataset_id("upload", file_id="b", model="v1")
+    ids = modeling.synthetic_dataset_ids()
+    assert len(set(ids.values())) == 4
+    assert ids != modeling.synthetic_dataset_ids(dtype=np.float32)
+
+
+def test_fingerprint_samples_large_arrays():
+    # Small arrays are hashed whole, so a change anywhere is seen
+    small = np.arange(100, dtype=float)
+    small_changed = small.copy()
+    small_changed[37] = -1
+    assert fingerprint(small) != fingerprint(small_changed)
+    large = np.arange(1_000_000, dtype=float)
+    assert fingerprint(large) == fingerprint(large.copy())
+    assert fingerprint(large) != fingerprint(large[:-1])
+    changed = large.copy()
+    changed[0] = -1
+    assert fingerprint(large) != fingerprint(changed)
+    # Strided views are sampled by row, first row included
+    column = changed.reshape(-1, 2)[:, 0]
+    assert fingerprint(column) == fingerprint(changed.copy().reshape(-1, 2)[:, 0])
+    assert fingerprint(column) != fingerprint(large.reshape(-1, 2)[:, 0])
+
+
+def test_model_version_hashes_content():
+    # Persisted results are keyed by model_version, so it must change with the training data itself
+    X = np.arange(40, dtype=float).reshape(10, 4)
+    y = np.arange(10) % 2
+    changed = X.copy()
+    changed[5, 1] += 1
+    assert modeling.model_version(X, y) == modeling.model_version(X.copy(), y)
+    assert modeling.model_version(X, y) != modeling.model_version(changed, y)
+    assert modeling.model_version(X, y) != modeling.model_version(X, y, xgb_params={"max_depth": 4})
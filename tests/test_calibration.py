@@ -0,0 +1,42 @@
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+
+from ponv_core import calibration
+
+
+def test_platt_matches_logistic_regression(labelled_scores):
+    y, scores = labelled_scores
+    calibrator = calibration.fit_calibrator(y, scores, "Platt")
+    lr = LogisticRegression(C=1e6).fit(scores.reshape(-1, 1), y)
+    np.testing.assert_allclose(calibrator(scores), lr.predict_proba(scores.reshape(-1, 1))[:, 1], atol=1e-12)
+
+
+def test_isotonic_matches_isotonic_regression(labelled_scores):
+    y, scores = labelled_scores
+    calibrator = calibration.fit_calibrator(y, scores, "Isotonic")
+    iso = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0).fit(scores, y)
+    probe = np.linspace(-0.5, 1.5, 101)
+    np.testing.assert_allclose(calibrator(probe), iso.predict(probe), atol=1e-12)
+
+
+def test_reliability_curve_counts_every_prediction(labelled_scores):
+    y, scores = labelled_scores
+    curve = calibration.reliability_curve(y, scores, n_bins=10)
+    assert curve["Count"].sum() == len(y)
+    for _, row in curve.iterrows():
+        in_bin = np.clip((scores * 10).astype(int), 0, 9) == row["Bin"]
+        assert np.isclose(row["Mean Predicted"], scores[in_bin].mean())
+        assert np.isclose(row["Observed Rate"], y[in_bin].mean())
+
+
+def test_load_or_fit_persists_per_model_version(labelled_scores, tmp_path):
+    y, scores = labelled_scores
+    calibrators, report = calibration.load_or_fit("v1", y, {"XGBoost": scores}, cache_dir=tmp_path)
+    assert set(calibrators["XGBoost"]) == set(calibration.METHODS)
+    assert report["XGBoost"]["Raw"]["brier"] == calibration.brier_score(y, scores)
+    # Calibration never makes the in-sample Brier score worse
+    assert report["XGBoost"]["Isotonic"]["brier"] <= report["XGBoost"]["Raw"]["brier"]
+    assert len(list((tmp_path / "calibration").iterdir())) == 1
+    again, _ = calibration.load_or_fit("v1", y, {"XGBoost": scores}, cache_dir=tmp_path)
+    assert again["XGBoost"]["Platt"].params == calibrators["XGBoost"]["Platt"].params
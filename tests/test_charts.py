@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from sklearn.metrics import roc_curve
+
+from ponv_core import charts
+
+
+def _roc(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    fpr, tpr, _ = roc_curve(y, y + rng.normal(0, 1.5, n), drop_intermediate=False)
+    return fpr, tpr
+
+
+@pytest.mark.parametrize("curve", [
+    _roc(),
+    # A step curve with repeated points at both ends (zero-length segments)
+    (np.r_[np.zeros(50), np.linspace(0, 1, 5000), np.ones(50)], np.r_[np.zeros(50), np.linspace(0, 1, 5000) ** 0.3, np.ones(50)]),
+])
+@pytest.mark.parametrize("max_points", [2, 50, charts.MAX_CURVE_POINTS])
+def test_downsampled_curve_keeps_ends_budget_and_order(curve, max_points):
+    x, y = curve
+    dx, dy = charts.downsample_curve(x, y, max_points)
+    assert len(dx) == len(dy) <= max_points
+    assert (dx[0], dy[0]) == (x[0], y[0]) and (dx[-1], dy[-1]) == (x[-1], y[-1])
+    # Kept points are a subsequence of the curve, so a monotone curve stays monotone
+    assert np.all(np.diff(dx) >= 0) and np.all(np.diff(dy) >= 0)
+    kept = {(a, b) for a, b in zip(x, y)}
+    assert all((a, b) in kept for a, b in zip(dx, dy))
+
+
+def test_short_curves_pass_through_unchanged():
+    x, y = np.linspace(0, 1, charts.MAX_CURVE_POINTS), np.linspace(0, 1, charts.MAX_CURVE_POINTS) ** 2
+    dx, dy = charts.downsample_curve(x, y)
+    np.testing.assert_array_equal(dx, x)
+    np.testing.assert_array_equal(dy, y)
+
+
+def test_roc_spec_is_bounded():
+    fpr, tpr = _roc()
+    spec = charts.roc_spec([("XGBoost", fpr, tpr, 0.8)], "ROC")
+    assert len(spec["data"][0]["x"]) <= charts.MAX_CURVE_POINTS
+    assert spec["data"][0]["name"] == "XGBoost (AUC = 0.800)"
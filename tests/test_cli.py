@@ -0,0 +1,59 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ponv_core import cli, modeling
+
+
+@pytest.fixture
+def cohort_csv(synthetic, tmp_path):
+    X, y = synthetic
+    df = pd.DataFrame(X[:120], columns=modeling.FEATURE_NAMES)
+    df.insert(0, "Patient", [f"p{i}" for i in range(len(df))])
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _args(tmp_path, *extra):
+    # An empty registry database and tuning directory: the CLI serves the app's own model
+    return ["score", *extra, "--db", str(tmp_path / "none.db"), "--model-dir", str(tmp_path / "models"),
+            "--tuning-dir", str(tmp_path / "tuning"), "-q"]
+
+
+def test_score_command_writes_the_scored_csv(cohort_csv, scorer, tmp_path):
+    out = tmp_path / "out.csv"
+    assert cli.main(_args(tmp_path, str(cohort_csv), "-o", str(out), "-j", "1", "--chunk-rows", "50")) == 0
+    scored = pd.read_csv(out)
+    expected = cli.score_frame(scorer, pd.read_csv(cohort_csv))
+    assert list(scored.columns) == list(expected.columns)
+    assert scored["Patient"].tolist() == expected["Patient"].tolist()
+    np.testing.assert_allclose(scored["Predicted_Risk_XGBoost"], expected["Predicted_Risk_XGBoost"], rtol=1e-6)
+    assert scored["Risk_Category"].tolist() == expected["Risk_Category"].tolist()
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("out.csv")] == ["out.csv"]
+
+
+def test_workers_keep_input_order(cohort_csv, scorer):
+    serial, parallel = io.StringIO(), io.StringIO()
+    assert cli.score_csv(str(cohort_csv), serial, scorer, workers=1, chunk_rows=25) == 120
+    assert cli.score_csv(str(cohort_csv), parallel, scorer, workers=2, chunk_rows=25) == 120
+    assert parallel.getvalue() == serial.getvalue()
+
+
+def test_missing_input_fails_before_training(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli.Scorer, "serving", classmethod(lambda cls, *a, **k: pytest.fail("trained")))
+    out = tmp_path / "out.csv"
+    assert cli.main(_args(tmp_path, str(tmp_path / "missing.csv"), "-o", str(out))) == 1
+    assert not out.exists()
+
+
+def test_failed_run_leaves_no_output(cohort_csv, scorer, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli.Scorer, "serving", classmethod(lambda cls, *a, **k: scorer))
+    pd.read_csv(cohort_csv).drop(columns=["Age"]).to_csv(cohort_csv, index=False)
+    out = tmp_path / "out.csv"
+    out.write_text("previous results\n")
+    assert cli.main(_args(tmp_path, str(cohort_csv), "-o", str(out), "-j", "1")) == 1
+    assert out.read_text() == "previous results\n"
+    assert not list(tmp_path.glob("out.csv.*.tmp"))
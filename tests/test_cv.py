@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from ponv_core import cv
+
+
+def test_folds_cover_every_row_once(synthetic, tmp_path):
+    X, y = synthetic
+    results = cv.cross_validate(X, y, k=3, n_jobs=1, cache_dir=tmp_path)
+    test_rows = np.concatenate([r["test_idx"] for r in results])
+    assert sorted(test_rows) == list(range(len(y)))
+
+    oof = cv.out_of_fold_predictions(results, len(y))
+    for name in cv.MODEL_NAMES:
+        assert not np.isnan(oof[name]).any()
+        for r in results:
+            assert r["auc"][name] == roc_auc_score(y[r["test_idx"]], r["proba"][name])
+
+
+def test_folds_are_cached_on_disk(synthetic, tmp_path):
+    X, y = synthetic
+    first = cv.cross_validate(X, y, k=3, n_jobs=1, cache_dir=tmp_path)
+    # A second run finds every fold on disk and returns the same predictions
+    second = cv.cross_validate(X, y, k=3, n_jobs=1, cache_dir=tmp_path)
+    assert len(list(tmp_path.rglob("fold_*.pkl"))) == 3
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a["proba"]["XGBoost"], b["proba"]["XGBoost"])
+
+
+def test_summary(synthetic, tmp_path):
+    X, y = synthetic
+    summary = cv.cv_summary(cv.cross_validate(X, y, k=3, n_jobs=1, cache_dir=tmp_path))
+    assert list(summary["Model"]) == list(cv.MODEL_NAMES)
+    assert (summary["Folds"] == 3).all()
+    assert ((summary["Mean AUC"] > 0.5) & (summary["Mean AUC"] <= 1)).all()
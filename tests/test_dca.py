@@ -0,0 +1,39 @@
+import numpy as np
+
+from ponv_core import dca
+
+
+def _net_benefit_loop(y, proba, thresholds):
+    # The textbook definition, one threshold at a time
+    n = len(y)
+    out = []
+    for pt in thresholds:
+        treated = proba >= pt
+        tp = np.sum(treated & (y == 1))
+        fp = np.sum(treated & (y == 0))
+        out.append(tp / n - fp / n * pt / (1 - pt))
+    return np.array(out)
+
+
+def test_net_benefit_matches_definition(labelled_scores):
+    y, scores = labelled_scores
+    np.testing.assert_allclose(dca.net_benefit(y, scores), _net_benefit_loop(y, scores, dca.DEFAULT_THRESHOLDS),
+                               atol=1e-12)
+
+
+def test_reference_strategies(labelled_scores):
+    y, scores = labelled_scores
+    curves = dca.decision_curves(y, {"Model": scores})
+    assert list(curves.columns) == ["Threshold", "Model", "Treat All", "Treat None"]
+    # Treating everyone is the net benefit of a model that predicts 1 for all patients
+    np.testing.assert_allclose(curves["Treat All"], dca.net_benefit(y, np.ones(len(y))), atol=1e-12)
+    assert (curves["Treat None"] == 0).all()
+
+
+def test_cached_curves(labelled_scores, tmp_path):
+    y, scores = labelled_scores
+    curves = dca.cached_decision_curves(y, {"Model": scores}, cache_dir=tmp_path)
+    assert curves.equals(dca.cached_decision_curves(y, {"Model": scores}, cache_dir=tmp_path))
+    assert len(list((tmp_path / "dca").iterdir())) == 1
+    dca.cached_decision_curves(y, {"Other": scores}, cache_dir=tmp_path)
+    assert len(list((tmp_path / "dca").iterdir())) == 2
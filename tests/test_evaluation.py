@@ -0,0 +1,29 @@
+import numpy as np
+from sklearn.metrics import precision_score, recall_score, roc_auc_score
+
+from ponv_core import calibration, evaluation, modeling
+
+
+def test_evaluate_upload(scorer):
+    X, y = modeling.generate_synthetic_data(300)
+    scores = scorer.score_matrix(X)
+    calibrator = calibration.fit_calibrator(y, scores["hybrid_score"], "Platt")
+    result = evaluation.evaluate_upload(scorer, X, y, calibrator, threshold=0.4, n_boot=100)
+
+    for key in ("hybrid_score", "prob_xgb", "prob_lgb"):
+        np.testing.assert_array_equal(result["scores"][key], scores[key])
+    for name, key in evaluation.MODEL_SCORES.items():
+        _, precision, recall, _ = result["metrics"][name]
+        assert precision == precision_score(y, scores[key] >= 0.4)
+        assert recall == recall_score(y, scores[key] >= 0.4)
+        assert np.isclose(result["auc_ci"][name][0], roc_auc_score(y, scores[key]))
+    assert [(name, round(auc, 12)) for name, _, _, auc in result["roc"]] == \
+        [(name, round(roc_auc_score(y, scores[key]), 12)) for name, key in evaluation.MODEL_SCORES.items()]
+    curves = result["decision_curves"]
+    assert {"LightGBM", "XGBoost", "Hybrid Score", "Treat All", "Treat None"} <= set(curves.columns)
+    assert result["contributions"]["XGBoost"].shape == (300, modeling.N_FEATURES + 1)
+
+
+def test_threshold_metrics_without_positive_predictions():
+    accuracy, precision, recall, f1 = evaluation.threshold_metrics([0, 1, 1, 0], [0.1, 0.2, 0.3, 0.4], 0.9)
+    assert (accuracy, precision, recall, f1) == (0.5, 0.0, 0.0, 0.0)
@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from ponv_core import explain, modeling
+
+
+def test_contributions_add_up_to_the_models_log_odds(scorer, synthetic):
+    X_scaled = scorer.scaler.transform(synthetic[0][:50])
+    contribs = explain.tree_contributions(scorer.xgb_model, scorer.lgb_model, X_scaled)
+    for name in explain.MODEL_NAMES:
+        assert contribs[name].shape == (50, modeling.N_FEATURES + 1)
+    np.testing.assert_allclose(contribs["XGBoost"].sum(axis=1),
+                               scorer.xgb_model.get_booster().predict(xgb.DMatrix(X_scaled), output_margin=True),
+                               rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(contribs["LightGBM"].sum(axis=1), scorer.lgb_model.predict(X_scaled, raw_score=True),
+                               rtol=1e-6, atol=1e-6)
+
+
+def test_cache_computes_only_unseen_rows(scorer, synthetic, monkeypatch):
+    X_scaled = scorer.scaler.transform(synthetic[0][:20])
+    cache = explain.ContributionCache(max_rows=15)
+    first = cache.get("v1", scorer.xgb_model, scorer.lgb_model, X_scaled[:10])
+
+    computed = []
+    tree_contributions = explain.tree_contributions
+    monkeypatch.setattr(explain, "tree_contributions",
+                        lambda x, l, rows: computed.append(len(rows)) or tree_contributions(x, l, rows))
+    second = cache.get("v1", scorer.xgb_model, scorer.lgb_model, X_scaled)
+    assert computed == [10]
+    np.testing.assert_array_equal(second["XGBoost"][:10], first["XGBoost"])
+    assert len(cache._rows) == 15
+
+
+def test_cohort_csv_has_one_column_per_model_and_feature(scorer, synthetic):
+    X_scaled = scorer.scaler.transform(synthetic[0][:5])
+    contribs = explain.tree_contributions(scorer.xgb_model, scorer.lgb_model, X_scaled)
+    frame = pd.read_csv(io.BytesIO(explain.cohort_contributions_csv(contribs, modeling.FEATURE_NAMES)))
+    assert frame.shape == (5, 2 * (modeling.N_FEATURES + 1))
+    np.testing.assert_allclose(frame["LightGBM: Bias"], contribs["LightGBM"][:, -1], rtol=1e-5)
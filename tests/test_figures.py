@@ -0,0 +1,26 @@
+import matplotlib
+import numpy as np
+
+from ponv_core import figures
+
+
+def _draw(fig):
+    fig.add_subplot().plot([0, 1], [0, 1])
+
+
+def test_theme_does_not_leak_into_global_rcparams():
+    before = dict(matplotlib.rcParams)
+    png = figures.figure_to_png(_draw)
+    assert png.startswith(b"\x89PNG")
+    assert dict(matplotlib.rcParams) == before
+    assert figures.stats()["live"] == 0
+
+
+def test_render_png_reuses_bytes_per_content_key():
+    key = figures.content_key("roc", np.arange(10.0))
+    assert key == figures.content_key("roc", np.arange(10.0))
+    assert key != figures.content_key("roc", np.arange(11.0))
+    rendered = figures.stats()["rendered"]
+    first = figures.render_png(key, _draw)
+    assert figures.render_png(key, _draw) is first
+    assert figures.stats()["rendered"] == rendered + 1
@@ -0,0 +1,68 @@
+import math
+
+import pytest
+
+from ponv_core import metrics
+
+
+@pytest.fixture
+def sections(monkeypatch):
+    # A private section registry, so tests neither see nor leave app timings
+    monkeypatch.setattr(metrics, "_sections", {})
+    return metrics._sections
+
+
+def test_value_on_a_bound_falls_in_that_bucket():
+    histogram = metrics.Histogram((1, 2, 5))
+    for value in (0.5, 1, 1.0001, 2, 5, 5.5):
+        histogram.observe(value)
+    snap = histogram.snapshot()
+    # le semantics: 1 goes in le=1, 2 in le=2, 5 in le=5; 5.5 only in +Inf
+    assert snap["counts"] == [2, 2, 1, 1]
+    assert snap["count"] == 6
+    assert snap["sum"] == pytest.approx(15.0001)
+
+
+def test_quantile_is_the_upper_bound_of_its_bucket():
+    histogram = metrics.Histogram((1, 2, 5))
+    assert histogram.quantile(0.5) is None and histogram.mean() is None
+    for value in (1, 1, 2, 4, 4, 4, 4, 4, 9, 9):
+        histogram.observe(value)
+    assert histogram.quantile(0.2) == 1
+    assert histogram.quantile(0.3) == 2
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.8) == 5
+    assert histogram.quantile(0.95) == math.inf
+    assert histogram.mean() == pytest.approx(4.2)
+
+
+def test_prometheus_text_is_cumulative_in_seconds(sections):
+    for ms in (1, 3, 3, 20000):
+        metrics.observe_section('run "total"', ms)
+    lines = metrics.prometheus_text().splitlines()
+    assert lines[:2] == ["# HELP ponv_section_duration_seconds Wall time of each instrumented app section per run.",
+                         "# TYPE ponv_section_duration_seconds histogram"]
+    label = 'section="run \\"total\\""'
+    buckets = [line for line in lines if line.startswith("ponv_section_duration_seconds_bucket")]
+    assert len(buckets) == len(metrics.SECTION_BUCKETS_MS) + 1
+    assert buckets[0] == f'ponv_section_duration_seconds_bucket{{{label},le="0.001"}} 1'
+    assert buckets[1] == f'ponv_section_duration_seconds_bucket{{{label},le="0.002"}} 1'
+    assert buckets[2] == f'ponv_section_duration_seconds_bucket{{{label},le="0.005"}} 3'
+    assert buckets[-2] == f'ponv_section_duration_seconds_bucket{{{label},le="10.0"}} 3'
+    assert buckets[-1] == f'ponv_section_duration_seconds_bucket{{{label},le="+Inf"}} 4'
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert f"ponv_section_duration_seconds_sum{{{label}}} 20.007" in lines
+    assert f"ponv_section_duration_seconds_count{{{label}}} 4" in lines
+
+
+def test_laps_record_the_time_since_the_previous_lap(sections):
+    run_timer = metrics.Laps()
+    run_timer.lap("a")
+    run_timer.skip()
+    run_timer.lap("b")
+    run_timer.total("run")
+    stats = metrics.section_stats()
+    assert list(stats) == ["a", "b", "run"]
+    assert all(s["count"] == 1 for s in stats.values())
+    assert stats["run"]["total_ms"] >= stats["a"]["total_ms"] + stats["b"]["total_ms"]
@@ -0,0 +1,37 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from ponv_core import modeling, precision, scoring
+
+
+def test_float32_pipeline_matches_float64(tmp_path):
+    report = precision.parity(n_samples=500, cohort_rows=5000, tuning_dir=str(tmp_path))
+    assert report["labels_match"]
+    assert precision.failures(report) == []
+
+
+def test_float32_hybrid_score_keeps_band_edges():
+    # 0.2 mg glycopyrrolate and 0.1 mg fentanyl stored as float32 are slightly above the edges
+    X = np.zeros((2, modeling.N_FEATURES))
+    X[0, scoring.DOSE_COLUMNS["glycopyrrolate"]] = 0.2
+    X[1, scoring.DOSE_COLUMNS["fentanyl"]] = 0.1
+    np.testing.assert_array_equal(scoring.hybrid_score_matrix(X.astype(np.float32)), scoring.hybrid_score_matrix(X))
+
+
+def test_packed_layout_round_trips(synthetic):
+    X = synthetic[0].astype(np.float32)
+    binary, numeric = modeling.pack_features(X)
+    assert binary.dtype == np.uint8 and numeric.dtype == np.float32
+    np.testing.assert_array_equal(modeling.unpack_features(binary, numeric, np.float32), X)
+
+
+def test_float32_csv_read_accepts_blank_cells(monkeypatch):
+    monkeypatch.setattr(modeling, "FLOAT32", True)
+    values = ["1"] * modeling.N_FEATURES
+    values[0] = ""
+    text = ",".join(f'"{name}"' for name in modeling.FEATURE_NAMES) + "\n" + ",".join(values) + "\n"
+    df = pd.read_csv(io.StringIO(text), dtype=modeling.csv_dtypes())
+    assert (df.dtypes == np.float32).all()
+    assert np.isnan(df["Female"].iloc[0]) and df["Non-Smoker"].iloc[0] == 1
@@ -0,0 +1,76 @@
+import collections
+import pstats
+import tracemalloc
+
+import pytest
+
+from ponv_core import profiling
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path):
+    # Fresh rolling windows and output directory per test
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "_active", {})
+    monkeypatch.setattr(profiling, "_cpu_window", collections.deque(maxlen=profiling.WINDOW))
+    monkeypatch.setattr(profiling, "_memory_window", collections.deque(maxlen=profiling.WINDOW))
+    monkeypatch.setattr(profiling, "_last_snapshot", None)
+    monkeypatch.setattr(profiling, "_tracing_runs", 0)
+    return tmp_path
+
+
+def _busy_function(n=20000):
+    return sum(i * i for i in range(n))
+
+
+def _allocate():
+    return [bytearray(1 << 20) for _ in range(4)]
+
+
+def test_profiled_run_writes_profiles_and_summary(profile_dir):
+    profiling.begin({"cpu", "memory"})
+    _busy_function()
+    kept = _allocate()
+    run = profiling.end()
+    assert not tracemalloc.is_tracing()
+    assert run["session"] == "main" and not run["interrupted"] and run["seconds"] > 0
+    assert sorted(path.rsplit(".", 1)[1] for path in run["files"]) == ["prof", "tracemalloc"]
+
+    stats = pstats.Stats(run["files"][0]).stats
+    assert any(name == "_busy_function" for (_, _, name) in stats)
+    cpu = profiling.cpu_summary()
+    assert cpu["runs"] == 1
+    busy = next(r for r in cpu["cumulative"] if r["function"].endswith("(_busy_function)"))
+    assert busy["calls"] == 1 and busy["runs"] == 1 and busy["cumulative_s"] > 0
+
+    # The 4 MB still held at the end of the run is charged to the allocating line
+    memory = profiling.memory_summary()
+    assert memory["runs"] == 1 and memory["growth"] == []
+    site, size = memory["held"][0]
+    assert "test_profiling.py" in site and size >= 4 << 20
+    assert len(tracemalloc.Snapshot.load(run["files"][1]).traces) > 0
+
+    summary = (profile_dir / "summary.txt").read_text()
+    assert "_busy_function" in summary and "test_profiling.py" in summary
+    del kept
+
+
+def test_next_begin_finishes_an_interrupted_run(profile_dir):
+    profiling.begin({"cpu"})
+    _busy_function()
+    # A rerun starts before end(): the first run is written out, marked interrupted
+    profiling.begin({"cpu"})
+    assert profiling.cpu_summary()["runs"] == 1
+    assert len(list(profile_dir.glob("*.prof"))) == 1
+    assert (profile_dir / "summary.txt").exists()
+    run = profiling.end()
+    assert not run["interrupted"]
+    assert profiling.cpu_summary()["runs"] == 2
+    assert len(list(profile_dir.glob("*.prof"))) == 2
+    assert profiling.end() is None
+
+
+def test_nothing_is_captured_without_modes(profile_dir):
+    profiling.begin(set())
+    assert profiling.end() is None
+    assert list(profile_dir.iterdir()) == []
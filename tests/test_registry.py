@@ -0,0 +1,67 @@
+import pytest
+
+from ponv_core import registry
+from ponv_core.service import Scorer
+
+
+@pytest.fixture
+def model_registry(tmp_path):
+    return registry.ModelRegistry(str(tmp_path / "logs.db"), str(tmp_path / "models"))
+
+
+def _version(scorer, name):
+    return Scorer(scorer.scaler, scorer.xgb_model, scorer.lgb_model, name, scorer.dtype)
+
+
+def test_register_is_idempotent(model_registry, scorer):
+    entry = model_registry.register(scorer, metrics={"auc": 0.8}, source="app")
+    assert entry["version"] == scorer.model_version
+    assert model_registry.register(scorer, metrics={"auc": 0.1}) == entry
+    assert [e["version"] for e in model_registry.versions()] == [scorer.model_version]
+    assert model_registry.load(scorer.model_version).model_version == scorer.model_version
+
+
+def test_activate_and_rollback(model_registry, scorer):
+    for name in ("v1", "v2"):
+        model_registry.register(_version(scorer, name))
+    assert model_registry.active_version() is None
+    model_registry.activate("v1")
+    model_registry.activate("v2")
+    assert model_registry.active()["previous_version"] == "v1"
+    assert model_registry.rollback() == "v1"
+    assert model_registry.active_version() == "v1"
+    # Rolling back again returns to the version that was just replaced
+    assert model_registry.rollback() == "v2"
+    model_registry.activate(None)
+    assert model_registry.active_version() is None
+
+
+def test_errors(model_registry, scorer):
+    with pytest.raises(registry.RegistryError):
+        model_registry.activate("missing")
+    with pytest.raises(registry.RegistryError):
+        model_registry.rollback()
+    entry = model_registry.register(scorer)
+    with open(entry["artifact_path"], "ab") as f:
+        f.write(b"tampered")
+    with pytest.raises(registry.RegistryError, match="does not match"):
+        model_registry.load(scorer.model_version)
+
+
+def test_serving_follows_the_active_version(model_registry, scorer, tmp_path, monkeypatch):
+    monkeypatch.setattr(Scorer, "train", classmethod(lambda cls, **kwargs: _version(scorer, "app")))
+
+    def serving(**kwargs):
+        return Scorer.serving(tuning_dir=str(tmp_path), db_path=model_registry.db_path,
+                              model_dir=model_registry.model_dir, **kwargs)
+
+    assert serving().model_version == "app"
+    model_registry.register(_version(scorer, "v1"))
+    model_registry.activate("v1")
+    assert serving().model_version == "v1"
+
+    # An artifact that no longer loads falls back to the app's own model, with a message
+    messages = []
+    (tmp_path / "models" / "v1.pkl").unlink()
+    assert serving(log=messages.append).model_version == "app"
+    assert "v1" in messages[0]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from ponv_core import scoring
+from ponv_core.scoring import AGE_COLUMN, BINARY_COLUMNS, DOSE_COLUMNS, PROPOFOL_COLUMN
+
+# Doses on and around every band edge (fentanyl in mg, as in the feature matrix)
+EDGE_DOSES = [0, 0.1, 0.2, 0.25, 1.5, 2, 2.5, 4, 4.5, 8, 10, 10.5, 100, 150, 200, 250]
+FENTANYL_DOSES = [0, 0.05, 0.1, 0.1001, 0.3, 0.5, 0.5001, 0.6]
+
+
+def _cohort(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n, 23))
+    X[:, BINARY_COLUMNS] = rng.integers(0, 2, (n, len(BINARY_COLUMNS)))
+    X[:, AGE_COLUMN] = rng.choice([30, 50, 50.5, 70], n)
+    for drug, col in DOSE_COLUMNS.items():
+        X[:, col] = rng.choice(FENTANYL_DOSES if drug == "fentanyl" else EDGE_DOSES, n)
+    X[:, PROPOFOL_COLUMN] = rng.choice([-3, -1, 0], n)
+    return X
+
+
+def _scalar_rules(row):
+    # The sidebar's rules, one factor at a time (fentanyl is banded in mcg)
+    score = sum(1 for c in BINARY_COLUMNS if row[c] == 1) + (row[AGE_COLUMN] > 50)
+    score += scoring.midazolam_score(row[14]) + scoring.ondansetron_score(row[15])
+    score += scoring.dexamethasone_score(row[16]) + scoring.glycopyrrolate_score(row[17])
+    score += scoring.nalbuphine_score(row[18]) + scoring.fentanyl_score(round(row[19] * 1000, 6))
+    score += scoring.butorphanol_score(row[20]) + scoring.pentazocine_score(row[21])
+    return score + int(row[PROPOFOL_COLUMN])
+
+
+def test_matrix_equals_scalar_rules():
+    X = _cohort()
+    np.testing.assert_array_equal(scoring.hybrid_score_matrix(X), [_scalar_rules(row) for row in X])
+
+
+def test_dose_score_array_equals_dose_score():
+    doses = np.array(EDGE_DOSES + [1000 * d for d in FENTANYL_DOSES], dtype=float)
+    for drug in scoring.DOSE_BANDS:
+        np.testing.assert_array_equal(scoring.dose_score_array(drug, doses),
+                                      [scoring.dose_score(drug, d) for d in doses])
+
+
+@pytest.mark.parametrize("score, category", [(-5, "Very Low Risk"), (-4, "Low Risk"), (3, "Low Risk"),
+                                             (4, "Moderate Risk"), (10, "High Risk"), (16, "Very High Risk")])
+def test_risk_category_bounds(score, category):
+    assert scoring.risk_category(score)[0] == category
+
+
+def test_scalar_hybrid_score_equals_matrix():
+    X = _cohort(seed=1)
+    np.testing.assert_array_equal([scoring.hybrid_score(row) for row in X], scoring.hybrid_score_matrix(X))
+    # The muscle relaxant is scored from the sidebar choice on top of the feature row
+    assert scoring.hybrid_score(X[0], "Rocuronium", 1.2) == scoring.hybrid_score(X[0]) + 2
@@ -0,0 +1,87 @@
+import http.client
+import json
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from ponv_core import modeling, service
+
+
+@pytest.fixture(scope="module")
+def server(scorer):
+    server = service.make_server(scorer, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+    data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode()
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    status, payload = response.status, json.loads(response.read())
+    conn.close()
+    return status, payload
+
+
+def _records(X):
+    return [dict(zip(modeling.FEATURE_NAMES, map(float, row))) for row in X]
+
+
+def test_scores_match_score_matrix(server, scorer, synthetic):
+    X = synthetic[0][:25]
+    status, results = _request(server, "POST", "/score", _records(X))
+    assert status == 200 and len(results) == 25
+    expected = scorer.score_matrix(X)
+    np.testing.assert_allclose([r["prob_xgb"] for r in results], expected["prob_xgb"])
+    np.testing.assert_allclose([r["prob_lgb"] for r in results], expected["prob_lgb"])
+    assert [r["hybrid_score"] for r in results] == expected["hybrid_score"].tolist()
+    assert {r["model_version"] for r in results} == {scorer.model_version}
+
+    status, single = _request(server, "POST", "/score", _records(X[:1])[0])
+    assert status == 200 and single == results[0]
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"\xff\xfe", json.dumps([]).encode(), json.dumps(5).encode()])
+def test_invalid_body_is_400(server, body):
+    status, payload = _request(server, "POST", "/score", body)
+    assert status == 400 and "error" in payload
+
+
+def test_negative_content_length_is_400(server):
+    # Sent raw and left open: a handler reading to EOF would never answer
+    with socket.create_connection(server.server_address[:2], timeout=10) as sock:
+        sock.sendall(b"POST /score HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n{}")
+        response = http.client.HTTPResponse(sock)
+        response.begin()
+        assert response.status == 400
+        assert json.loads(response.read()) == {"error": "invalid Content-Length"}
+
+
+def test_invalid_record_is_422(server, synthetic):
+    record = _records(synthetic[0][:1])[0]
+    for bad in ({k: v for k, v in record.items() if k != "Age"}, {**record, "Age": "old"},
+                {**record, "Age": None}, "patient"):
+        status, payload = _request(server, "POST", "/score", [bad])
+        assert status == 422 and "patient 0" in payload["error"]
+    # NaN and Infinity parse as JSON floats but are not valid features
+    status, _ = _request(server, "POST", "/score", json.dumps([{**record, "Age": float("nan")}]).encode())
+    assert status == 422
+
+
+def test_health_and_unknown_paths(server, scorer):
+    status, health = _request(server, "GET", "/health")
+    assert status == 200 and health["model_version"] == scorer.model_version
+    assert health["features"] == modeling.FEATURE_NAMES
+    assert _request(server, "GET", "/nope")[0] == 404
+    assert _request(server, "POST", "/nope", b"{}")[0] == 404
+
+
+def test_listen_backlog():
+    assert service.ScoringServer.request_queue_size == socket.SOMAXCONN
+
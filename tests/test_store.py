@@ -0,0 +1,98 @@
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ponv_core import explain, importance, modeling, registry, store
+
+
+@pytest.fixture
+def cohort_csv(synthetic, tmp_path):
+    X, y = synthetic
+    df = pd.DataFrame(X, columns=modeling.FEATURE_NAMES)
+    df["PONV_Outcome"] = y.astype(int)
+    path = tmp_path / "cohort.csv"
+    df.to_csv(path, index=False)
+    with open(path, "a") as f:
+        f.write("\n")  # a blank trailing line is not a row
+    return path
+
+
+def test_round_trip_in_file_order(cohort_csv, synthetic, tmp_path):
+    X, y = synthetic
+    training_store = store.TrainingStore.from_csv(str(tmp_path / "s"), str(cohort_csv), chunk_rows=128,
+                                                  shuffle_seed=None)
+    assert training_store.rows == len(y)
+    np.testing.assert_array_equal(training_store.features(0, len(y)), X.astype(np.float32))
+    np.testing.assert_array_equal(training_store.y, y)
+    # Reopened read-only from disk with the same content
+    reopened = store.TrainingStore(str(tmp_path / "s"))
+    assert reopened.meta["content_hash"] == training_store.meta["content_hash"]
+    assert sum(len(chunk_y) for _, _, chunk_y in reopened.chunks(chunk_rows=64)) == len(y)
+
+
+def test_shuffled_store_holds_the_same_rows(cohort_csv, synthetic, tmp_path):
+    X, y = synthetic
+    shuffled = store.TrainingStore.from_csv(str(tmp_path / "s"), str(cohort_csv), chunk_rows=128, shuffle_seed=3)
+    order = np.random.default_rng(3).permutation(len(y))
+    stored = shuffled.features(0, len(y))
+    np.testing.assert_array_equal(stored[order], X.astype(np.float32))
+    np.testing.assert_array_equal(np.asarray(shuffled.y)[order], y)
+    again = store.TrainingStore.from_csv(str(tmp_path / "t"), str(cohort_csv), chunk_rows=100, shuffle_seed=3)
+    assert again.meta["content_hash"] == shuffled.meta["content_hash"]
+
+
+def test_out_of_core_training(synthetic, tmp_path):
+    X, y = synthetic
+    training_store = store.TrainingStore.from_arrays(str(tmp_path / "s"), X, y, chunk_rows=100)
+    scorer = store.train(training_store, train_rows=400, chunk_rows=100)
+    aucs = store.evaluate(scorer, training_store, 400, chunk_rows=50)
+    assert set(aucs) == {"prob_xgb", "prob_lgb"}
+    assert all(auc > 0.7 for auc in aucs.values())
+    # The scaler fitted chunk by chunk equals one fitted on all training rows at once
+    np.testing.assert_allclose(scorer.scaler.mean_, X[:400].astype(np.float32).mean(axis=0), rtol=1e-5)
+
+
+def test_class_weight_counts_only_training_rows(synthetic, tmp_path):
+    # Every holdout row positive: a chunk reaching past train_rows would count them and make the weight negative
+    X, y = synthetic
+    y = np.r_[y[:400], np.ones(100)]
+    scorer = store.train(store.TrainingStore.from_arrays(str(tmp_path / "s"), X, y), train_rows=400, chunk_rows=1000)
+    config = json.loads(scorer.xgb_model.get_booster().save_config())
+    weight = float(config["learner"]["objective"]["reg_loss_param"]["scale_pos_weight"])
+    assert np.isclose(weight, (400 - y[:400].sum()) / y[:400].sum())
+
+
+def test_training_needs_both_outcomes(synthetic, tmp_path):
+    X, _ = synthetic
+    training_store = store.TrainingStore.from_arrays(str(tmp_path / "s"), X, np.zeros(len(X)))
+    with pytest.raises(ValueError, match="both outcomes"):
+        store.train(training_store)
+
+
+def test_booster_model_serves_every_model_call(synthetic, tmp_path):
+    X, y = synthetic
+    scorer = store.train(store.TrainingStore.from_arrays(str(tmp_path / "s"), X, y), chunk_rows=100)
+    model = pickle.loads(pickle.dumps(scorer.lgb_model))
+    X_scaled = scorer.scaler.transform(X[:30].astype(np.float32))
+    proba = model.set_params(n_jobs=1).predict_proba(X_scaled)
+    np.testing.assert_allclose(proba[:, 1], scorer.lgb_model.booster_.predict(X_scaled))
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(model.predict(X_scaled), proba[:, 1] >= 0.5)
+    contribs = explain.tree_contributions(scorer.xgb_model, model, X_scaled)
+    np.testing.assert_allclose(contribs["LightGBM"].sum(axis=1), model.predict(X_scaled, raw_score=True), atol=1e-6)
+    assert len(importance.global_importance(scorer.xgb_model, model, modeling.FEATURE_NAMES)) > 0
+
+
+def test_train_command_registers_in_the_given_registry(synthetic, tmp_path):
+    X, y = synthetic
+    store.TrainingStore.from_arrays(str(tmp_path / "s"), X, y)
+    db_path, model_dir = str(tmp_path / "registry.db"), str(tmp_path / "models")
+    assert store.main(["train", str(tmp_path / "s"), "--tuning-dir", str(tmp_path / "tuning"), "--activate",
+                       "--db", db_path, "--model-dir", model_dir]) == 0
+    model_registry = registry.ModelRegistry(db_path, model_dir)
+    version = model_registry.active_version()
+    assert version is not None and model_registry.get(version)["source"] == "store"
+    assert (tmp_path / "models" / f"{version}.pkl").exists()
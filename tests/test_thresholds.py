@@ -0,0 +1,36 @@
+import numpy as np
+from sklearn.metrics import roc_curve
+
+from ponv_core import thresholds
+
+
+def test_table_matches_brute_force_confusion(labelled_scores):
+    y, scores = labelled_scores
+    table = thresholds.threshold_table(y, scores)
+    assert np.isinf(table["Threshold"].iloc[0]) and table["TP"].iloc[0] == 0
+    for _, row in table.iloc[1:].iterrows():
+        pred = scores >= row["Threshold"]
+        assert row["TP"] == np.sum(pred & (y == 1))
+        assert row["FP"] == np.sum(pred & (y == 0))
+        assert row["TN"] == np.sum(~pred & (y == 0))
+        assert row["FN"] == np.sum(~pred & (y == 1))
+
+
+def test_youden_cutoff_matches_roc_curve(labelled_scores):
+    y, scores = labelled_scores
+    best = thresholds.youden_cutoff(thresholds.threshold_table(y, scores))
+    fpr, tpr, cutoffs = roc_curve(y, scores)
+    assert best["Youden J"] == np.max(tpr - fpr)
+    assert best["Threshold"] == cutoffs[np.argmax(tpr - fpr)]
+
+
+def test_slider_index_matches_row_at(labelled_scores):
+    y, scores = labelled_scores
+    table = thresholds.threshold_table(y, scores)
+    grid = thresholds.slider_grid(0.01)
+    assert len(grid) == 101 and grid[0] == 0 and grid[-1] == 1
+    index = thresholds.slider_index(table, 0.01)
+    for t, i in zip(grid, index):
+        row = thresholds.row_at(table, t)
+        assert table.iloc[i]["Threshold"] == row["Threshold"]
+        assert row["TP"] + row["FP"] == np.sum(scores >= t)
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.model_selection import train_test_split
+
+from ponv_core import tuning
+
+
+@pytest.fixture(scope="module")
+def searches(synthetic):
+    # A tiny search per model: 4 candidates, two rungs of 10 and 20 trees
+    X, y = tuning.training_split(*synthetic)
+    return {key: tuning.tune_model(key, X, y, n_candidates=4, factor=2, min_estimators=10, max_estimators=20,
+                                   cv_folds=2, n_jobs=1)
+            for key in ("xgb", "lgb")}
+
+
+def test_training_split_excludes_the_validation_rows(synthetic):
+    X, y = synthetic
+    X_train, y_train = tuning.training_split(X, y)
+    assert len(y_train) == 350
+    _, X_val, _, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+    train_rows = {row.tobytes() for row in X_train}
+    assert not any(row.tobytes() in train_rows for row in X_val)
+
+
+def test_leaderboard_is_sorted_by_rank(searches):
+    board = tuning.leaderboard(searches["xgb"])
+    assert list(board["rung"]) == sorted(board["rung"], reverse=True)
+    for _, rung in board.groupby("rung"):
+        assert list(rung["mean_auc"]) == sorted(rung["mean_auc"], reverse=True)
+    # The top row is the search's best candidate
+    assert json.loads(board["params"].iloc[0]) == tuning._strip(searches["xgb"].best_params_)
+
+
+def test_results_round_trip(searches, tmp_path):
+    assert tuning.load_best_params(str(tmp_path)) == ({}, {})
+    best = tuning.save_results(searches, str(tmp_path), n_rows=350)
+    xgb_params, lgb_params = tuning.load_best_params(str(tmp_path))
+    assert xgb_params == best["xgb"] == tuning._strip(searches["xgb"].best_params_)
+    assert lgb_params == best["lgb"]
+    assert np.isclose(best["lgb_cv_auc"], searches["lgb"].best_score_)
+    assert (tmp_path / "leaderboard_xgb.csv").exists() and (tmp_path / "leaderboard_lgb.csv").exists()
+
+
+def test_tuning_one_model_keeps_the_other(searches, tmp_path):
+    tuning.save_results(searches, str(tmp_path))
+    _, lgb_params = tuning.load_best_params(str(tmp_path))
+    tuning.save_results({"xgb": searches["xgb"]}, str(tmp_path))
+    assert tuning.load_best_params(str(tmp_path))[1] == lgb_params
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
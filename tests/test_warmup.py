@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ponv_core import warmup
+
+
+def _fake_streamlit(script_run):
+    # /_stcore/health answers 200; the script-run route answers script_run() -> (status, body)
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body = (200, "ok") if self.path == warmup.HEALTH_ROUTE else script_run()
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(script_run):
+        server, url = _fake_streamlit(script_run)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ready_file_round_trip(tmp_path):
+    path = str(tmp_path / "ready")
+    assert warmup.read_ready(path) is None
+    warmup.write_ready({"url": "x", "attempts": 1}, path)
+    assert warmup.read_ready(path) == {"url": "x", "attempts": 1}
+    assert warmup.main(["--check", "--ready-file", path]) == 0
+    warmup.clear_ready(path)
+    warmup.clear_ready(path)
+    assert warmup.main(["--check", "--ready-file", path]) == 1
+
+
+def test_script_run_timeouts_are_retried(fake_server):
+    # Streamlit answers "timeout" when a run outlasts 60 s; the next attempt finds the cached parts
+    responses = iter([(503, "timeout"), (503, "timeout"), (200, "ok")])
+    info = warmup.warm_up(fake_server(lambda: next(responses)), timeout=30, poll=0.01)
+    assert info["attempts"] == 3
+
+
+def test_failures_are_reported(fake_server):
+    with pytest.raises(RuntimeError, match="scriptHealthCheckEnabled"):
+        warmup.warm_up(fake_server(lambda: (404, "")), timeout=30, poll=0.01)
+    with pytest.raises(RuntimeError, match="exception"):
+        warmup.warm_up(fake_server(lambda: (503, "error")), timeout=30, poll=0.01)
+    with pytest.raises(TimeoutError):
+        warmup.warm_up(fake_server(lambda: (503, "timeout")), timeout=0.2, poll=0.01)
+
+
+def test_exited_server_stops_the_wait(tmp_path):
+    # Nothing listens on the URL and the server process has already exited: fail now, not at the timeout
+    server = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(2)"])
+    server.wait()
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="status 2"):
+        warmup.warm_up("http://127.0.0.1:9", timeout=60, poll=0.01, server=server)
+    assert time.monotonic() - started < 5
+
+
+def test_serve_fails_fast_when_streamlit_exits(tmp_path):
+    ready = str(tmp_path / "ready")
+    started = time.monotonic()
+    code = warmup.main(["--serve", str(tmp_path / "app.py"), "--url", "http://127.0.0.1:9", "--timeout", "60",
+                        "--ready-file", ready, "--", "--no-such-option"])
+    assert code == 1
+    assert time.monotonic() - started < 30
+    assert warmup.read_ready(ready) is None